@@ -1,7 +1,8 @@
-from .agency import Agency
+from .agency import Agency, AsyncAgency, AgencySession, AsyncAgencySession
 from .agents import Agent
 from .tools import BaseTool
 from .util import set_openai_key
 from .util import set_openai_client
 from .util import get_openai_client
-from .util.streaming import AgencyEventHandler
+from .util import CancellationToken, PartialResult
+from .util.streaming import AgencyEventHandler, AsyncAgencyEventHandler
@@ -1 +1,4 @@
 from .agency import Agency
+from .async_agency import AsyncAgency
+from .session import AgencySession
+from .async_session import AsyncAgencySession
\ No newline at end of file
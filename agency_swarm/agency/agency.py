@@ -1,9 +1,12 @@
+import contextvars
 import inspect
 import json
 import os
 import queue
 import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import List, TypedDict, Callable, Any, Dict, Literal, Union
 
@@ -13,14 +16,22 @@ from pydantic import Field, field_validator, model_validator
 from rich.console import Console
 from typing_extensions import override
 
+from agency_swarm.agency.session import AgencySession
 from agency_swarm.agents import Agent
 from agency_swarm.messages import MessageOutput
 from agency_swarm.messages.message_output import MessageOutputLive
 from agency_swarm.threads import Thread
 from agency_swarm.tools import BaseTool
 from agency_swarm.user import User
+from agency_swarm.util.cancellation import CancellationToken, PartialResult
+from agency_swarm.util.retry_policy import RetryPolicy
+from agency_swarm.util.settings_store import SettingsStore, JsonFileSettingsStore, CallbackSettingsStore
+from agency_swarm.util.assistant_resolver import AssistantResolver, get_assistant_resolver
+from agency_swarm.util.file_uploader import FileUploader
 
 from agency_swarm.util.streaming import AgencyEventHandler
+from agency_swarm.util.tracing import get_tracer
+from agency_swarm.util.usage import UsageTracker
 
 console = Console()
 
@@ -37,6 +48,7 @@ class ThreadsCallbacks(TypedDict):
 
 class Agency:
     ThreadType = Thread
+    SessionType = AgencySession
     send_message_tool_description = """Use this tool to facilitate direct, synchronous communication between specialized agents within your agency. When you send a message using this tool, you receive a response exclusively from the designated recipient agent. To continue the dialogue, invoke this tool again with the desired recipient agent and your follow-up message. Remember, communication here is synchronous; the recipient agent won't perform any tasks post-response. You are responsible for relaying the recipient agent's responses back to the user, as the user does not have direct access to these replies. Keep engaging with the tool for continuous interaction until the task is fully resolved. Do not send more than 1 message at a time."""
     send_message_tool_description_async = """Use this tool for asynchronous communication with other agents within your agency. Initiate tasks by messaging, and check status and responses later with the 'GetResponse' tool. Relay responses to the user, who instructs on status checks. Continue until task completion."""
 
@@ -47,7 +59,22 @@ class Agency:
                  async_mode: Literal['threading'] = None,
                  settings_path: str = "./settings.json",
                  settings_callbacks: SettingsCallbacks = None,
-                 threads_callbacks: ThreadsCallbacks = None):
+                 threads_callbacks: ThreadsCallbacks = None,
+                 parallel_tool_calls: bool = False,
+                 max_tool_workers: int = 8,
+                 retry_policy: RetryPolicy = None,
+                 usage_tracker: UsageTracker = None,
+                 async_max_workers: int = 16,
+                 async_max_queue_size: int = 10,
+                 async_push_responses: bool = False,
+                 broadcast_tool: bool = False,
+                 broadcast_timeout: float = 600,
+                 eager_threads: bool = False,
+                 init_max_workers: int = 8,
+                 settings_store: SettingsStore = None,
+                 verify_assistants: bool = False,
+                 assistant_resolver: AssistantResolver = None,
+                 file_uploader: FileUploader = None):
         """
         Initializes the Agency object, setting up agents, threads, and core functionalities.
 
@@ -59,13 +86,37 @@ class Agency:
             settings_path (str, optional): The path to the settings file for the agency. Must be json. If file does not exist, it will be created. Defaults to None.
             settings_callbacks (SettingsCallbacks, optional): A dictionary containing functions to load and save settings for the agency. The keys must be "load" and "save". Both values must be defined. Defaults to None.
             threads_callbacks (ThreadsCallbacks, optional): A dictionary containing functions to load and save threads for the agency. The keys must be "load" and "save". Both values must be defined. Defaults to None.
+            parallel_tool_calls (bool, optional): Whether to execute independent tool calls from the same run step concurrently. Tools with one_call_at_a_time or serial_only are always executed in order. Defaults to False.
+            max_tool_workers (int, optional): The maximum number of concurrent tool executions per thread when parallel_tool_calls is enabled. Defaults to 8.
+            retry_policy (RetryPolicy, optional): Retry policy shared by all threads of the agency. Agents can override it with their own retry_policy. Defaults to RetryPolicy().
+            usage_tracker (UsageTracker, optional): Collects the token usage of all runs of the agency by agent and thread. Defaults to UsageTracker().
+            async_max_workers (int, optional): The maximum number of background conversations running at the same time in threading async mode. Defaults to 16.
+            async_max_queue_size (int, optional): The maximum number of messages waiting for a busy agent in threading async mode, per thread. Further messages are rejected. Defaults to 10.
+            async_push_responses (bool, optional): In threading async mode, deliver the response of the recipient agent to the caller agent as a system notification as soon as it is ready, instead of letting the caller poll with the GetResponse tool. Defaults to False.
+            broadcast_tool (bool, optional): Add a BroadcastMessage tool to agents with more than one recipient, that sends the same task to several recipients concurrently and returns all responses at once. Not supported in threading async mode. Defaults to False.
+            broadcast_timeout (float, optional): The number of seconds each recipient of a BroadcastMessage call has to respond, before its response is returned as timed out. Defaults to 600.
+            eager_threads (bool, optional): Create the OpenAI threads of the main thread and all agent pairs concurrently when the agency is initialized, instead of on first use. Defaults to False.
+            init_max_workers (int, optional): The maximum number of agents whose assistants are loaded, updated or created at the same time when the agency is initialized. Set to 1 to initialize agents one after another. Defaults to 8.
+            settings_store (SettingsStore, optional): Where the settings of the assistants are kept, for example an SQLiteSettingsStore. Cannot be combined with settings_callbacks. Defaults to a JsonFileSettingsStore at settings_path.
+            verify_assistants (bool, optional): Check the assistants that were loaded from their saved settings without api calls against the API in a background thread, and update or recreate them if they were changed or deleted outside of the agency. Defaults to False.
+            assistant_resolver (AssistantResolver, optional): Finds the saved assistants of agents that are not warm started, with one paginated list of all assistants if there are at least list_threshold of them, or by id otherwise. Defaults to the resolver shared by all agencies of the process, which caches the list for 30 seconds.
+            file_uploader (FileUploader, optional): Uploads the files of all agents, including shared files, concurrently and only if their content was not uploaded before. Defaults to a FileUploader with a files_manifest.json next to the settings file.
 
         This constructor initializes various components of the Agency, including CEO, agents, threads, and user interactions. It parses the agency chart to set up the organizational structure and initializes the messaging tools, agents, and threads necessary for the operation of the agency. Additionally, it prepares a main thread for user interactions.
         """
+        if broadcast_tool and async_mode:
+            raise Exception("broadcast_tool is not supported in async mode.")
+
         self.async_mode = async_mode
+        self.async_push_responses = async_push_responses
+        self.broadcast_tool = broadcast_tool
+        self.broadcast_timeout = broadcast_timeout
+        self.worker_pool = None
         if self.async_mode == "threading":
             from agency_swarm.threads.thread_async import ThreadAsync
+            from agency_swarm.threads.worker_pool import WorkerPool
             self.ThreadType = ThreadAsync
+            self.worker_pool = WorkerPool(max_workers=async_max_workers, max_queue_size=async_max_queue_size)
 
         self.ceo = None
         self.user = User()
@@ -75,9 +126,37 @@ class Agency:
         self.main_thread = None
         self.recipient_agents = None  # for autocomplete
         self.shared_files = shared_files if shared_files else []
+        if isinstance(self.shared_files, str):
+            self.shared_files = [self.shared_files]
         self.settings_path = settings_path
         self.settings_callbacks = settings_callbacks
+        if settings_callbacks and settings_store:
+            raise Exception("settings_callbacks and settings_store cannot be used together.")
+        if settings_callbacks:
+            self.settings_store = CallbackSettingsStore(settings_callbacks)
+        elif settings_store:
+            self.settings_store = settings_store
+        else:
+            # agents are initialized concurrently, so their changes are written to the file together
+            self.settings_store = JsonFileSettingsStore(settings_path, debounce=1.0)
         self.threads_callbacks = threads_callbacks
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_workers = max_tool_workers
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.usage_tracker = usage_tracker if usage_tracker else UsageTracker()
+        self.last_request_usage = None
+        self.eager_threads = eager_threads
+        self.init_max_workers = init_max_workers
+        self.startup_report = None
+        self.verify_assistants = verify_assistants
+        self.verification_thread = None
+        self.assistant_resolver = assistant_resolver if assistant_resolver else get_assistant_resolver()
+        if file_uploader:
+            self.file_uploader = file_uploader
+        else:
+            manifest_path = os.path.join(os.path.dirname(settings_path), "files_manifest.json")
+            self.file_uploader = FileUploader(manifest_path=manifest_path)
+        self._saved_thread_ids = {}
 
         if os.path.isfile(os.path.join(self._get_class_folder_path(), shared_instructions)):
             self._read_instructions(os.path.join(self._get_class_folder_path(), shared_instructions))
@@ -92,7 +171,8 @@ class Agency:
         self._init_threads()
 
     def get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None,
-                       additional_instructions=None):
+                       additional_instructions=None, cancellation_token: CancellationToken = None,
+                       token_budget: int = None):
         """
         Retrieves the completion for a given message from the main thread.
 
@@ -102,12 +182,21 @@ class Agency:
             yield_messages (bool, optional): Flag to determine if intermediate messages should be yielded. Defaults to True.
             recipient_agent (Agent, optional): The agent to which the message should be sent. Defaults to the first agent in the agency chart.
             additional_instructions (str, optional): Additional instructions to be sent with the message. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that bounds the wall time of the request, including all nested agent conversations. When it is cancelled, in-flight runs are cancelled and a PartialResult is returned. Defaults to None.
+            token_budget (int, optional): The maximum number of tokens the request may use, including all nested agent conversations. Once it is exceeded, the request is cancelled and a PartialResult is returned. Defaults to None.
         Returns:
             Generator or final response: Depending on the 'yield_messages' flag, this method returns either a generator yielding intermediate messages or the final response from the main thread.
         """
+        cancellation_token, request_usage = self._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
         gen = self.main_thread.get_completion(message=message, message_files=message_files,
                                               yield_messages=yield_messages, recipient_agent=recipient_agent,
-                                              additional_instructions=additional_instructions)
+                                              additional_instructions=additional_instructions,
+                                              cancellation_token=cancellation_token,
+                                              request_usage=request_usage)
+        gen = self._trace_completion("agency.get_completion", gen, message, recipient_agent)
+        if self.threads_callbacks:
+            gen = self._save_thread_ids_after(gen)
 
         if not yield_messages:
             while True:
@@ -119,7 +208,8 @@ class Agency:
         return gen
 
     def get_completion_stream(self, message: str, event_handler: type(AgencyEventHandler), message_files=None,
-                              recipient_agent=None, additional_instructions: str = None):
+                              recipient_agent=None, additional_instructions: str = None,
+                              cancellation_token: CancellationToken = None, token_budget: int = None):
         """
         Generates a stream of completions for a given message from the main thread.
 
@@ -129,6 +219,8 @@ class Agency:
             message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
             recipient_agent (Agent, optional): The agent to which the message should be sent. Defaults to the first agent in the agency chart.
             additional_instructions (str, optional): Additional instructions to be sent with the message. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that bounds the wall time of the request, including all nested agent conversations. When it is cancelled, in-flight runs are cancelled and a PartialResult is returned. Defaults to None.
+            token_budget (int, optional): The maximum number of tokens the request may use, including all nested agent conversations. Once it is exceeded, the request is cancelled and a PartialResult is returned. Defaults to None.
         Returns:
             Final response: Final response from the main thread.
         """
@@ -138,9 +230,16 @@ class Agency:
         if not inspect.isclass(event_handler):
             raise Exception("Event handler must not be an instance.")
 
+        cancellation_token, request_usage = self._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
         gen = self.main_thread.get_completion_stream(message=message, event_handler=event_handler,
                                                      message_files=message_files, recipient_agent=recipient_agent,
-                                                     additional_instructions=additional_instructions)
+                                                     additional_instructions=additional_instructions,
+                                                     cancellation_token=cancellation_token,
+                                                     request_usage=request_usage)
+        gen = self._trace_completion("agency.get_completion_stream", gen, message, recipient_agent)
+        if self.threads_callbacks:
+            gen = self._save_thread_ids_after(gen)
 
         while True:
             try:
@@ -149,6 +248,59 @@ class Agency:
                 event_handler.on_all_streams_end()
                 return e.value
 
+    def create_session(self, thread_ids: dict = None) -> AgencySession:
+        """
+        Creates a session with its own conversation threads, that shares the agents, tools and assistants of this
+        agency. Sessions are cheap to create and make no API calls until they are used, so a single agency can serve
+        many users with one session per user.
+
+        Parameters:
+            thread_ids (dict, optional): Thread ids returned by session.get_thread_ids(), to resume a previous session. Defaults to None.
+        Returns:
+            AgencySession: The new session.
+        """
+        return self.SessionType(self, thread_ids)
+
+    def get_startup_report(self):
+        """
+        Returns the time the agency took to initialize its agents, with the time of each agent, slowest first.
+        """
+        return self.startup_report
+
+    def get_usage_report(self):
+        """
+        Returns the token usage of the agency by agent, by thread and by model, and the usage of the last request.
+        """
+        report = self.usage_tracker.get_report()
+        report["last_request"] = self.last_request_usage.get_report() if self.last_request_usage else None
+        return report
+
+    def _init_request_usage(self, cancellation_token, token_budget):
+        """
+        Creates the usage tracker of a request. With a token budget, the request gets a cancellation token, that is
+        cancelled when the budget is exceeded.
+        """
+        request_usage = UsageTracker(token_budget=token_budget, pricing=self.usage_tracker.pricing)
+        if token_budget is not None:
+            if not cancellation_token:
+                cancellation_token = CancellationToken()
+            request_usage.cancellation_token = cancellation_token
+
+        return cancellation_token, request_usage
+
+    def _trace_completion(self, name, gen, message, recipient_agent=None):
+        """
+        Wraps a completion generator of the main thread in a span, that is the root of the request trace.
+        """
+        with get_tracer().span(name, "agency", {
+            "recipient": recipient_agent.name if recipient_agent else self.ceo.name,
+            "message_bytes": len(message.encode()),
+        }) as span:
+            result = yield from gen
+            if isinstance(result, PartialResult):
+                span.set_status("cancelled", result.reason)
+            return result
+
     def demo_gradio(self, height=450, dark_mode=True, **kwargs):
         """
         Launches a Gradio-based demo interface for the agency chatbot.
@@ -530,38 +682,83 @@ class Agency:
         """
         Initializes all agents in the agency with unique IDs, shared instructions, and OpenAI models.
 
-        This method iterates through each agent in the agency, assigns a unique ID, adds shared instructions, and initializes the OpenAI models for each agent.
+        This method iterates through each agent in the agency, assigns a unique ID, adds shared instructions, and initializes the OpenAI models for each agent. The OpenAI assistants of up to init_max_workers agents are initialized concurrently, and the time of each agent is recorded in the startup report.
 
         There are no input parameters.
 
         There are no output parameters as this method is used for internal initialization purposes within the Agency class.
         """
-        if self.settings_callbacks:
-            loaded_settings = self.settings_callbacks["load"]()
-            with open(self.settings_path, 'w') as f:
-                json.dump(loaded_settings, f, indent=4)
-
         for agent in self.agents:
             if "temp_id" in agent.id:
                 agent.id = None
 
             agent.add_shared_instructions(self.shared_instructions)
             agent.settings_path = self.settings_path
+            agent.settings_store = self.settings_store
+            agent.assistant_resolver = self.assistant_resolver
+            agent.file_uploader = self.file_uploader
 
             if self.shared_files:
                 if isinstance(agent.files_folder, str):
                     agent.files_folder = [agent.files_folder]
-                    agent.files_folder += self.shared_files
-                elif isinstance(agent.files_folder, list):
-                    agent.files_folder += self.shared_files
+                # shared files are hashed and uploaded once by the file uploader of the agency
+                agent.files_folder += [f for f in self.shared_files if f not in agent.files_folder]
+
+        # agents with an id or saved settings may look up their assistants, the resolver lists them if there are many
+        lookups = sum(1 for agent in self.agents if agent.id or self.settings_store.find_by_name(agent.name))
+
+        start = time.monotonic()
+        with get_tracer().span("agency.init_agents", "agency", {"agents": len(self.agents)}), \
+                self.assistant_resolver.expect_lookups(lookups):
+            max_workers = max(min(self.init_max_workers, len(self.agents)), 1)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agency_swarm_init") as executor:
+                futures = [executor.submit(contextvars.copy_context().run, self._init_agent, agent)
+                           for agent in self.agents]
+                agent_times = {agent.name: future.result() for agent, future in zip(self.agents, futures)}
+
+        self.startup_report = {
+            "total_time": time.monotonic() - start,
+            "max_workers": max_workers,
+            "agents": dict(sorted(agent_times.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+        self.settings_store.flush()
+
+        warm_agents = [agent for agent in self.agents if agent.warm_start]
+        self.startup_report["warm_starts"] = len(warm_agents)
+        if self.verify_assistants and warm_agents:
+            self.startup_report["verification"] = {}
+            self.verification_thread = threading.Thread(target=self._verify_assistants, args=(warm_agents,),
+                                                        name="agency_swarm_verify", daemon=True)
+            self.verification_thread.start()
+
+    def _verify_assistants(self, agents):
+        """
+        Checks the assistants of warm started agents against the API, and records the result of each agent in the
+        startup report.
+        """
+        # list the assistants again, they may have changed since the agents were initialized
+        self.assistant_resolver.invalidate()
+        with self.assistant_resolver.expect_lookups(len(agents)):
+            for agent in agents:
+                try:
+                    status = agent.verify_assistant()
+                except Exception as e:
+                    status = f"error: {e}"
+                self.startup_report["verification"][agent.name] = status
+        self.settings_store.flush()
 
-            agent.init_oai()
+    def _init_agent(self, agent):
+        """
+        Initializes the OpenAI assistant of an agent.
 
-        if self.settings_callbacks:
-            with open(self.agents[0].get_settings_path(), 'r') as f:
-                settings = f.read()
-            settings = json.loads(settings)
-            self.settings_callbacks["save"](settings)
+        Returns:
+            float: The time it took in seconds.
+        """
+        start = time.monotonic()
+        with get_tracer().span("agent.init_oai", "agent", {"agent": agent.name}):
+            agent.init_oai()
+        return time.monotonic() - start
 
     def _init_threads(self):
         """
@@ -569,45 +766,124 @@ class Agency:
 
         This method creates Thread objects for each pair of interacting agents as defined in the agents_and_threads attribute of the Agency. Each thread facilitates communication and task execution between an agent and its designated recipient agent.
 
+        Thread ids are loaded with the threads callbacks, if provided. Threads without ids are created on the OpenAI side on first use, or concurrently right away with eager_threads. The ids of new threads are saved after each completion.
+
         No input parameters.
 
         Output Parameters:
             This method does not return any value but updates the agents_and_threads attribute with initialized Thread objects.
         """
-        self.main_thread = Thread(self.user, self.ceo)
+        self.main_thread = self._create_main_thread()
 
         # load thread ids
         loaded_thread_ids = {}
         if self.threads_callbacks:
-            loaded_thread_ids = self.threads_callbacks["load"]()
-            if "main_thread" in loaded_thread_ids:
-                self.main_thread.id = loaded_thread_ids["main_thread"]
-            else:
-                self.main_thread.init_thread()
+            loaded_thread_ids = self.threads_callbacks["load"]() or {}
+            self.main_thread.id = loaded_thread_ids.get("main_thread")
 
         for agent_name, threads in self.agents_and_threads.items():
             for other_agent, items in threads.items():
-                self.agents_and_threads[agent_name][other_agent] = self.ThreadType(
-                    self._get_agent_by_name(items["agent"]),
-                    self._get_agent_by_name(
-                        items["recipient_agent"]))
+                thread = self._create_thread(items["agent"], items["recipient_agent"])
+                thread.id = loaded_thread_ids.get(agent_name, {}).get(other_agent)
+                self.agents_and_threads[agent_name][other_agent] = thread
 
-                if agent_name in loaded_thread_ids and other_agent in loaded_thread_ids[agent_name]:
-                    self.agents_and_threads[agent_name][other_agent].id = loaded_thread_ids[agent_name][other_agent]
-                elif self.threads_callbacks:
-                    self.agents_and_threads[agent_name][other_agent].init_thread()
+        self._saved_thread_ids = self._get_thread_ids()
+
+        if self.eager_threads:
+            self._create_remote_threads([self.main_thread] + [thread for threads in self.agents_and_threads.values()
+                                                              for thread in threads.values()])
 
         # save thread ids
         if self.threads_callbacks:
-            loaded_thread_ids = {}
-            for agent_name, threads in self.agents_and_threads.items():
-                loaded_thread_ids[agent_name] = {}
-                for other_agent, thread in threads.items():
-                    loaded_thread_ids[agent_name][other_agent] = thread.id
+            self._save_thread_ids()
 
-            loaded_thread_ids["main_thread"] = self.main_thread.id
+    def _create_remote_threads(self, threads):
+        """
+        Creates the OpenAI threads of the threads that do not have an id yet, concurrently.
+        """
+        threads = [thread for thread in threads if not thread.id]
+        if not threads:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(len(threads), 16), thread_name_prefix="agency_swarm_init") as executor:
+            futures = [executor.submit(contextvars.copy_context().run, self._create_remote_thread, thread)
+                       for thread in threads]
+            for future in futures:
+                future.result()
+
+    def _create_remote_thread(self, thread):
+        thread.init_thread()
+
+    def _create_main_thread(self):
+        """
+        Creates the thread between the user and the CEO.
+        """
+        return Thread(self.user, self.ceo,
+                      parallel_tool_calls=self.parallel_tool_calls,
+                      max_tool_workers=self.max_tool_workers,
+                      retry_policy=self.retry_policy,
+                      usage_tracker=self.usage_tracker)
 
-            self.threads_callbacks["save"](loaded_thread_ids)
+    def _create_thread(self, agent_name, recipient_name):
+        """
+        Creates the thread in which an agent sends messages to a recipient agent.
+        """
+        kwargs = {"worker_pool": self.worker_pool} if self.worker_pool else {}
+        return self.ThreadType(self._get_agent_by_name(agent_name),
+                               self._get_agent_by_name(recipient_name),
+                               parallel_tool_calls=self.parallel_tool_calls,
+                               max_tool_workers=self.max_tool_workers,
+                               retry_policy=self.retry_policy,
+                               usage_tracker=self.usage_tracker,
+                               **kwargs)
+
+    def _get_tool_thread(self, tool, recipient_name: str = None):
+        """
+        Returns the thread between the caller and the recipient of a SendMessage or GetResponse tool call, from the
+        session of the call if it has one. Tools with several recipients pass the recipient_name.
+        """
+        if recipient_name is None:
+            recipient_name = tool.recipient.value
+        if tool._session:
+            return tool._session.get_thread(tool.caller_agent.name, recipient_name)
+        return self.agents_and_threads[tool.caller_agent.name][recipient_name]
+
+    def _get_thread_ids(self):
+        """
+        Returns the ids of the main thread and the agent threads, in the format of the threads callbacks. Threads that
+        were not created yet are not included.
+        """
+        thread_ids = {}
+        for agent_name, threads in self.agents_and_threads.items():
+            for other_agent, thread in threads.items():
+                if thread.id:
+                    thread_ids.setdefault(agent_name, {})[other_agent] = thread.id
+
+        if self.main_thread.id:
+            thread_ids["main_thread"] = self.main_thread.id
+
+        return thread_ids
+
+    def _save_thread_ids(self):
+        """
+        Saves the ids of the main thread and the agent threads with the threads callbacks, if new threads were created
+        since they were last loaded or saved.
+        """
+        thread_ids = self._get_thread_ids()
+        if thread_ids == self._saved_thread_ids:
+            return
+
+        self.threads_callbacks["save"](thread_ids)
+        self._saved_thread_ids = thread_ids
+
+    def _save_thread_ids_after(self, gen):
+        """
+        Wraps a completion generator of the main thread, to save the ids of the threads created during the completion.
+        """
+        try:
+            return (yield from gen)
+        finally:
+            self._save_thread_ids()
 
     def _parse_agency_chart(self, agency_chart):
         """
@@ -728,6 +1004,8 @@ class Agency:
                 continue
             agent = self._get_agent_by_name(agent_name)
             agent.add_tool(self._create_send_message_tool(agent, recipient_agents))
+            if self.broadcast_tool and len(recipient_agents) > 1:
+                agent.add_tool(self._create_broadcast_message_tool(agent, recipient_agents))
             if self.async_mode:
                 agent.add_tool(self._create_get_response_tool(agent, recipient_agents))
 
@@ -789,22 +1067,32 @@ class Agency:
                 return value
 
             def run(self):
-                thread = outer_self.agents_and_threads[self.caller_agent.name][self.recipient.value]
+                thread = outer_self._get_tool_thread(self)
 
                 if not outer_self.async_mode:
                     gen = thread.get_completion(message=self.message,
                                                 message_files=self.message_files,
                                                 event_handler=self.event_handler,
-                                                additional_instructions=self.additional_instructions)
+                                                additional_instructions=self.additional_instructions,
+                                                cancellation_token=self.cancellation_token,
+                                                request_usage=self.request_usage)
                     try:
                         while True:
                             yield next(gen)
                     except StopIteration as e:
                         message = e.value
                 else:
+                    callback = None
+                    if outer_self.async_push_responses and self._caller_thread:
+                        caller_thread = self._caller_thread
+
+                        def callback(future):
+                            caller_thread.add_notification(thread.get_response_notification(future))
+
                     message = thread.get_completion_async(message=self.message,
                                                           message_files=self.message_files,
-                                                          additional_instructions=self.additional_instructions)
+                                                          additional_instructions=self.additional_instructions,
+                                                          callback=callback)
 
                 return message or ""
 
@@ -816,6 +1104,128 @@ class Agency:
 
         return SendMessage
 
+    def _create_broadcast_message_tool(self, agent: Agent, recipient_agents: List[Agent]):
+        """
+        Creates a BroadcastMessage tool, that sends the same message to several recipient agents concurrently, each in
+        its own thread, and gathers their responses.
+
+        Each recipient has broadcast_timeout seconds to respond. A recipient that does not respond in time is cancelled
+        and its partial response is returned, without delaying the responses of the other recipients.
+
+        Parameters:
+            agent (Agent): The agent who will be sending messages.
+            recipient_agents (List[Agent]): A list of recipient agents who can receive messages.
+
+        Returns:
+            BroadcastMessage: A BroadcastMessage tool class for the given agent and its recipient agents.
+        """
+        recipient_names = [agent.name for agent in recipient_agents]
+        recipient = Enum("recipient", {name: name for name in recipient_names})
+
+        agent_descriptions = ""
+        for recipient_agent in recipient_agents:
+            if not recipient_agent.description:
+                continue
+            agent_descriptions += recipient_agent.name + ": "
+            agent_descriptions += recipient_agent.description + "\n"
+
+        outer_self = self
+
+        class BroadcastMessage(BaseTool):
+            """Use this tool to send the same task to several agents at once, when their work is independent of each other. All recipient agents work on the task in parallel, and you receive their responses together, as a JSON object with the status and the response of each recipient. A recipient that does not respond in time has the status 'timeout', with the part of the response it sent so far. Use the 'SendMessage' tool for follow-up messages to a single agent."""
+            my_primary_instructions: str = Field(...,
+                                                 description="Please repeat your primary instructions step-by-step, including both completed "
+                                                             "and the following next steps that you need to perform. Keep in mind, that the recipient "
+                                                             "agents do not have access to these instructions. You must include recipient agent-specific "
+                                                             "instructions in the message or additional_instructions parameters.")
+            recipients: List[recipient] = Field(..., min_length=1, description=agent_descriptions)
+            message: str = Field(...,
+                                 description="Specify the task required for the recipient agents to complete. Focus on "
+                                             "clarifying what the task entails, rather than providing exact "
+                                             "instructions.")
+            message_files: List[str] = Field(default=None,
+                                             description="A list of file ids to be sent as attachments to this message. Only use this if you have the file id that starts with 'file-'.",
+                                             examples=["file-1234", "file-5678"])
+            additional_instructions: str = Field(default=None,
+                                                 description="Any additional instructions or clarifications that you would like to provide to the recipient agents.")
+            one_call_at_a_time: bool = True
+
+            @model_validator(mode='after')
+            def validate_files(self):
+                if "file-" in self.message or (self.additional_instructions and "file-" in self.additional_instructions):
+                    if not self.message_files:
+                        raise ValueError("You must include file ids in message_files parameter.")
+                return self
+
+            def run(self):
+                names = list(dict.fromkeys(recipient.value for recipient in self.recipients))
+                threads = {name: outer_self._get_tool_thread(self, name) for name in names}
+                tokens = {name: self._create_recipient_token() for name in names}
+
+                def get_response(name):
+                    # the event handler class is shared, so each recipient streams into its own subclass
+                    event_handler = None
+                    if self.event_handler:
+                        event_handler = type(self.event_handler.__name__, (self.event_handler,), {})
+
+                    gen = threads[name].get_completion(message=self.message,
+                                                       message_files=self.message_files,
+                                                       yield_messages=False,
+                                                       event_handler=event_handler,
+                                                       additional_instructions=self.additional_instructions,
+                                                       cancellation_token=tokens[name],
+                                                       request_usage=self.request_usage)
+                    while True:
+                        try:
+                            next(gen)
+                        except StopIteration as e:
+                            return e.value
+
+                # recipients continue the active trace of the caller
+                with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="agency_swarm_broadcast") as executor:
+                    futures = {name: executor.submit(contextvars.copy_context().run, get_response, name)
+                               for name in names}
+
+                    responses = {}
+                    for name, future in futures.items():
+                        try:
+                            response = future.result()
+                        except Exception as e:
+                            responses[name] = {"status": "failed", "response": f"Error: {e}"}
+                            continue
+                        finally:
+                            tokens[name].cancel("finished")
+
+                        if isinstance(response, PartialResult):
+                            status = "cancelled" if self.cancellation_token and self.cancellation_token.cancelled \
+                                else "timeout"
+                            responses[name] = {"status": status, "response": response.message}
+                        else:
+                            responses[name] = {"status": "completed", "response": response or ""}
+
+                return json.dumps(responses, ensure_ascii=False)
+
+            def _create_recipient_token(self):
+                """
+                Creates the cancellation token of one recipient, that expires after broadcast_timeout seconds, or
+                earlier if the token of the request is cancelled.
+                """
+                timeout = outer_self.broadcast_timeout
+                if self.cancellation_token and self.cancellation_token.remaining() is not None:
+                    remaining = self.cancellation_token.remaining()
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+                token = CancellationToken(timeout=timeout)
+                if self.cancellation_token:
+                    parent = self.cancellation_token
+                    callback_id = parent.add_callback(lambda: token.cancel(parent.reason))
+                    token.add_callback(lambda: parent.remove_callback(callback_id))
+                return token
+
+        BroadcastMessage.caller_agent = agent
+
+        return BroadcastMessage
+
     def _create_get_response_tool(self, agent: Agent, recipient_agents: List[Agent]):
         """
         Creates a CheckStatus tool to enable an agent to check the status of a task with a specified recipient agent.
@@ -837,7 +1247,7 @@ class Agency:
                 return value
 
             def run(self):
-                thread = outer_self.agents_and_threads[self.caller_agent.name][self.recipient.value]
+                thread = outer_self._get_tool_thread(self)
 
                 return thread.check_status()
 
@@ -0,0 +1,223 @@
+import asyncio
+import inspect
+import json
+from typing import List
+
+from agency_swarm.agency.agency import Agency
+from agency_swarm.agency.async_session import AsyncAgencySession
+from agency_swarm.agents import Agent
+from agency_swarm.threads.async_thread import AsyncThread
+from agency_swarm.util.cancellation import CancellationToken, PartialResult
+from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.streaming import AsyncAgencyEventHandler
+from agency_swarm.util.tracing import get_tracer
+
+
+class AsyncAgency(Agency):
+    """
+    Asyncio counterpart of Agency. Conversations run on the AsyncOpenAI client through AsyncThread, so a single event
+    loop can serve many concurrent conversations without an OS thread per request.
+
+    Agents are initialized synchronously in the constructor, exactly like in Agency. Threads are created on the
+    OpenAI side on first use, unless eager_threads is set.
+    """
+    ThreadType = AsyncThread
+    SessionType = AsyncAgencySession
+
+    def __init__(self, agency_chart: List, **kwargs):
+        """
+        Initializes the AsyncAgency object. Accepts the same parameters as Agency, except for async_mode.
+        """
+        if kwargs.get("async_mode"):
+            raise Exception("async_mode is not supported with AsyncAgency.")
+
+        super().__init__(agency_chart, **kwargs)
+
+    async def get_completion(self, message: str, message_files=None, recipient_agent=None,
+                             additional_instructions=None, cancellation_token: CancellationToken = None,
+                             token_budget: int = None):
+        """
+        Retrieves the completion for a given message from the main thread.
+
+        Parameters:
+            message (str): The message for which completion is to be retrieved.
+            message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
+            recipient_agent (Agent, optional): The agent to which the message should be sent. Defaults to the first agent in the agency chart.
+            additional_instructions (str, optional): Additional instructions to be sent with the message. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that bounds the wall time of the request, including all nested agent conversations. When it is cancelled, in-flight runs are cancelled and a PartialResult is returned. Defaults to None.
+            token_budget (int, optional): The maximum number of tokens the request may use, including all nested agent conversations. Once it is exceeded, the request is cancelled and a PartialResult is returned. Defaults to None.
+        Returns:
+            str: The final response from the main thread.
+        """
+        cancellation_token, request_usage = self._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        try:
+            return await self._trace_completion("agency.get_completion",
+                                                self.main_thread.get_completion(
+                                                    message=message, message_files=message_files,
+                                                    recipient_agent=recipient_agent,
+                                                    additional_instructions=additional_instructions,
+                                                    cancellation_token=cancellation_token,
+                                                    request_usage=request_usage),
+                                                message, recipient_agent)
+        finally:
+            # threads created before a failure are saved too
+            if self.threads_callbacks:
+                self._save_thread_ids()
+
+    async def get_completion_stream(self, message: str, event_handler: type(AsyncAgencyEventHandler),
+                                    message_files=None, recipient_agent=None, additional_instructions: str = None,
+                                    cancellation_token: CancellationToken = None, token_budget: int = None):
+        """
+        Generates a stream of completions for a given message from the main thread.
+
+        Parameters:
+            message (str): The message for which completion is to be retrieved.
+            event_handler (type(AsyncAgencyEventHandler)): The async event handler class to handle the completion stream.
+            message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
+            recipient_agent (Agent, optional): The agent to which the message should be sent. Defaults to the first agent in the agency chart.
+            additional_instructions (str, optional): Additional instructions to be sent with the message. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that bounds the wall time of the request, including all nested agent conversations. When it is cancelled, in-flight runs are cancelled and a PartialResult is returned. Defaults to None.
+            token_budget (int, optional): The maximum number of tokens the request may use, including all nested agent conversations. Once it is exceeded, the request is cancelled and a PartialResult is returned. Defaults to None.
+        Returns:
+            Final response: Final response from the main thread.
+        """
+        if not inspect.isclass(event_handler):
+            raise Exception("Event handler must not be an instance.")
+
+        cancellation_token, request_usage = self._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        try:
+            response = await self._trace_completion("agency.get_completion_stream",
+                                                    self.main_thread.get_completion_stream(
+                                                        message=message, event_handler=event_handler,
+                                                        message_files=message_files,
+                                                        recipient_agent=recipient_agent,
+                                                        additional_instructions=additional_instructions,
+                                                        cancellation_token=cancellation_token,
+                                                        request_usage=request_usage),
+                                                    message, recipient_agent)
+
+            await event_handler.on_all_streams_end()
+        finally:
+            # threads created before a failure are saved too
+            if self.threads_callbacks:
+                self._save_thread_ids()
+
+        return response
+
+    async def _trace_completion(self, name, completion, message, recipient_agent=None):
+        """
+        Awaits a completion of the main thread in a span, that is the root of the request trace.
+        """
+        with get_tracer().span(name, "agency", {
+            "recipient": recipient_agent.name if recipient_agent else self.ceo.name,
+            "message_bytes": len(message.encode()),
+        }) as span:
+            result = await completion
+            if isinstance(result, PartialResult):
+                span.set_status("cancelled", result.reason)
+            return result
+
+    def demo_gradio(self, height=450, dark_mode=True, **kwargs):
+        raise Exception("Gradio demo is not supported with AsyncAgency. Please use Agency instead.")
+
+    def run_demo(self):
+        raise Exception("Terminal demo is not supported with AsyncAgency. Please use Agency instead.")
+
+    def _create_remote_thread(self, thread):
+        """
+        Creates the OpenAI thread of an async thread with the sync client, since eager threads are created in the
+        constructor, outside of the event loop. Async threads only need the id.
+        """
+        with get_tracer().span("api.threads.create", "api") as span:
+            thread.id = get_openai_client().beta.threads.create().id
+            span.set_attribute("thread_id", thread.id)
+
+    def _create_main_thread(self):
+        return AsyncThread(self.user, self.ceo, parallel_tool_calls=self.parallel_tool_calls,
+                           retry_policy=self.retry_policy, usage_tracker=self.usage_tracker)
+
+    def _create_thread(self, agent_name, recipient_name):
+        return self.ThreadType(self._get_agent_by_name(agent_name),
+                               self._get_agent_by_name(recipient_name),
+                               parallel_tool_calls=self.parallel_tool_calls,
+                               retry_policy=self.retry_policy,
+                               usage_tracker=self.usage_tracker)
+
+    def _create_send_message_tool(self, agent: Agent, recipient_agents: List[Agent]):
+        """
+        Creates a SendMessage tool with an async run method, that awaits the completion from the recipient agent's
+        async thread.
+        """
+        send_message_tool = super()._create_send_message_tool(agent, recipient_agents)
+
+        outer_self = self
+
+        class SendMessage(send_message_tool):
+            __doc__ = send_message_tool.__doc__
+
+            async def run(self):
+                thread = outer_self._get_tool_thread(self)
+
+                message = await thread.get_completion(message=self.message,
+                                                      message_files=self.message_files,
+                                                      event_handler=self.event_handler,
+                                                      additional_instructions=self.additional_instructions,
+                                                      cancellation_token=self.cancellation_token,
+                                                      request_usage=self.request_usage)
+
+                return message or ""
+
+        SendMessage.caller_agent = agent
+
+        return SendMessage
+
+    def _create_broadcast_message_tool(self, agent: Agent, recipient_agents: List[Agent]):
+        """
+        Creates a BroadcastMessage tool with an async run method, that awaits the completions from all recipient
+        agents concurrently on the event loop. Like in the sync tool, each recipient is cancelled with its own token
+        after broadcast_timeout seconds and returns its partial response.
+        """
+        broadcast_message_tool = super()._create_broadcast_message_tool(agent, recipient_agents)
+
+        outer_self = self
+
+        class BroadcastMessage(broadcast_message_tool):
+            __doc__ = broadcast_message_tool.__doc__
+
+            async def run(self):
+                names = list(dict.fromkeys(recipient.value for recipient in self.recipients))
+
+                async def get_response(name):
+                    thread = outer_self._get_tool_thread(self, name)
+                    event_handler = None
+                    if self.event_handler:
+                        event_handler = type(self.event_handler.__name__, (self.event_handler,), {})
+
+                    token = self._create_recipient_token()
+                    try:
+                        message = await thread.get_completion(message=self.message,
+                                                              message_files=self.message_files,
+                                                              event_handler=event_handler,
+                                                              additional_instructions=self.additional_instructions,
+                                                              cancellation_token=token,
+                                                              request_usage=self.request_usage)
+                    except Exception as e:
+                        return {"status": "failed", "response": f"Error: {e}"}
+                    finally:
+                        token.cancel("finished")
+
+                    if isinstance(message, PartialResult):
+                        status = "cancelled" if self.cancellation_token and self.cancellation_token.cancelled \
+                            else "timeout"
+                        return {"status": status, "response": message.message}
+                    return {"status": "completed", "response": message or ""}
+
+                responses = await asyncio.gather(*[get_response(name) for name in names])
+
+                return json.dumps(dict(zip(names, responses)), ensure_ascii=False)
+
+        BroadcastMessage.caller_agent = agent
+
+        return BroadcastMessage
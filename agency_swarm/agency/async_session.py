@@ -0,0 +1,55 @@
+import inspect
+
+from agency_swarm.agency.session import AgencySession
+from agency_swarm.util.cancellation import CancellationToken
+from agency_swarm.util.streaming import AsyncAgencyEventHandler
+
+
+class AsyncAgencySession(AgencySession):
+    """
+    Asyncio counterpart of AgencySession, created with AsyncAgency.create_session().
+    """
+
+    async def get_completion(self, message: str, message_files=None, recipient_agent=None,
+                             additional_instructions=None, cancellation_token: CancellationToken = None,
+                             token_budget: int = None):
+        """
+        Retrieves the completion for a given message from the main thread of the session. Accepts the same parameters
+        as AsyncAgency.get_completion.
+        """
+        cancellation_token, request_usage = self.agency._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        return await self.agency._trace_completion("session.get_completion",
+                                                   self.main_thread.get_completion(
+                                                       message=message, message_files=message_files,
+                                                       recipient_agent=recipient_agent,
+                                                       additional_instructions=additional_instructions,
+                                                       cancellation_token=cancellation_token,
+                                                       request_usage=request_usage),
+                                                   message, recipient_agent)
+
+    async def get_completion_stream(self, message: str, event_handler: type(AsyncAgencyEventHandler),
+                                    message_files=None, recipient_agent=None, additional_instructions: str = None,
+                                    cancellation_token: CancellationToken = None, token_budget: int = None):
+        """
+        Generates a stream of completions for a given message from the main thread of the session. Accepts the same
+        parameters as AsyncAgency.get_completion_stream.
+        """
+        if not inspect.isclass(event_handler):
+            raise Exception("Event handler must not be an instance.")
+
+        cancellation_token, request_usage = self.agency._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        response = await self.agency._trace_completion("session.get_completion_stream",
+                                                       self.main_thread.get_completion_stream(
+                                                           message=message, event_handler=event_handler,
+                                                           message_files=message_files,
+                                                           recipient_agent=recipient_agent,
+                                                           additional_instructions=additional_instructions,
+                                                           cancellation_token=cancellation_token,
+                                                           request_usage=request_usage),
+                                                       message, recipient_agent)
+
+        await event_handler.on_all_streams_end()
+
+        return response
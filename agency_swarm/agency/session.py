@@ -0,0 +1,148 @@
+import inspect
+import threading
+
+from agency_swarm.util.cancellation import CancellationToken
+from agency_swarm.util.streaming import AgencyEventHandler
+
+
+class AgencySession:
+    """
+    A conversation with an initialized agency, with its own main thread and agent threads.
+
+    Sessions share the agents, tools, assistants, retry policy and usage tracker of the agency, so creating a session
+    makes no API calls. Threads are created on first use, both locally and on the OpenAI side. Like an agency, a
+    session handles one request at a time, while different sessions of the same agency can run concurrently.
+
+    Example:
+        session = agency.create_session()
+        response = session.get_completion("Hello", yield_messages=False)
+        thread_ids = session.get_thread_ids()  # to resume later with agency.create_session(thread_ids)
+    """
+
+    def __init__(self, agency, thread_ids: dict = None):
+        """
+        Initializes the AgencySession. Use Agency.create_session() instead of creating sessions directly.
+
+        Parameters:
+            agency (Agency): The initialized agency of the session.
+            thread_ids (dict, optional): Thread ids of a previous session to resume, in the format of get_thread_ids(). Defaults to None.
+        """
+        self.agency = agency
+        self.thread_ids = thread_ids if thread_ids else {}
+        self.last_request_usage = None
+        self._main_thread = None
+        self._threads = {}  # (agent name, recipient name) -> thread
+        self._lock = threading.Lock()
+
+    @property
+    def main_thread(self):
+        """The thread between the user and the CEO, created on first use."""
+        if self._main_thread is None:
+            with self._lock:
+                if self._main_thread is None:
+                    self._main_thread = self._init_thread(self.agency._create_main_thread(),
+                                                          self.thread_ids.get("main_thread"))
+        return self._main_thread
+
+    def get_thread(self, agent_name: str, recipient_name: str):
+        """
+        Returns the thread in which an agent sends messages to a recipient agent, creating it on first use.
+
+        Parameters:
+            agent_name (str): The name of the sending agent.
+            recipient_name (str): The name of the recipient agent.
+        """
+        key = (agent_name, recipient_name)
+        thread = self._threads.get(key)
+        if thread is not None:
+            return thread
+
+        if recipient_name not in self.agency.agents_and_threads.get(agent_name, {}):
+            raise Exception(f"Agent {agent_name} cannot send messages to {recipient_name}.")
+
+        with self._lock:
+            if key not in self._threads:
+                self._threads[key] = self._init_thread(self.agency._create_thread(agent_name, recipient_name),
+                                                       self.thread_ids.get(agent_name, {}).get(recipient_name))
+            return self._threads[key]
+
+    def get_thread_ids(self):
+        """
+        Returns the ids of the OpenAI threads of the session, in the same format as the agency threads callbacks.
+        Threads that were not used yet are not included, unless they were resumed from previous thread ids.
+        """
+        thread_ids = {agent_name: dict(ids) for agent_name, ids in self.thread_ids.items()
+                      if agent_name != "main_thread"}
+        if self.thread_ids.get("main_thread"):
+            thread_ids["main_thread"] = self.thread_ids["main_thread"]
+
+        with self._lock:
+            threads = list(self._threads.items())
+            main_thread = self._main_thread
+
+        for (agent_name, recipient_name), thread in threads:
+            if thread.id:
+                thread_ids.setdefault(agent_name, {})[recipient_name] = thread.id
+        if main_thread and main_thread.id:
+            thread_ids["main_thread"] = main_thread.id
+
+        return thread_ids
+
+    def get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None,
+                       additional_instructions=None, cancellation_token: CancellationToken = None,
+                       token_budget: int = None):
+        """
+        Retrieves the completion for a given message from the main thread of the session. Accepts the same parameters
+        as Agency.get_completion.
+        """
+        cancellation_token, request_usage = self.agency._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        gen = self.main_thread.get_completion(message=message, message_files=message_files,
+                                              yield_messages=yield_messages, recipient_agent=recipient_agent,
+                                              additional_instructions=additional_instructions,
+                                              cancellation_token=cancellation_token,
+                                              request_usage=request_usage)
+        gen = self.agency._trace_completion("session.get_completion", gen, message, recipient_agent)
+
+        if not yield_messages:
+            while True:
+                try:
+                    next(gen)
+                except StopIteration as e:
+                    return e.value
+
+        return gen
+
+    def get_completion_stream(self, message: str, event_handler: type(AgencyEventHandler), message_files=None,
+                              recipient_agent=None, additional_instructions: str = None,
+                              cancellation_token: CancellationToken = None, token_budget: int = None):
+        """
+        Generates a stream of completions for a given message from the main thread of the session. Accepts the same
+        parameters as Agency.get_completion_stream.
+        """
+        if self.agency.async_mode:
+            raise Exception("Streaming is not supported in async mode.")
+
+        if not inspect.isclass(event_handler):
+            raise Exception("Event handler must not be an instance.")
+
+        cancellation_token, request_usage = self.agency._init_request_usage(cancellation_token, token_budget)
+        self.last_request_usage = request_usage
+        gen = self.main_thread.get_completion_stream(message=message, event_handler=event_handler,
+                                                     message_files=message_files, recipient_agent=recipient_agent,
+                                                     additional_instructions=additional_instructions,
+                                                     cancellation_token=cancellation_token,
+                                                     request_usage=request_usage)
+        gen = self.agency._trace_completion("session.get_completion_stream", gen, message, recipient_agent)
+
+        while True:
+            try:
+                next(gen)
+            except StopIteration as e:
+                event_handler.on_all_streams_end()
+                return e.value
+
+    def _init_thread(self, thread, thread_id):
+        thread.session = self
+        thread.id = thread_id
+        return thread
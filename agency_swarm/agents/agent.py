@@ -1,17 +1,27 @@
+import hashlib
 import inspect
 import json
 import os
-from typing import Dict, Union, Any, Type
+from typing import Dict, Union, Any, Type, Optional
 from typing import List
 
 from deepdiff import DeepDiff
 from openai import NotFoundError
+from openai.types.beta import Assistant
 
 from agency_swarm.tools import BaseTool, ToolFactory
-from agency_swarm.tools import Retrieval, CodeInterpreter
+from agency_swarm.tools import Retrieval, CodeInterpreter, ToolOutputPolicy
+from agency_swarm.tools import LazyTool, ToolManifest
 from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.retry_policy import RetryPolicy
+from agency_swarm.util.settings_store import SettingsStore, JsonFileSettingsStore
+from agency_swarm.util.assistant_resolver import AssistantResolver
+from agency_swarm.util.file_uploader import FileUploader
 from agency_swarm.util.openapi import validate_openapi_spec
 
+# metadata key of the fingerprint of the agent configuration, see Agent.get_fingerprint
+FINGERPRINT_METADATA_KEY = "agency_swarm_fingerprint"
+
 
 class Agent():
     @property
@@ -26,7 +36,18 @@ class Agent():
 
     @property
     def functions(self):
-        return [tool for tool in self.tools if issubclass(tool, BaseTool)]
+        self._check_functions_index()
+        return self._functions
+
+    def get_function(self, name: str):
+        """
+        Returns the function tool with the given name, or None if the agent does not have it.
+        """
+        self._check_functions_index()
+        tool = self._functions_index.get(name)
+        if tool is not None and issubclass(tool, LazyTool):
+            tool = self._load_tool(tool)
+        return tool
 
     def response_validator(self, message: str) -> str:
         """
@@ -57,6 +78,9 @@ class Agent():
             metadata: Dict[str, str] = None,
             model: str = "gpt-4-turbo",
             validation_attempts: int = 1,
+            tool_output_policy: ToolOutputPolicy = None,
+            retry_policy: RetryPolicy = None,
+            lazy_tools: bool = False,
     ):
         """
         Initializes an Agent with specified attributes, tools, and OpenAI client.
@@ -76,8 +100,11 @@ class Agent():
             metadata (Dict[str, str], optional): Metadata associated with the agent. Defaults to an empty dictionary.
             model (str, optional): The model identifier for the OpenAI API. Defaults to "gpt-4-turbo-preview".
             validation_attempts (int, optional): Number of attempts to validate the response with response_validator function. Defaults to 1.
+            tool_output_policy (ToolOutputPolicy, optional): Limits the size of the outputs of this agent's tools, unless a tool defines its own output_policy. Defaults to None.
+            retry_policy (RetryPolicy, optional): Retry policy for the runs of this agent. Overrides the retry policy of the agency. Defaults to None.
+            lazy_tools (bool, optional): Register the tools of tools_folder with their schemas from the .tools_manifest.json cache in the folder, and import each tool file only when the tool is first called. Tool files that changed are imported right away to update the cache. Defaults to False.
 
-        This constructor sets up the agent with its unique properties, initializes the OpenAI client, reads instructions if provided, and uploads any associated files.
+        This constructor sets up the agent with its unique properties, initializes the OpenAI client, and reads instructions if provided. Associated files are uploaded when the assistant is initialized with init_oai.
         """
         # public attributes
         self.id = id
@@ -95,20 +122,29 @@ class Agent():
         self.metadata = metadata if metadata else {}
         self.model = model
         self.validation_attempts = validation_attempts
+        self.tool_output_policy = tool_output_policy
+        self.retry_policy = retry_policy
+        self.lazy_tools = lazy_tools
 
         self.settings_path = './settings.json'
+        self.settings_store: SettingsStore = None  # set by the agency, defaults to the file at settings_path
+        self.warm_start = False  # True if the assistant was loaded from its settings without api calls
+        self.assistant_resolver: AssistantResolver = None  # set by the agency to find assistants with one list call
+        self.file_uploader: FileUploader = None  # set by the agency, shared by its agents
 
         # private attributes
         self._assistant: Any = None
         self._shared_instructions = None
+        self._functions = None
+        self._functions_index = None
+        self._functions_tools_state = None
+        self._files_uploaded = False
+        self._default_settings_store = None
 
         # init methods
         self.client = get_openai_client()
         self._read_instructions()
 
-        # upload files
-        self._upload_files()
-
         self._parse_schemas()
         self._parse_tools_folder()
 
@@ -120,75 +156,106 @@ class Agent():
 
         This method handles the initialization and potential updates of the agent's OpenAI assistant. It loads the assistant based on a saved ID, updates the assistant if necessary, or creates a new assistant if it doesn't exist. After initialization or update, it saves the assistant's settings.
 
+        If the saved settings of an assistant with the same name have the fingerprint of the agent's current configuration, the assistant is loaded from the settings without any API calls. Use verify_assistant() to check it against the API later.
+
         Output:
             self: Returns the agent instance for chaining methods or further processing.
         """
+        self.warm_start = False
 
-        # check if settings.json exists
-        path = self.get_settings_path()
+        # upload new files, their ids are part of the configuration
+        self._upload_files()
 
         # load assistant from id
         if self.id:
-            self.assistant = self.client.beta.assistants.retrieve(self.id)
+            self.assistant = self._find_assistant(self.id) or self.client.beta.assistants.retrieve(self.id)
             self.instructions = self.assistant.instructions
             self.name = self.assistant.name
             self.description = self.assistant.description
             self.file_ids = self.assistant.file_ids
-            self.metadata = self.assistant.metadata
+            self.metadata = {k: v for k, v in self.assistant.metadata.items() if k != FINGERPRINT_METADATA_KEY}
             self.model = self.assistant.model
             # update assistant if parameters are different
-            if not self._check_parameters(self.assistant.model_dump()):
+            if self.assistant.metadata.get(FINGERPRINT_METADATA_KEY) != self.get_fingerprint():
                 self._update_assistant()
             return self
 
-        # load assistant from settings
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                # iterate settings and find the assistant with the same name
-                for assistant_settings in settings:
-                    if assistant_settings['name'] == self.name:
-                        try:
-                            self.assistant = self.client.beta.assistants.retrieve(assistant_settings['id'])
-                            self.id = assistant_settings['id']
-                            # update assistant if parameters are different
-                            if not self._check_parameters(self.assistant.model_dump()):
-                                print("Updating assistant... " + self.name)
-                                self._update_assistant()
-                            self._update_settings()
-                            return self
-                        except NotFoundError:
-                            continue
+        settings = self.get_settings_store().find_by_name(self.name)
+
+        # load assistant from settings without api calls, if nothing changed since it was saved
+        fingerprint = self.get_fingerprint()
+        for assistant_settings in settings:
+            if (assistant_settings.get('metadata') or {}).get(FINGERPRINT_METADATA_KEY) == fingerprint:
+                self.assistant = Assistant.model_validate(assistant_settings)
+                self.id = assistant_settings['id']
+                self.warm_start = True
+                return self
+
+        # load assistant from settings, trying the assistants with the same name in order
+        for assistant_settings in settings:
+            assistant = self._find_assistant(assistant_settings['id'])
+            if assistant is None:
+                continue
+            self.assistant = assistant
+            self.id = assistant_settings['id']
+            # update assistant if parameters are different
+            if self.assistant.metadata.get(FINGERPRINT_METADATA_KEY) != fingerprint:
+                print("Updating assistant... " + self.name)
+                try:
+                    self._update_assistant()
+                except NotFoundError:
+                    # deleted since the assistant was found
+                    if self.assistant_resolver:
+                        self.assistant_resolver.remove(self.id)
+                    self.id = None
+                    continue
+            self._update_settings()
+            return self
 
         # create assistant if settings.json does not exist or assistant with the same name does not exist
-        self.assistant = self.client.beta.assistants.create(
-            name=self.name,
-            description=self.description,
-            instructions=self.instructions,
-            tools=self.get_oai_tools(),
-            file_ids=self.file_ids,
-            metadata=self.metadata,
-            model=self.model
-        )
-
-        self.id = self.assistant.id
-
-        self._save_settings()
+        self._create_assistant()
 
         return self
 
-    def _update_assistant(self):
+    def verify_assistant(self):
         """
-        Updates the existing assistant's parameters on the OpenAI server.
-
-        This method updates the assistant's details such as name, description, instructions, tools, file IDs, metadata, and the model. It only updates parameters that have non-empty values. After updating the assistant, it also updates the local settings file to reflect these changes.
-
-        No input parameters are directly passed to this method as it uses the agent's instance attributes.
+        Checks the assistant of the agent against the API, and fixes it if it was changed or deleted since its settings
+        were saved, for example after a warm start.
 
-        No output parameters are returned, but the method updates the assistant's details on the OpenAI server and locally updates the settings file.
+        Returns:
+            str: "ok" if the assistant matches the agent, "updated" if it was updated, or "recreated" if it was deleted and created again.
+        """
+        assistant = self._find_assistant(self.id)
+        if assistant is None:
+            self.get_settings_store().delete(self.id)
+            self._create_assistant()
+            return "recreated"
+
+        self.assistant = assistant
+        if assistant.metadata.get(FINGERPRINT_METADATA_KEY) == self.get_fingerprint() \
+                and self._check_parameters(assistant.model_dump()):
+            self._update_settings()
+            return "ok"
+
+        # forget the fingerprint, so that all parameters are compared
+        self.assistant = assistant.model_copy(update={"metadata": {k: v for k, v in assistant.metadata.items()
+                                                                   if k != FINGERPRINT_METADATA_KEY}})
+        self._update_assistant()
+        return "updated"
+
+    def get_fingerprint(self) -> str:
         """
+        Returns a hash of the configuration of the assistant: name, description, instructions, tool schemas, file ids,
+        metadata and model. It is stored in the metadata of the assistant, to detect changes without comparing all
+        parameters.
+        """
+        params = self._get_assistant_params()
+        params["tools"] = sorted(json.dumps(tool, sort_keys=True) for tool in params["tools"])
+        params["file_ids"] = sorted(params["file_ids"])
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
 
-        params = {
+    def _get_assistant_params(self):
+        return {
             "name": self.name,
             "description": self.description,
             "instructions": self.instructions,
@@ -197,35 +264,84 @@ class Agent():
             "metadata": self.metadata,
             "model": self.model
         }
-        params = {k: v for k, v in params.items() if v}
-        self.assistant = self.client.beta.assistants.update(
-            self.id,
-            **params,
-        )
+
+    def _find_assistant(self, assistant_id: str) -> Optional[Assistant]:
+        """
+        Returns the assistant with the given id, or None if it does not exist. With an assistant resolver, the
+        assistant is looked up in the list of all assistants, and only retrieved if it is not in the list.
+        """
+        if self.assistant_resolver:
+            return self.assistant_resolver.get(assistant_id)
+        try:
+            return self.client.beta.assistants.retrieve(assistant_id)
+        except NotFoundError:
+            return None
+
+    def _create_assistant(self):
+        params = self._get_assistant_params()
+        params["metadata"] = {**self.metadata, FINGERPRINT_METADATA_KEY: self.get_fingerprint()}
+        self.assistant = self.client.beta.assistants.create(**params)
+
+        self.id = self.assistant.id
+        if self.assistant_resolver:
+            self.assistant_resolver.update(self.assistant)
+
+        self._save_settings()
+
+    def _update_assistant(self):
+        """
+        Updates the existing assistant's parameters on the OpenAI server.
+
+        This method updates the assistant's details such as name, description, instructions, tools, file IDs, metadata, and the model. It only sends parameters that have non-empty values and differ from the current assistant, along with the new fingerprint. After updating the assistant, it also updates the local settings file to reflect these changes.
+
+        No input parameters are directly passed to this method as it uses the agent's instance attributes.
+
+        No output parameters are returned, but the method updates the assistant's details on the OpenAI server and locally updates the settings file.
+        """
+        current = self.assistant.model_dump()
+        params = self._get_assistant_params()
+        params["metadata"] = {**self.metadata, FINGERPRINT_METADATA_KEY: self.get_fingerprint()}
+        params = {k: v for k, v in params.items() if v and not self._is_param_equal(k, v, current.get(k))}
+        if params:
+            self.assistant = self.client.beta.assistants.update(
+                self.id,
+                **params,
+            )
+            if self.assistant_resolver:
+                self.assistant_resolver.update(self.assistant)
         self._update_settings()
 
+    @staticmethod
+    def _is_param_equal(name, value, current):
+        if name == "tools":
+            return sorted(json.dumps(tool, sort_keys=True) for tool in value) == \
+                sorted(json.dumps(tool, sort_keys=True) for tool in current or [])
+        if name == "file_ids":
+            return set(value) == set(current or [])
+        return value == current
+
     def _upload_files(self):
-        def add_id_to_file(f_path, id):
-            """Add file id to file name"""
-            if os.path.isfile(f_path):
-                file_name, file_ext = os.path.splitext(f_path)
-                f_path_new = file_name + "_" + id + file_ext
-                os.rename(f_path, f_path_new)
-                return f_path_new
+        """
+        Uploads the files in the files folders of the agent that were not uploaded before, and adds their ids to the
+        file ids of the agent. Files are identified by their content with the file uploader, so renamed or copied files
+        are not uploaded again. Called once, when the assistant is initialized.
+        """
+        if self._files_uploaded:
+            return
 
         def get_id_from_file(f_path):
-            """Get file id from file name"""
-            if os.path.isfile(f_path):
-                file_name, file_ext = os.path.splitext(f_path)
-                file_name = os.path.basename(file_name)
-                file_name = file_name.split("_")
-                if len(file_name) > 1:
-                    return file_name[-1] if "file-" in file_name[-1] else None
-                else:
-                    return None
+            """Get file id from file name, for files renamed by previous versions"""
+            file_name, file_ext = os.path.splitext(f_path)
+            file_name = os.path.basename(file_name)
+            file_name = file_name.split("_")
+            if len(file_name) > 1:
+                return file_name[-1] if "file-" in file_name[-1] else None
+            else:
+                return None
 
         files_folders = self.files_folder if isinstance(self.files_folder, list) else [self.files_folder]
 
+        new_f_paths = []
         for files_folder in files_folders:
             if isinstance(files_folder, str):
                 f_path = files_folder
@@ -239,38 +355,48 @@ class Agent():
 
                     f_paths = [f for f in f_paths if not f.startswith(".")]
 
-                    f_paths = [os.path.join(f_path, f) for f in f_paths]
+                    f_paths = [os.path.join(f_path, f.strip()) for f in f_paths]
 
-                    # uploading files
                     for f_path in f_paths:
-                        f_path = f_path.strip()
+                        if not os.path.isfile(f_path):
+                            continue
                         file_id = get_id_from_file(f_path)
                         if file_id:
                             print("File already uploaded. Skipping... " + os.path.basename(f_path))
-                            self.file_ids.append(file_id)
+                            self._add_file_id(file_id)
                         else:
-                            print("Uploading new file... " + os.path.basename(f_path))
-                            with open(f_path, 'rb') as f:
-                                file_id = self.client.with_options(
-                                    timeout=80 * 1000,
-                                ).files.create(file=f, purpose="assistants").id
-                                self.file_ids.append(file_id)
-                                f.close()
-                            add_id_to_file(f_path, file_id)
+                            new_f_paths.append(f_path)
                 else:
                     print(f"Files folder '{f_path}' is not a directory. Skipping...", )
             else:
                 print("Files folder path must be a string or list of strings. Skipping... ", files_folder)
 
+        if new_f_paths:
+            file_uploader = self.get_file_uploader()
+            for f_path in new_f_paths:
+                if file_uploader.get_file_id(f_path):
+                    print("File already uploaded. Skipping... " + os.path.basename(f_path))
+                else:
+                    print("Uploading new file... " + os.path.basename(f_path))
+            for file_id in file_uploader.upload(new_f_paths):
+                self._add_file_id(file_id)
+        # files that failed to upload are uploaded on the next call
+        self._files_uploaded = True
+
         if Retrieval not in self.tools and CodeInterpreter not in self.tools and self.file_ids:
             print("Detected files without Retrieval. Adding Retrieval tool...")
             self.add_tool(Retrieval)
 
+    def _add_file_id(self, file_id):
+        if file_id not in self.file_ids:
+            self.file_ids.append(file_id)
+
     # --- Tool Methods ---
 
     def add_tool(self, tool):
         if not isinstance(tool, type):
             raise Exception("Tool must not be initialized.")
+        self._functions = None
         if issubclass(tool, Retrieval):
             # check that tools name is not already in tools
             for t in self.tools:
@@ -292,6 +418,32 @@ class Agent():
         else:
             raise Exception("Invalid tool type.")
 
+    def _check_functions_index(self):
+        """
+        Rebuilds the cached function list and name index if the tools have changed since they were built.
+        """
+        tools_state = (id(self.tools), len(self.tools))
+        if self._functions is None or self._functions_tools_state != tools_state:
+            self._functions = [tool for tool in self.tools if issubclass(tool, BaseTool)]
+            self._functions_index = {tool.__name__: tool for tool in self._functions}
+            self._functions_tools_state = tools_state
+
+    def _load_tool(self, lazy_tool):
+        """
+        Imports the tool of a lazy tool and replaces the lazy tool with it. If the tool can not be imported, the lazy
+        tool is returned, and calling it returns the error.
+        """
+        try:
+            tool = lazy_tool.load()
+        except Exception as e:
+            print(f"Error loading tool {lazy_tool.__name__}: {e}")
+            return lazy_tool
+
+        if lazy_tool in self.tools:
+            self.tools[self.tools.index(lazy_tool)] = tool
+            self._functions = None
+        return tool
+
     def get_oai_tools(self):
         tools = []
         for tool in self.tools:
@@ -366,6 +518,7 @@ class Agent():
             self.tools_folder = os.path.normpath(self.tools_folder)
 
         if os.path.isdir(self.tools_folder):
+            manifest = ToolManifest(self.tools_folder) if self.lazy_tools else None
             f_paths = os.listdir(self.tools_folder)
             f_paths = [f for f in f_paths if not f.startswith(".") and not f.startswith("__")]
             f_paths = [os.path.join(self.tools_folder, f) for f in f_paths]
@@ -374,12 +527,14 @@ class Agent():
                     continue
                 if os.path.isfile(f_path):
                     try:
-                        tool = ToolFactory.from_file(f_path)
+                        tool = manifest.get_tool(f_path) if manifest else ToolFactory.from_file(f_path)
                         self.add_tool(tool)
                     except Exception as e:
                         print(f"Error parsing tool file {os.path.basename(f_path)}: {e}. Skipping...")
                 else:
                     print("Items in tools folder must be files. Skipping... ", f_path)
+            if manifest:
+                manifest.save()
         else:
             print("Tools folder path is not a directory. Skipping... ", self.tools_folder)
 
@@ -388,7 +543,8 @@ class Agent():
         if self.assistant is None:
             raise Exception("Assistant is not initialized. Please initialize the agency first, before using this method")
 
-        return ToolFactory.get_openapi_schema(self.tools, url)
+        tools = [self._load_tool(tool) if issubclass(tool, LazyTool) else tool for tool in self.tools]
+        return ToolFactory.get_openapi_schema(tools, url)
 
     # --- Settings Methods ---
 
@@ -416,7 +572,8 @@ class Agent():
             return False
         if set(self.file_ids) != set(assistant_settings['file_ids']):
             return False
-        metadata_diff = DeepDiff(self.metadata, assistant_settings['metadata'], ignore_order=True)
+        metadata = {k: v for k, v in assistant_settings['metadata'].items() if k != FINGERPRINT_METADATA_KEY}
+        metadata_diff = DeepDiff(self.metadata, metadata, ignore_order=True)
         if metadata_diff != {}:
             return False
         if self.model != assistant_settings['model']:
@@ -424,38 +581,33 @@ class Agent():
         return True
 
     def _save_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if not os.path.isfile(path):
-            with open(path, 'w') as f:
-                json.dump([self.assistant.model_dump()], f, indent=4)
-        else:
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                settings.append(self.assistant.model_dump())
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        self.get_settings_store().save(self.assistant.model_dump())
 
     def _update_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if os.path.isfile(path):
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                for i, assistant_settings in enumerate(settings):
-                    if assistant_settings['id'] == self.id:
-                        settings[i] = self.assistant.model_dump()
-                        break
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        store = self.get_settings_store()
+        if store.get(self.id) is not None:
+            store.save(self.assistant.model_dump())
 
     # --- Helper Methods ---
 
     def get_settings_path(self):
         return self.settings_path
 
+    def get_file_uploader(self) -> FileUploader:
+        if self.file_uploader is None:
+            manifest_path = os.path.join(os.path.dirname(self.get_settings_path()), "files_manifest.json")
+            self.file_uploader = FileUploader(self.client, manifest_path=manifest_path)
+        return self.file_uploader
+
+    def get_settings_store(self) -> SettingsStore:
+        if self.settings_store is not None:
+            return self.settings_store
+        # the default store is created once and only replaced if settings_path changes
+        settings_path = self.get_settings_path()
+        if self._default_settings_store is None or self._default_settings_store.path != settings_path:
+            self._default_settings_store = JsonFileSettingsStore(settings_path)
+        return self._default_settings_store
+
     def _read_instructions(self):
         class_instructions_path = os.path.normpath(os.path.join(self.get_class_folder_path(), self.instructions))
         if os.path.isfile(class_instructions_path):
@@ -499,21 +651,13 @@ class Agent():
     def _delete_files(self):
         for file_id in self.file_ids:
             self.client.files.delete(file_id)
+        self.get_file_uploader().forget(self.file_ids)
 
     def _delete_assistant(self):
         self.client.beta.assistants.delete(self.id)
+        if self.assistant_resolver:
+            self.assistant_resolver.remove(self.id)
         self._delete_settings()
 
     def _delete_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if os.path.isfile(path):
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                for i, assistant_settings in enumerate(settings):
-                    if assistant_settings['id'] == self.id:
-                        settings.pop(i)
-                        break
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        self.get_settings_store().delete(self.id)
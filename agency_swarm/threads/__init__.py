@@ -1 +1,3 @@
 from .thread import Thread
+from .async_thread import AsyncThread
+from .worker_pool import WorkerPool
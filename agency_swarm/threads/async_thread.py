@@ -0,0 +1,451 @@
+import asyncio
+import contextvars
+import inspect
+import warnings
+from collections import deque
+from typing import Literal
+
+from openai import BadRequestError
+
+from agency_swarm.agents import Agent
+from agency_swarm.threads.run_waiter import AsyncRunWaiter
+from agency_swarm.tools.ToolOutputPolicy import count_tokens
+from agency_swarm.user import User
+from agency_swarm.util.cancellation import CancellationToken, PartialResult
+from agency_swarm.util.oai import get_async_openai_client
+from agency_swarm.util.retry_policy import RetryPolicy
+from agency_swarm.util.streaming import AsyncAgencyEventHandler
+from agency_swarm.util.tracing import get_tracer, get_current_span
+from agency_swarm.util.usage import UsageTracker
+
+
+class AsyncThread:
+    """
+    Asyncio counterpart of Thread built on the AsyncOpenAI client.
+
+    Tools with an 'async def run' method are awaited directly, while synchronous tools are offloaded to the event loop
+    executor, so that a single event loop can serve many concurrent conversations. Yielding intermediate messages is
+    not supported, use an event handler to observe the conversation instead.
+    """
+    id: str = None
+    thread = None
+    run = None
+    run_messages = None
+    cancellation_token: CancellationToken = None
+    request_usage: UsageTracker = None
+    session = None  # the AgencySession of the thread, if any
+
+    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent, run_waiter: AsyncRunWaiter = None,
+                 parallel_tool_calls: bool = False, retry_policy: RetryPolicy = None,
+                 usage_tracker: UsageTracker = None):
+        self.agent = agent
+        self.recipient_agent = recipient_agent
+        self.run_waiter = run_waiter if run_waiter else AsyncRunWaiter()
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.usage_tracker = usage_tracker if usage_tracker else UsageTracker()
+        self._replay_outputs = {}
+        self.parallel_tool_calls = parallel_tool_calls
+        self.tool_output_stats = deque(maxlen=1000)
+
+        self.client = get_async_openai_client()
+
+    async def init_thread(self):
+        if self.thread:
+            self.id = self.thread.id
+        elif self.id:
+            with get_tracer().span("api.threads.retrieve", "api", {"thread_id": self.id}):
+                self.thread = await self.client.beta.threads.retrieve(self.id)
+        else:
+            with get_tracer().span("api.threads.create", "api") as span:
+                self.thread = await self.client.beta.threads.create()
+                span.set_attribute("thread_id", self.thread.id)
+            self.id = self.thread.id
+
+    async def get_completion_stream(self, message: str, event_handler: type(AsyncAgencyEventHandler),
+                                    message_files=None, recipient_agent=None, additional_instructions: str = None,
+                                    cancellation_token: CancellationToken = None,
+                                    request_usage: UsageTracker = None):
+        return await self.get_completion(message, message_files, recipient_agent, additional_instructions,
+                                         event_handler, cancellation_token, request_usage)
+
+    async def get_completion(self, message: str, message_files=None, recipient_agent=None,
+                             additional_instructions: str = None,
+                             event_handler: type(AsyncAgencyEventHandler) = None,
+                             cancellation_token: CancellationToken = None, request_usage: UsageTracker = None):
+        with get_tracer().span("thread.get_completion", "thread", {
+            "sender": self.agent.name,
+            "recipient": recipient_agent.name if recipient_agent else self.recipient_agent.name,
+            "thread_id": self.id,
+            "message_bytes": len(message.encode()),
+            "retries": 0,
+        }) as span:
+            result = await self._get_completion(message, message_files, recipient_agent, additional_instructions,
+                                                event_handler, cancellation_token, request_usage)
+            span.set_attribute("thread_id", self.id)
+            if isinstance(result, PartialResult):
+                span.set_status("cancelled", result.reason)
+            return result
+
+    async def _get_completion(self, message: str, message_files=None, recipient_agent=None,
+                              additional_instructions: str = None,
+                              event_handler: type(AsyncAgencyEventHandler) = None,
+                              cancellation_token: CancellationToken = None, request_usage: UsageTracker = None):
+        self.cancellation_token = cancellation_token
+        self.request_usage = request_usage
+        if cancellation_token and cancellation_token.cancelled:
+            return PartialResult("", cancellation_token.reason, self.agent.name,
+                                 (recipient_agent or self.recipient_agent).name)
+
+        if not self.id:
+            await self.init_thread()
+
+        if not recipient_agent:
+            recipient_agent = self.recipient_agent
+
+        if event_handler:
+            event_handler.agent_name = self.agent.name
+            event_handler.recipient_agent_name = recipient_agent.name
+
+        # Determine the sender's name based on the agent type
+        sender_name = "user" if isinstance(self.agent, User) else self.agent.name
+        playground_url = f'https://platform.openai.com/playground?assistant={recipient_agent.assistant.id}&mode=assistant&thread={self.id}'
+        print(f'THREAD:[ {sender_name} -> {recipient_agent.name} ]: URL {playground_url}')
+
+        # send message
+        await self._create_message(message, message_files)
+
+        self._replay_outputs = {}
+        await self._create_run(recipient_agent, additional_instructions, event_handler)
+
+        retry_policy = recipient_agent.retry_policy if recipient_agent.retry_policy else self.retry_policy
+        error_attempts = 0
+        validation_attempts = 0
+        full_message = ""
+        while True:
+            await self._run_until_done(recipient_agent)
+
+            if cancellation_token and cancellation_token.cancelled:
+                return await self._get_partial_result(full_message, recipient_agent)
+
+            # function execution
+            if self.run.status == "requires_action":
+                tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
+                outputs = await self._execute_tools(tool_calls, recipient_agent, event_handler, retry_policy)
+
+                if cancellation_token and cancellation_token.cancelled:
+                    # outputs of the calls that were executed, nested threads return partial results
+                    tool_outputs = [{"tool_call_id": tool_call.id, "output": output}
+                                    for tool_call, output in zip(tool_calls, outputs) if output is not None]
+                    return await self._get_partial_result(full_message, recipient_agent, tool_outputs)
+
+                tool_outputs = [{"tool_call_id": tool_call.id,
+                                 "output": await self._limit_tool_output(tool_call, str(output), recipient_agent)}
+                                for tool_call, output in zip(tool_calls, outputs)]
+                self._replay_outputs = {}
+
+                # submit tool outputs
+                try:
+                    await self._submit_tool_outputs(tool_outputs, event_handler)
+                except BadRequestError as e:
+                    if not retry_policy.should_retry(e, error_attempts):
+                        raise e
+
+                    # the run expired, ask the agent to repeat the calls and replay the computed outputs
+                    for tool_call, output in zip(tool_calls, outputs):
+                        self._replay_outputs.setdefault(self._get_replay_key(tool_call), []).append(output)
+
+                    await self._create_message("Please repeat the exact same function calls again in the same order.")
+                    await self._create_run(recipient_agent, additional_instructions, event_handler)
+                    error_attempts += 1
+                    get_current_span().set_attribute("retries", error_attempts)
+            # error
+            elif self.run.status == "failed":
+                full_message += await self._get_last_message_text() + "\n"
+                if not retry_policy.should_retry(self.run.last_error, error_attempts):
+                    raise Exception("OpenAI Run Failed. Error: ", self.run.last_error.message)
+
+                await self.run_waiter.sleep(retry_policy.get_delay(error_attempts, self.run.last_error),
+                                            cancellation_token)
+                # the first retry only restarts the run
+                if error_attempts >= 1 and retry_policy.continue_message:
+                    await self._create_message(retry_policy.continue_message)
+                await self._create_run(recipient_agent, additional_instructions, event_handler)
+                error_attempts += 1
+                get_current_span().set_attribute("retries", error_attempts)
+            # return assistant message
+            else:
+                full_message += await self._get_last_message_text()
+
+                if recipient_agent.response_validator:
+                    try:
+                        if isinstance(recipient_agent, Agent):
+                            recipient_agent.response_validator(message=full_message)
+                    except Exception as e:
+                        full_message = ""
+                        if validation_attempts < recipient_agent.validation_attempts:
+                            message = await self._create_message(str(e))
+
+                            if event_handler:
+                                handler = event_handler()
+                                await handler.on_message_created(message)
+                                await handler.on_message_done(message)
+
+                            validation_attempts += 1
+
+                            await self._create_run(recipient_agent, additional_instructions, event_handler)
+
+                            continue
+
+                return full_message
+
+    async def _create_run(self, recipient_agent, additional_instructions, event_handler):
+        self.run = await self.run_waiter.create_run(self.client,
+                                                    self.id,
+                                                    event_handler=event_handler,
+                                                    cancellation_token=self.cancellation_token,
+                                                    assistant_id=recipient_agent.id,
+                                                    additional_instructions=additional_instructions)
+        # messages created by the run, None if they are not known locally
+        self.run_messages = self.run_waiter.last_messages
+
+    async def cancel_run(self):
+        """Cancels the current run if it is still active, for example after the completion timed out."""
+        await self.run_waiter.cancel_run(self.client, self.id, self.run)
+
+    async def _get_partial_result(self, full_message, recipient_agent, tool_outputs=None):
+        """
+        Cancels the current run, if it is still active, and returns what was received before the cancellation.
+        """
+        await self.cancel_run()
+        if self.run.status == "completed":
+            full_message += await self._get_last_message_text()
+
+        return PartialResult(full_message, self.cancellation_token.reason, self.agent.name, recipient_agent.name,
+                             tool_outputs)
+
+    async def _create_message(self, content: str, message_files=None):
+        with get_tracer().span("api.messages.create", "api", {"thread_id": self.id,
+                                                              "payload_bytes": len(content.encode()),
+                                                              "files": len(message_files) if message_files else 0}):
+            return await self.client.beta.threads.messages.create(
+                thread_id=self.id,
+                role="user",
+                content=content,
+                file_ids=message_files if message_files else [],
+            )
+
+    async def _run_until_done(self, recipient_agent=None):
+        self.run = await self.run_waiter.wait(self.client, self.id, self.run, self.cancellation_token)
+        self._record_usage(recipient_agent if recipient_agent else self.recipient_agent)
+
+    def _record_usage(self, recipient_agent):
+        """
+        Records the token usage of the run, which is only reported once the run is no longer active.
+        """
+        usage = getattr(self.run, "usage", None)
+        if not usage or self.run.status in ["queued", "in_progress", "requires_action", "cancelling"]:
+            return
+
+        model = getattr(self.run, "model", None)
+        for tracker in (self.usage_tracker, self.request_usage):
+            if tracker:
+                tracker.record(self.agent.name, recipient_agent.name, model, usage)
+
+    async def _submit_tool_outputs(self, tool_outputs, event_handler):
+        self.run = await self.run_waiter.submit_tool_outputs(self.client,
+                                                             self.id,
+                                                             self.run.id,
+                                                             tool_outputs,
+                                                             event_handler=event_handler,
+                                                             cancellation_token=self.cancellation_token)
+        if self.run_messages is not None and self.run_waiter.last_messages is not None:
+            self.run_messages = self.run_messages + self.run_waiter.last_messages
+        else:
+            self.run_messages = None
+
+    async def _get_last_message_text(self):
+        messages = await self._get_run_messages()
+
+        if len(messages) == 0:
+            return ""
+
+        return "".join(content.text.value for content in messages[-1].content if content.type == "text")
+
+    async def _get_run_messages(self):
+        """
+        Returns the messages created by the current run in chronological order.
+
+        Messages are taken from the run streams when available, without any API calls. Otherwise, they are fetched
+        with a single paginated list request, that stops at the first message not created by the run.
+        """
+        if self.run_messages is not None:
+            return self.run_messages
+
+        messages = []
+        with get_tracer().span("api.messages.list", "api", {"thread_id": self.id, "run_id": self.run.id}) as span:
+            async for message in self.client.beta.threads.messages.list(thread_id=self.id, order="desc", limit=10):
+                if message.run_id != self.run.id:
+                    break
+                messages.append(message)
+            span.set_attribute("messages", len(messages))
+
+        self.run_messages = messages[::-1]
+        return self.run_messages
+
+    async def _limit_tool_output(self, tool_call, output: str, recipient_agent):
+        """
+        Applies the output policy of the tool, or of the recipient agent, to the tool output and records its size.
+        Large outputs are processed in the executor, since summarizers and file uploads are blocking.
+        """
+        func = recipient_agent.get_function(tool_call.function.name)
+        policy = func.output_policy if func and func.output_policy else recipient_agent.tool_output_policy
+
+        original_bytes = len(output.encode())
+        if policy and policy.exceeds(output):
+            loop = asyncio.get_running_loop()
+            try:
+                # the context is copied so that spans in the policy keep their parent
+                output = await loop.run_in_executor(None, contextvars.copy_context().run, policy.apply, output,
+                                                    tool_call.function.name, tool_call.id)
+            except Exception as e:
+                warnings.warn(f"Output policy failed for {tool_call.function.name}, truncating the output: {e}")
+                output = policy.truncate(output, policy.max_bytes)
+
+        self.tool_output_stats.append({
+            "tool_name": tool_call.function.name,
+            "tool_call_id": tool_call.id,
+            "original_bytes": original_bytes,
+            "bytes": len(output.encode()),
+            "tokens": count_tokens(output),
+        })
+        return output
+
+    @staticmethod
+    def _get_replay_key(tool_call):
+        return tool_call.function.name, tool_call.function.arguments
+
+    async def _execute_tools(self, tool_calls, recipient_agent, event_handler, retry_policy=None):
+        """
+        Executes the tool calls of a run step and returns their outputs in the same order.
+
+        With parallel_tool_calls, independent tool calls are gathered concurrently. Tools marked with
+        one_call_at_a_time or serial_only are always executed one after another, after the concurrent ones.
+        Outputs of identical calls executed before the previous run expired are replayed instead. Once the
+        cancellation token is cancelled, the remaining serial calls are skipped and their outputs are None.
+        """
+        outputs = [None] * len(tool_calls)
+        tool_names = []
+
+        serial_indexes = []
+        for i, tool_call in enumerate(tool_calls):
+            replay_outputs = self._replay_outputs.get(self._get_replay_key(tool_call))
+            if replay_outputs:
+                outputs[i] = replay_outputs.pop(0)
+                tool_names.append(tool_call.function.name)
+                (retry_policy if retry_policy else self.retry_policy).record_replay()
+            else:
+                serial_indexes.append(i)
+
+        if self.parallel_tool_calls:
+            parallel_indexes = []
+            for i in serial_indexes:
+                func = recipient_agent.get_function(tool_calls[i].function.name)
+                if func and not func.serial_only and not func.model_fields["one_call_at_a_time"].default:
+                    parallel_indexes.append(i)
+            serial_indexes = [i for i in serial_indexes if i not in parallel_indexes]
+
+            results = await asyncio.gather(*[self.execute_tool(tool_calls[i], recipient_agent, event_handler)
+                                             for i in parallel_indexes])
+            for i, output in zip(parallel_indexes, results):
+                outputs[i] = output
+                tool_names.append(tool_calls[i].function.name)
+
+        for i in serial_indexes:
+            if self.cancellation_token and self.cancellation_token.cancelled:
+                break
+            outputs[i] = await self.execute_tool(tool_calls[i], recipient_agent, event_handler, tool_names)
+            tool_names.append(tool_calls[i].function.name)
+
+            if event_handler:
+                # nested threads change the agent names on the event handler
+                event_handler.agent_name = self.agent.name
+                event_handler.recipient_agent_name = recipient_agent.name
+
+        return outputs
+
+    async def execute_tool(self, tool_call, recipient_agent=None, event_handler=None, tool_names=[]):
+        if not recipient_agent:
+            recipient_agent = self.recipient_agent
+
+        with get_tracer().span("tool.execute", "tool", {
+            "tool_name": tool_call.function.name,
+            "tool_call_id": tool_call.id,
+            "agent": recipient_agent.name,
+            "arguments_bytes": len(tool_call.function.arguments.encode()),
+        }) as span:
+            output = await self._execute_tool(tool_call, recipient_agent, event_handler, tool_names)
+
+            span.set_attribute("output_bytes", len(str(output).encode()))
+            if isinstance(output, str) and output.startswith("Error:"):
+                span.set_status("error", output)
+            elif isinstance(output, PartialResult):
+                span.set_status("cancelled", output.reason)
+            return output
+
+    async def _execute_tool(self, tool_call, recipient_agent, event_handler, tool_names):
+        func = recipient_agent.get_function(tool_call.function.name)
+
+        if not func:
+            return f"Error: Function {tool_call.function.name} not found. Available functions: {[func.__name__ for func in recipient_agent.functions]}"
+
+        try:
+            # init tool
+            func = func.from_arguments(tool_call.function.arguments)
+            for tool_name in tool_names:
+                if tool_name == tool_call.function.name and (
+                        hasattr(func, "one_call_at_a_time") and func.one_call_at_a_time):
+                    return f"Error: Function {tool_call.function.name} is already called. You can only call this function once at a time. Please wait for the previous call to finish before calling it again."
+            func.caller_agent = recipient_agent
+            func.event_handler = event_handler
+            func.cancellation_token = self.cancellation_token
+            func.request_usage = self.request_usage
+            func._session = self.session
+            func._caller_thread = self
+            # return cached output for identical calls
+            cache_key = None
+            if func.cache_results:
+                cache_key = func.get_cache_key()
+                hit, output = func.get_cache().get(cache_key)
+                get_current_span().set_attribute("cached", hit)
+                if hit:
+                    return output
+
+            # get outputs from the tool
+            if inspect.iscoroutinefunction(func.run):
+                output = await func.run()
+            else:
+                loop = asyncio.get_running_loop()
+                # the context is copied so that spans and nested calls of the tool keep their parent
+                output = await loop.run_in_executor(None, contextvars.copy_context().run, self._run_sync_tool, func)
+
+            if cache_key:
+                func.cache_output(cache_key, output)
+
+            return output
+        except Exception as e:
+            error_message = f"Error: {e}"
+            if "For further information visit" in error_message:
+                error_message = error_message.split("For further information visit")[0]
+            return error_message
+
+    @staticmethod
+    def _run_sync_tool(func):
+        output = func.run()
+        if inspect.isgenerator(output):
+            # intermediate messages are not yielded in async mode
+            try:
+                while True:
+                    next(output)
+            except StopIteration as e:
+                output = e.value
+        return output
@@ -0,0 +1,400 @@
+import asyncio
+import time
+from collections import deque
+
+from openai import BadRequestError, NotFoundError, APIConnectionError
+from openai.lib.streaming import AssistantEventHandler, AsyncAssistantEventHandler
+
+from agency_swarm.util.tracing import get_tracer
+
+
+class RunWaiter:
+    """
+    Waits for OpenAI runs to leave the 'queued', 'in_progress' and 'cancelling' states.
+
+    Runs are created and resumed through a streaming subscription whenever possible, so the waiter returns as soon as
+    the run requires action or finishes, without any polling. If streaming is disabled, not supported by the client,
+    or the stream is interrupted, the run is polled with an adaptive backoff that starts fast and slows down for long
+    running runs. The time spent waiting is recorded for every run.
+    """
+    pending_statuses = ['queued', 'in_progress', 'cancelling']
+
+    def __init__(self,
+                 use_streaming: bool = True,
+                 initial_interval: float = 0.05,
+                 max_interval: float = 2.0,
+                 backoff_factor: float = 1.5,
+                 max_recorded_runs: int = 100):
+        """
+        Initializes the RunWaiter.
+
+        Parameters:
+            use_streaming (bool, optional): Whether to wait on runs with a streaming subscription when possible. Defaults to True.
+            initial_interval (float, optional): The first polling interval in seconds. Defaults to 0.05.
+            max_interval (float, optional): The maximum polling interval in seconds. Defaults to 2.0.
+            backoff_factor (float, optional): The factor by which the polling interval grows after each poll. Defaults to 1.5.
+            max_recorded_runs (int, optional): The number of most recent run wait times to keep. Defaults to 100.
+        """
+        if initial_interval <= 0 or max_interval < initial_interval:
+            raise ValueError("Polling intervals must be positive and max_interval must be >= initial_interval.")
+        if backoff_factor < 1:
+            raise ValueError("Backoff factor must be >= 1.")
+
+        self.use_streaming = use_streaming
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+
+        # messages completed during the last streamed request, None if the request was not fully streamed
+        self.last_messages = None
+
+        # stats
+        self.run_wait_times = deque(maxlen=max_recorded_runs)  # (run_id, seconds)
+        self.total_wait_time = 0.0
+        self.poll_count = 0
+        self.stream_count = 0
+
+    def create_run(self, client, thread_id: str, event_handler=None, cancellation_token=None, **kwargs):
+        """
+        Creates a run on the thread and waits until it requires action or reaches a final status.
+
+        Parameters:
+            client: The OpenAI client.
+            thread_id (str): The id of the thread to create the run on.
+            event_handler (AssistantEventHandler, optional): User event handler class. If provided, the run is always streamed into it. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that cancels the run when it is cancelled. Defaults to None.
+            **kwargs: Additional parameters for the run, such as assistant_id and additional_instructions.
+
+        Returns:
+            Run: The run object after waiting.
+        """
+        runs = client.beta.threads.runs
+        self.last_messages = None
+
+        with get_tracer().span("api.runs.create", "api", {"thread_id": thread_id,
+                                                          "assistant_id": kwargs.get("assistant_id")}) as span:
+            run = None
+            if event_handler or self.use_streaming:
+                run = self._stream(lambda handler: runs.create_and_stream(thread_id=thread_id,
+                                                                          event_handler=handler,
+                                                                          **kwargs),
+                                   event_handler, client, thread_id, cancellation_token)
+            span.set_attribute("streamed", run is not None)
+            if run is None:
+                run = runs.create(thread_id=thread_id, **kwargs)
+            span.set_attribute("run_id", run.id)
+            span.set_attribute("run_status", run.status)
+
+        return self.wait(client, thread_id, run, cancellation_token)
+
+    def submit_tool_outputs(self, client, thread_id: str, run_id: str, tool_outputs: list, event_handler=None,
+                            cancellation_token=None):
+        """
+        Submits tool outputs to the run and waits until it requires action or reaches a final status.
+
+        Parameters:
+            client: The OpenAI client.
+            thread_id (str): The id of the thread the run belongs to.
+            run_id (str): The id of the run.
+            tool_outputs (list): A list of tool outputs with 'tool_call_id' and 'output' keys.
+            event_handler (AssistantEventHandler, optional): User event handler class. If provided, the run is always streamed into it. Defaults to None.
+            cancellation_token (CancellationToken, optional): Token that cancels the run when it is cancelled. Defaults to None.
+
+        Returns:
+            Run: The run object after waiting.
+        """
+        runs = client.beta.threads.runs
+        self.last_messages = None
+
+        with get_tracer().span("api.runs.submit_tool_outputs", "api", {
+            "thread_id": thread_id,
+            "run_id": run_id,
+            "tool_outputs": len(tool_outputs),
+            "payload_bytes": sum(len(str(tool_output["output"]).encode()) for tool_output in tool_outputs),
+        }) as span:
+            run = None
+            if event_handler or self.use_streaming:
+                run = self._stream(lambda handler: runs.submit_tool_outputs_stream(thread_id=thread_id,
+                                                                                   run_id=run_id,
+                                                                                   tool_outputs=tool_outputs,
+                                                                                   event_handler=handler),
+                                   event_handler, client, thread_id, cancellation_token)
+            span.set_attribute("streamed", run is not None)
+            if run is None:
+                run = runs.submit_tool_outputs(thread_id=thread_id, run_id=run_id, tool_outputs=tool_outputs)
+            span.set_attribute("run_status", run.status)
+
+        return self.wait(client, thread_id, run, cancellation_token)
+
+    def wait(self, client, thread_id: str, run, cancellation_token=None):
+        """
+        Polls the run with adaptive backoff until it leaves the pending statuses.
+
+        Parameters:
+            client: The OpenAI client.
+            thread_id (str): The id of the thread the run belongs to.
+            run: The run object to wait for.
+            cancellation_token (CancellationToken, optional): If the token is cancelled, the run is cancelled and returned without waiting for it to stop. Defaults to None.
+
+        Returns:
+            Run: The latest run object.
+        """
+        if run.status not in self.pending_statuses:
+            return run
+
+        start = time.perf_counter()
+        interval = self.initial_interval
+        while run.status in self.pending_statuses:
+            if cancellation_token:
+                cancelled = cancellation_token.wait(interval)
+            else:
+                cancelled = False
+                time.sleep(interval)
+
+            if cancelled:
+                self.cancel_run(client, thread_id, run)
+            with get_tracer().span("api.runs.retrieve", "api", {"thread_id": thread_id, "run_id": run.id}) as span:
+                run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+                span.set_attribute("run_status", run.status)
+            self.poll_count += 1
+            if cancelled:
+                break
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+        self._record(run.id, time.perf_counter() - start)
+        return run
+
+    def get_stats(self):
+        """Returns a summary of the time spent waiting on runs."""
+        return {
+            "runs": len(self.run_wait_times),
+            "total_wait_time": self.total_wait_time,
+            "last_wait_time": self.run_wait_times[-1][1] if self.run_wait_times else None,
+            "poll_count": self.poll_count,
+            "stream_count": self.stream_count,
+        }
+
+    @staticmethod
+    def cancel_run(client, thread_id: str, run):
+        """Cancels the run if it is still active."""
+        if not run or run.status not in ['queued', 'in_progress', 'requires_action']:
+            return
+        try:
+            with get_tracer().span("api.runs.cancel", "api", {"thread_id": thread_id, "run_id": run.id}):
+                client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+        except BadRequestError:
+            # run has already finished
+            pass
+
+    def _stream(self, open_stream, event_handler=None, client=None, thread_id=None, cancellation_token=None):
+        """
+        Consumes a run stream until the run requires action or finishes.
+
+        Returns the final run, or None if the stream could not be opened and the request should be sent without
+        streaming. If the stream is interrupted after the run has started, the last known run is returned, so that it
+        can be polled to completion.
+        """
+        start = time.perf_counter()
+        try:
+            manager = open_stream(event_handler() if event_handler else AssistantEventHandler())
+            stream = manager.__enter__()
+        except (BadRequestError, NotFoundError) as e:
+            if event_handler:
+                raise
+            self._fall_back_to_polling(e)
+            return None
+
+        # cancelling the run on the server ends the stream
+        callback_id = cancellation_token.add_callback(
+            lambda: self.cancel_run(client, thread_id, stream.current_run)) if cancellation_token else None
+
+        try:
+            try:
+                stream.until_done()
+                self.last_messages = self._get_stream_messages(stream)
+            except APIConnectionError:
+                if not stream.current_run:
+                    raise
+        finally:
+            manager.__exit__(None, None, None)
+            if callback_id is not None:
+                cancellation_token.remove_callback(callback_id)
+
+        run = stream.current_run
+        self.stream_count += 1
+        self._record(run.id, time.perf_counter() - start)
+        return run
+
+    def _fall_back_to_polling(self, error):
+        """
+        Handles an error opening a stream. The request is sent again without streaming. Streaming is only disabled for
+        later requests if the error says that streaming is not supported, not for errors of this request, such as a
+        thread that already has an active run.
+        """
+        if "stream" in str(getattr(error, "message", error)).lower():
+            self.use_streaming = False
+
+    @staticmethod
+    def _get_stream_messages(stream):
+        try:
+            return stream.get_final_messages()
+        except RuntimeError:
+            # no messages were created during the stream
+            return []
+
+    def _record(self, run_id, seconds):
+        self.run_wait_times.append((run_id, seconds))
+        self.total_wait_time += seconds
+
+
+class AsyncRunWaiter(RunWaiter):
+    """
+    Asyncio counterpart of RunWaiter for the AsyncOpenAI client. Polling sleeps with asyncio, so waiting runs do not
+    block the event loop.
+    """
+
+    async def create_run(self, client, thread_id: str, event_handler=None, cancellation_token=None, **kwargs):
+        runs = client.beta.threads.runs
+        self.last_messages = None
+
+        with get_tracer().span("api.runs.create", "api", {"thread_id": thread_id,
+                                                          "assistant_id": kwargs.get("assistant_id")}) as span:
+            run = None
+            if event_handler or self.use_streaming:
+                run = await self._stream(lambda handler: runs.create_and_stream(thread_id=thread_id,
+                                                                                event_handler=handler,
+                                                                                **kwargs),
+                                         event_handler, client, thread_id, cancellation_token)
+            span.set_attribute("streamed", run is not None)
+            if run is None:
+                run = await runs.create(thread_id=thread_id, **kwargs)
+            span.set_attribute("run_id", run.id)
+            span.set_attribute("run_status", run.status)
+
+        return await self.wait(client, thread_id, run, cancellation_token)
+
+    async def submit_tool_outputs(self, client, thread_id: str, run_id: str, tool_outputs: list,
+                                  event_handler=None, cancellation_token=None):
+        runs = client.beta.threads.runs
+        self.last_messages = None
+
+        with get_tracer().span("api.runs.submit_tool_outputs", "api", {
+            "thread_id": thread_id,
+            "run_id": run_id,
+            "tool_outputs": len(tool_outputs),
+            "payload_bytes": sum(len(str(tool_output["output"]).encode()) for tool_output in tool_outputs),
+        }) as span:
+            run = None
+            if event_handler or self.use_streaming:
+                run = await self._stream(lambda handler: runs.submit_tool_outputs_stream(thread_id=thread_id,
+                                                                                         run_id=run_id,
+                                                                                         tool_outputs=tool_outputs,
+                                                                                         event_handler=handler),
+                                         event_handler, client, thread_id, cancellation_token)
+            span.set_attribute("streamed", run is not None)
+            if run is None:
+                run = await runs.submit_tool_outputs(thread_id=thread_id, run_id=run_id, tool_outputs=tool_outputs)
+            span.set_attribute("run_status", run.status)
+
+        return await self.wait(client, thread_id, run, cancellation_token)
+
+    async def wait(self, client, thread_id: str, run, cancellation_token=None):
+        if run.status not in self.pending_statuses:
+            return run
+
+        start = time.perf_counter()
+        interval = self.initial_interval
+        while run.status in self.pending_statuses:
+            cancelled = await self.sleep(interval, cancellation_token)
+
+            if cancelled:
+                await self.cancel_run(client, thread_id, run)
+            with get_tracer().span("api.runs.retrieve", "api", {"thread_id": thread_id, "run_id": run.id}) as span:
+                run = await client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+                span.set_attribute("run_status", run.status)
+            self.poll_count += 1
+            if cancelled:
+                break
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+        self._record(run.id, time.perf_counter() - start)
+        return run
+
+    @staticmethod
+    async def sleep(seconds: float, cancellation_token=None) -> bool:
+        """
+        Sleeps for up to seconds without blocking the event loop, waking up early if the token is cancelled.
+
+        Returns:
+            bool: True if the token is cancelled.
+        """
+        if not cancellation_token:
+            await asyncio.sleep(seconds)
+            return False
+
+        loop = asyncio.get_running_loop()
+        cancelled = asyncio.Event()
+        # tokens are cancelled from other threads, for example by their deadline timer
+        callback_id = cancellation_token.add_callback(lambda: loop.call_soon_threadsafe(cancelled.set))
+        try:
+            await asyncio.wait_for(cancelled.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            cancellation_token.remove_callback(callback_id)
+        return cancellation_token.cancelled
+
+    @staticmethod
+    async def cancel_run(client, thread_id: str, run):
+        """Cancels the run if it is still active."""
+        if not run or run.status not in ['queued', 'in_progress', 'requires_action']:
+            return
+        try:
+            with get_tracer().span("api.runs.cancel", "api", {"thread_id": thread_id, "run_id": run.id}):
+                await client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+        except BadRequestError:
+            # run has already finished
+            pass
+
+    @staticmethod
+    async def _get_stream_messages(stream):
+        try:
+            return await stream.get_final_messages()
+        except RuntimeError:
+            # no messages were created during the stream
+            return []
+
+    async def _stream(self, open_stream, event_handler=None, client=None, thread_id=None, cancellation_token=None):
+        start = time.perf_counter()
+        try:
+            manager = open_stream(event_handler() if event_handler else AsyncAssistantEventHandler())
+            stream = await manager.__aenter__()
+        except (BadRequestError, NotFoundError) as e:
+            if event_handler:
+                raise
+            self._fall_back_to_polling(e)
+            return None
+
+        # cancelling the run on the server ends the stream
+        callback_id = None
+        if cancellation_token:
+            loop = asyncio.get_running_loop()
+            callback_id = cancellation_token.add_callback(lambda: loop.call_soon_threadsafe(
+                lambda: loop.create_task(self.cancel_run(client, thread_id, stream.current_run))))
+
+        try:
+            try:
+                await stream.until_done()
+                self.last_messages = await self._get_stream_messages(stream)
+            except APIConnectionError:
+                if not stream.current_run:
+                    raise
+        finally:
+            await manager.__aexit__(None, None, None)
+            if callback_id is not None:
+                cancellation_token.remove_callback(callback_id)
+
+        run = stream.current_run
+        self.stream_count += 1
+        self._record(run.id, time.perf_counter() - start)
+        return run
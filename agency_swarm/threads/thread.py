@@ -1,6 +1,11 @@
+import asyncio
+import contextvars
 import inspect
-import json
+import threading
 import time
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Literal
 
 from openai import BadRequestError
@@ -10,38 +15,96 @@ from agency_swarm.agents import Agent
 from agency_swarm.messages import MessageOutput
 from agency_swarm.user import User
 from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.retry_policy import RetryPolicy
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.tools.ToolOutputPolicy import count_tokens
+from agency_swarm.util.cancellation import CancellationToken, PartialResult
+from agency_swarm.util.tracing import get_tracer, get_current_span
+from agency_swarm.util.usage import UsageTracker
 
 
 class Thread:
     id: str = None
     thread = None
     run = None
+    run_messages = None
     stream = None
+    cancellation_token: CancellationToken = None
+    request_usage: UsageTracker = None
+    session = None  # the AgencySession of the thread, if any
 
-    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent):
+    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent, run_waiter: RunWaiter = None,
+                 parallel_tool_calls: bool = False, max_tool_workers: int = 8, retry_policy: RetryPolicy = None,
+                 usage_tracker: UsageTracker = None):
         self.agent = agent
         self.recipient_agent = recipient_agent
+        self.run_waiter = run_waiter if run_waiter else RunWaiter()
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.usage_tracker = usage_tracker if usage_tracker else UsageTracker()
+        self._replay_outputs = {}
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_workers = max_tool_workers
+        self._tool_executor = None
+        self.tool_output_stats = deque(maxlen=1000)
+        self._notifications = deque()
+        self._notifications_lock = threading.Lock()
 
         self.client = get_openai_client()
 
     def init_thread(self):
-        if self.id:
-            self.thread = self.client.beta.threads.retrieve(self.id)
+        if self.thread:
+            self.id = self.thread.id
+        elif self.id:
+            with get_tracer().span("api.threads.retrieve", "api", {"thread_id": self.id}):
+                self.thread = self.client.beta.threads.retrieve(self.id)
         else:
-            self.thread = self.client.beta.threads.create()
+            with get_tracer().span("api.threads.create", "api") as span:
+                self.thread = self.client.beta.threads.create()
+                span.set_attribute("thread_id", self.thread.id)
             self.id = self.thread.id
 
     def get_completion_stream(self, message: str, event_handler: type(AgencyEventHandler), message_files=None,
                               recipient_agent=None,
-                              additional_instructions: str = None):
+                              additional_instructions: str = None,
+                              cancellation_token: CancellationToken = None,
+                              request_usage: UsageTracker = None):
         return self.get_completion(message, message_files, False, recipient_agent, additional_instructions,
-                                   event_handler)
+                                   event_handler, cancellation_token, request_usage)
 
     def get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None,
-                       additional_instructions: str = None, event_handler: type(AgencyEventHandler) = None):
-        if not self.thread:
+                       additional_instructions: str = None, event_handler: type(AgencyEventHandler) = None,
+                       cancellation_token: CancellationToken = None, request_usage: UsageTracker = None):
+        tracer = get_tracer()
+        span = tracer.start_span("thread.get_completion", "thread", {
+            "sender": self.agent.name,
+            "recipient": recipient_agent.name if recipient_agent else self.recipient_agent.name,
+            "thread_id": self.id,
+            "message_bytes": len(message.encode()),
+            "retries": 0,
+        })
+        with tracer.use_span(span):
+            result = yield from self._get_completion(message, message_files, yield_messages, recipient_agent,
+                                                     additional_instructions, event_handler, cancellation_token,
+                                                     request_usage)
+            span.set_attribute("thread_id", self.id)
+            if isinstance(result, PartialResult):
+                span.set_status("cancelled", result.reason)
+            return result
+
+    def _get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None,
+                        additional_instructions: str = None, event_handler: type(AgencyEventHandler) = None,
+                        cancellation_token: CancellationToken = None, request_usage: UsageTracker = None):
+        self.cancellation_token = cancellation_token
+        self.request_usage = request_usage
+        if cancellation_token and cancellation_token.cancelled:
+            return PartialResult("", cancellation_token.reason, self.agent.name,
+                                 (recipient_agent or self.recipient_agent).name)
+
+        if not self.id:
             self.init_thread()
 
+        self._replay_outputs = {}
+
         if not recipient_agent:
             recipient_agent = self.recipient_agent
 
@@ -52,39 +115,66 @@ class Thread:
 
         # Determine the sender's name based on the agent type
         sender_name = "user" if isinstance(self.agent, User) else self.agent.name
-        playground_url = f'https://platform.openai.com/playground?assistant={recipient_agent.assistant.id}&mode=assistant&thread={self.thread.id}'
+        playground_url = f'https://platform.openai.com/playground?assistant={recipient_agent.assistant.id}&mode=assistant&thread={self.id}'
         print(f'THREAD:[ {sender_name} -> {recipient_agent.name} ]: URL {playground_url}')
 
+        # notifications that arrived while the thread was idle are sent before the message
+        for notification in self._pop_notifications():
+            self._create_message(notification)
+
         # send message
-        self.client.beta.threads.messages.create(
-            thread_id=self.thread.id,
-            role="user",
-            content=message,
-            file_ids=message_files if message_files else [],
-        )
+        self._create_message(message, message_files)
 
         if yield_messages:
             yield MessageOutput("text", self.agent.name, recipient_agent.name, message)
 
         self._create_run(recipient_agent, additional_instructions, event_handler)
 
+        retry_policy = recipient_agent.retry_policy if recipient_agent.retry_policy else self.retry_policy
         error_attempts = 0
         validation_attempts = 0
         full_message = ""
         while True:
-            self._run_until_done()
+            self._run_until_done(recipient_agent)
+
+            if cancellation_token and cancellation_token.cancelled:
+                return self._get_partial_result(full_message, recipient_agent)
 
             # function execution
             if self.run.status == "requires_action":
                 tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
                 tool_outputs = []
                 tool_names = []
+                # start independent tool calls in the background, the rest are executed in order below
+                futures = self._execute_tools_parallel([tool_call for tool_call in tool_calls
+                                                        if self._get_replay_key(tool_call) not in self._replay_outputs],
+                                                       recipient_agent, event_handler)
                 for tool_call in tool_calls:
+                    if cancellation_token and cancellation_token.cancelled:
+                        for future in futures.values():
+                            future.cancel()
+                        return self._get_partial_result(full_message, recipient_agent, tool_outputs)
+
                     if yield_messages:
                         yield MessageOutput("function", recipient_agent.name, self.agent.name,
                                             str(tool_call.function))
 
-                    output = self.execute_tool(tool_call, recipient_agent, event_handler, tool_names)
+                    # outputs of tools executed before the run expired are not computed again
+                    output = self._pop_replay_output(tool_call, retry_policy)
+                    if output is not None:
+                        if yield_messages:
+                            yield MessageOutput("function_output", tool_call.function.name, recipient_agent.name,
+                                                output)
+                        tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
+                        tool_names.append(tool_call.function.name)
+                        continue
+
+                    if tool_call.id in futures:
+                        output = futures[tool_call.id].result()
+                    else:
+                        # serial calls never run at the same time as the concurrent ones
+                        wait(futures.values())
+                        output = self.execute_tool(tool_call, recipient_agent, event_handler, tool_names)
                     if inspect.isgenerator(output):
                         try:
                             while True:
@@ -101,53 +191,46 @@ class Thread:
                             yield MessageOutput("function_output", tool_call.function.name, recipient_agent.name,
                                                 output)
 
-                    tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+                    if isinstance(output, PartialResult):
+                        # a nested thread was cancelled with the same token
+                        tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
+                        return self._get_partial_result(full_message, recipient_agent, tool_outputs)
+
+                    output = self._limit_tool_output(tool_call, str(output), recipient_agent)
+                    tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
                     tool_names.append(tool_call.function.name)
 
+                self._replay_outputs = {}
+
                 # submit tool outputs
                 try:
                     self._submit_tool_outputs(tool_outputs, event_handler)
                 except BadRequestError as e:
-                    if 'Runs in status "expired"' in e.message:
-                        self.client.beta.threads.messages.create(
-                            thread_id=self.thread.id,
-                            role="user",
-                            content="Please repeat the exact same function calls again in the same order."
-                        )
-
-                        self._create_run(recipient_agent, additional_instructions, event_handler)
-
-                        self._run_until_done()
-
-                        if self.run.status != "requires_action":
-                            raise Exception("Run Failed. Error: ", self.run.last_error)
+                    if not retry_policy.should_retry(e, error_attempts):
+                        raise e
 
-                        # change tool call ids
-                        tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
-                        for i, tool_call in enumerate(tool_calls):
-                            tool_outputs[i]["tool_call_id"] = tool_call.id
+                    # the run expired, ask the agent to repeat the calls and replay the computed outputs
+                    for tool_call, tool_output in zip(tool_calls, tool_outputs):
+                        self._replay_outputs.setdefault(self._get_replay_key(tool_call), []).append(
+                            tool_output["output"])
 
-                        self._submit_tool_outputs(tool_outputs, event_handler)
-                    else:
-                        raise e
+                    self._create_message("Please repeat the exact same function calls again in the same order.")
+                    self._create_run(recipient_agent, additional_instructions, event_handler)
+                    error_attempts += 1
+                    get_current_span().set_attribute("retries", error_attempts)
             # error
             elif self.run.status == "failed":
                 full_message += self._get_last_message_text() + "\n"
-                # retry run 2 times
-                if error_attempts < 1 and "something went wrong" in self.run.last_error.message.lower():
-                    time.sleep(1)
-                    self._create_run(recipient_agent, additional_instructions, event_handler)
-                    error_attempts += 1
-                elif 1 <= error_attempts < 5 and "something went wrong" in self.run.last_error.message.lower():
-                    self.client.beta.threads.messages.create(
-                        thread_id=self.thread.id,
-                        role="user",
-                        content="Continue."
-                    )
-                    self._create_run(recipient_agent, additional_instructions, event_handler)
-                    error_attempts += 1
-                else:
+                if not retry_policy.should_retry(self.run.last_error, error_attempts):
                     raise Exception("OpenAI Run Failed. Error: ", self.run.last_error.message)
+
+                self._wait_before_retry(retry_policy.get_delay(error_attempts, self.run.last_error))
+                # the first retry only restarts the run
+                if error_attempts >= 1 and retry_policy.continue_message:
+                    self._create_message(retry_policy.continue_message)
+                self._create_run(recipient_agent, additional_instructions, event_handler)
+                error_attempts += 1
+                get_current_span().set_attribute("retries", error_attempts)
             # return assistant message
             else:
                 full_message += self._get_last_message_text()
@@ -162,11 +245,7 @@ class Thread:
                     except Exception as e:
                         full_message = ""
                         if validation_attempts < recipient_agent.validation_attempts:
-                            message = self.client.beta.threads.messages.create(
-                                thread_id=self.thread.id,
-                                role="user",
-                                content=str(e),
-                            )
+                            message = self._create_message(str(e))
 
                             if yield_messages:
                                 yield MessageOutput("text", self.agent.name, recipient_agent.name,
@@ -183,84 +262,300 @@ class Thread:
 
                             continue
 
+                # notifications that arrived during the run, like responses of async agents, start a new run
+                notifications = self._pop_notifications()
+                if notifications:
+                    for notification in notifications:
+                        message = self._create_message(notification)
+
+                        if yield_messages:
+                            yield MessageOutput("text", self.agent.name, recipient_agent.name, notification)
+
+                        if event_handler:
+                            handler = event_handler()
+                            handler.on_message_created(message)
+                            handler.on_message_done(message)
+
+                    full_message += "\n"
+                    self._create_run(recipient_agent, additional_instructions, event_handler)
+                    continue
+
                 return full_message
 
-    def _create_run(self, recipient_agent, additional_instructions, event_handler):
-        if event_handler:
-            with self.client.beta.threads.runs.create_and_stream(
-                    thread_id=self.thread.id,
-                    event_handler=event_handler(),
-                    assistant_id=recipient_agent.id,
-                    additional_instructions=additional_instructions,
-            ) as stream:
-                stream.until_done()
-                self.run = stream.get_final_run()
-        else:
-            self.run = self.client.beta.threads.runs.create(
-                thread_id=self.thread.id,
-                assistant_id=recipient_agent.id,
-                additional_instructions=additional_instructions,
+    def add_notification(self, message: str):
+        """
+        Adds a message for the recipient agent, that is sent before the current run returns, or with the next message
+        if the thread is idle. Used to deliver the responses of agents in async mode.
+        """
+        with self._notifications_lock:
+            self._notifications.append(message)
+
+    def _pop_notifications(self):
+        with self._notifications_lock:
+            notifications = list(self._notifications)
+            self._notifications.clear()
+        return notifications
+
+    def _get_partial_result(self, full_message, recipient_agent, tool_outputs=None):
+        """
+        Cancels the current run, if it is still active, and returns what was received before the cancellation.
+        """
+        self.run_waiter.cancel_run(self.client, self.id, self.run)
+        if self.run.status == "completed":
+            full_message += self._get_last_message_text()
+
+        return PartialResult(full_message, self.cancellation_token.reason, self.agent.name, recipient_agent.name,
+                             tool_outputs)
+
+    def _create_message(self, content: str, message_files=None):
+        with get_tracer().span("api.messages.create", "api", {"thread_id": self.id,
+                                                              "payload_bytes": len(content.encode()),
+                                                              "files": len(message_files) if message_files else 0}):
+            return self.client.beta.threads.messages.create(
+                thread_id=self.id,
+                role="user",
+                content=content,
+                file_ids=message_files if message_files else [],
             )
 
-    def _run_until_done(self):
-        while self.run.status in ['queued', 'in_progress', "cancelling"]:
-            time.sleep(0.5)
-            self.run = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread.id,
-                run_id=self.run.id
-            )
+    def _wait_before_retry(self, delay):
+        if self.cancellation_token:
+            self.cancellation_token.wait(delay)
+        else:
+            time.sleep(delay)
+
+    @staticmethod
+    def _get_replay_key(tool_call):
+        return tool_call.function.name, tool_call.function.arguments
+
+    def _pop_replay_output(self, tool_call, retry_policy):
+        """
+        Returns the output of an identical tool call that was executed before the previous run expired, or None.
+        """
+        outputs = self._replay_outputs.get(self._get_replay_key(tool_call))
+        if not outputs:
+            return None
+
+        retry_policy.record_replay()
+        return outputs.pop(0)
+
+    def _create_run(self, recipient_agent, additional_instructions, event_handler):
+        self.run = self.run_waiter.create_run(self.client,
+                                              self.id,
+                                              event_handler=event_handler,
+                                              cancellation_token=self.cancellation_token,
+                                              assistant_id=recipient_agent.id,
+                                              additional_instructions=additional_instructions)
+        # messages created by the run, None if they are not known locally
+        self.run_messages = self.run_waiter.last_messages
+
+    def _run_until_done(self, recipient_agent=None):
+        self.run = self.run_waiter.wait(self.client, self.id, self.run, self.cancellation_token)
+        self._record_usage(recipient_agent if recipient_agent else self.recipient_agent)
+
+    def _record_usage(self, recipient_agent):
+        """
+        Records the token usage of the run, which is only reported once the run is no longer active.
+        """
+        usage = getattr(self.run, "usage", None)
+        if not usage or self.run.status in ["queued", "in_progress", "requires_action", "cancelling"]:
+            return
+
+        model = getattr(self.run, "model", None)
+        for tracker in (self.usage_tracker, self.request_usage):
+            if tracker:
+                tracker.record(self.agent.name, recipient_agent.name, model, usage)
 
     def _submit_tool_outputs(self, tool_outputs, event_handler):
-        if not event_handler:
-            self.run = self.client.beta.threads.runs.submit_tool_outputs(
-                thread_id=self.thread.id,
-                run_id=self.run.id,
-                tool_outputs=tool_outputs
-            )
+        self.run = self.run_waiter.submit_tool_outputs(self.client,
+                                                       self.id,
+                                                       self.run.id,
+                                                       tool_outputs,
+                                                       event_handler=event_handler,
+                                                       cancellation_token=self.cancellation_token)
+        if self.run_messages is not None and self.run_waiter.last_messages is not None:
+            self.run_messages = self.run_messages + self.run_waiter.last_messages
         else:
-            with self.client.beta.threads.runs.submit_tool_outputs_stream(
-                    thread_id=self.thread.id,
-                    run_id=self.run.id,
-                    tool_outputs=tool_outputs,
-                    event_handler=event_handler()
-            ) as stream:
-                stream.until_done()
-                self.run = stream.get_final_run()
+            self.run_messages = None
 
     def _get_last_message_text(self):
-        messages = self.client.beta.threads.messages.list(
-            thread_id=self.id,
-            limit=1
-        )
+        messages = self._get_run_messages()
 
-        if len(messages.data) == 0 or len(messages.data[0].content) == 0:
+        if len(messages) == 0:
             return ""
 
-        return messages.data[0].content[0].text.value
+        return "".join(content.text.value for content in messages[-1].content if content.type == "text")
+
+    def _get_run_messages(self):
+        """
+        Returns the messages created by the current run in chronological order.
+
+        Messages are taken from the run streams when available, without any API calls. Otherwise, they are fetched
+        with a single paginated list request, that stops at the first message not created by the run.
+        """
+        if self.run_messages is not None:
+            return self.run_messages
+
+        messages = []
+        with get_tracer().span("api.messages.list", "api", {"thread_id": self.id, "run_id": self.run.id}) as span:
+            for message in self.client.beta.threads.messages.list(thread_id=self.id, order="desc", limit=10):
+                if message.run_id != self.run.id:
+                    break
+                messages.append(message)
+            span.set_attribute("messages", len(messages))
+
+        self.run_messages = messages[::-1]
+        return self.run_messages
+
+    def _limit_tool_output(self, tool_call, output: str, recipient_agent):
+        """
+        Applies the output policy of the tool, or of the recipient agent, to the tool output and records its size.
+        """
+        func = recipient_agent.get_function(tool_call.function.name)
+        policy = func.output_policy if func and func.output_policy else recipient_agent.tool_output_policy
+
+        original_bytes = len(output.encode())
+        if policy:
+            try:
+                output = policy.apply(output, tool_call.function.name, tool_call.id)
+            except Exception as e:
+                # submit the output anyway, so that the run can continue
+                warnings.warn(f"Output policy failed for {tool_call.function.name}, truncating the output: {e}")
+                output = policy.truncate(output, policy.max_bytes)
+
+        self.tool_output_stats.append({
+            "tool_name": tool_call.function.name,
+            "tool_call_id": tool_call.id,
+            "original_bytes": original_bytes,
+            "bytes": len(output.encode()),
+            "tokens": count_tokens(output),
+        })
+        return output
+
+    def _execute_tools_parallel(self, tool_calls, recipient_agent, event_handler):
+        """
+        Submits tool calls that can safely run concurrently to the thread's tool executor.
+
+        Tools marked with one_call_at_a_time or serial_only are skipped, as well as generator based tools when
+        streaming, since they write into the shared event handler. Generators are consumed in the worker, so that
+        their work runs concurrently, and are replayed in order by the caller.
+
+        Returns:
+            Dict[str, Future]: Futures with the tool outputs by tool call id.
+        """
+        if not self.parallel_tool_calls or len(tool_calls) < 2:
+            return {}
+
+        parallel_calls = []
+        for tool_call in tool_calls:
+            func = recipient_agent.get_function(tool_call.function.name)
+            if not func or func.serial_only or func.model_fields["one_call_at_a_time"].default:
+                continue
+            if event_handler and inspect.isgeneratorfunction(func.run):
+                continue
+            parallel_calls.append(tool_call)
+
+        if len(parallel_calls) < 2:
+            return {}
+
+        if not self._tool_executor:
+            self._tool_executor = ThreadPoolExecutor(max_workers=self.max_tool_workers,
+                                                     thread_name_prefix="agency_swarm_tool")
+
+        def execute(tool_call):
+            output = self.execute_tool(tool_call, recipient_agent, event_handler)
+            if not inspect.isgenerator(output):
+                return output
+
+            items = []
+            try:
+                while True:
+                    items.append(next(output))
+            except StopIteration as e:
+                value = e.value
+
+            def replay():
+                yield from items
+                return value
+
+            return replay()
+
+        # workers continue the active trace of the caller
+        return {tool_call.id: self._tool_executor.submit(contextvars.copy_context().run, execute, tool_call)
+                for tool_call in parallel_calls}
 
     def execute_tool(self, tool_call, recipient_agent=None, event_handler=None, tool_names=[]):
         if not recipient_agent:
             recipient_agent = self.recipient_agent
 
-        funcs = recipient_agent.functions
-        func = next((func for func in funcs if func.__name__ == tool_call.function.name), None)
+        tracer = get_tracer()
+        span = tracer.start_span("tool.execute", "tool", {
+            "tool_name": tool_call.function.name,
+            "tool_call_id": tool_call.id,
+            "agent": recipient_agent.name,
+            "arguments_bytes": len(tool_call.function.arguments.encode()),
+        })
+        with tracer.use_span(span, end_on_exit=False):
+            output = self._execute_tool(tool_call, recipient_agent, event_handler, tool_names)
+
+        if inspect.isgenerator(output):
+            # generators, like SendMessage, do their work while they are consumed
+            return self._trace_tool_generator(output, span)
+
+        self._set_tool_span_output(span, output)
+        span.end()
+        return output
+
+    def _trace_tool_generator(self, gen, span):
+        with get_tracer().use_span(span):
+            output = yield from gen
+            self._set_tool_span_output(span, output)
+        return output
+
+    @staticmethod
+    def _set_tool_span_output(span, output):
+        span.set_attribute("output_bytes", len(str(output).encode()))
+        if isinstance(output, str) and output.startswith("Error:"):
+            span.set_status("error", output)
+        elif isinstance(output, PartialResult):
+            span.set_status("cancelled", output.reason)
+
+    def _execute_tool(self, tool_call, recipient_agent, event_handler, tool_names):
+        func = recipient_agent.get_function(tool_call.function.name)
 
         if not func:
-            return f"Error: Function {tool_call.function.name} not found. Available functions: {[func.__name__ for func in funcs]}"
+            return f"Error: Function {tool_call.function.name} not found. Available functions: {[func.__name__ for func in recipient_agent.functions]}"
 
         try:
             # init tool
-            args = tool_call.function.arguments
-            args = json.loads(args) if args else {}
-            func = func(**args)
+            func = func.from_arguments(tool_call.function.arguments)
             for tool_name in tool_names:
                 if tool_name == tool_call.function.name and (
                         hasattr(func, "one_call_at_a_time") and func.one_call_at_a_time):
                     return f"Error: Function {tool_call.function.name} is already called. You can only call this function once at a time. Please wait for the previous call to finish before calling it again."
             func.caller_agent = recipient_agent
             func.event_handler = event_handler
+            func.cancellation_token = self.cancellation_token
+            func.request_usage = self.request_usage
+            func._session = self.session
+            func._caller_thread = self
+            # return cached output for identical calls
+            cache_key = None
+            if func.cache_results:
+                cache_key = func.get_cache_key()
+                hit, output = func.get_cache().get(cache_key)
+                get_current_span().set_attribute("cached", hit)
+                if hit:
+                    return output
+
             # get outputs from the tool
             output = func.run()
+            if inspect.iscoroutine(output):
+                # tools with 'async def run' are executed on a new event loop in sync mode
+                output = asyncio.run(output)
+
+            if cache_key and not inspect.isgenerator(output):
+                func.cache_output(cache_key, output)
 
             return output
         except Exception as e:
@@ -1,16 +1,37 @@
 import threading
-from typing import Literal
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Literal
 
 from agency_swarm.agents import Agent
 from agency_swarm.threads import Thread
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.threads.worker_pool import WorkerPool
 from agency_swarm.user import User
+from agency_swarm.util.retry_policy import RetryPolicy
+from agency_swarm.util.usage import UsageTracker
 
 
 class ThreadAsync(Thread):
-    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent):
-        super().__init__(agent, recipient_agent)
-        self.pythread = None
+    """
+    Thread that processes messages in the background on a bounded WorkerPool. Messages that arrive while the thread
+    is busy are queued and processed in order, one at a time, and are rejected once the queue is full.
+    """
+
+    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent, run_waiter: RunWaiter = None,
+                 parallel_tool_calls: bool = False, max_tool_workers: int = 8, retry_policy: RetryPolicy = None,
+                 usage_tracker: UsageTracker = None, worker_pool: WorkerPool = None):
+        super().__init__(agent, recipient_agent, run_waiter, parallel_tool_calls, max_tool_workers, retry_policy,
+                         usage_tracker)
+        self.worker_pool = worker_pool if worker_pool else WorkerPool()
+        self.queue = deque()  # (message, message_files, additional_instructions, enqueued_at, future)
+        self.processing = False
+        # state of the last message processed in this process, so that status checks need no API calls
+        self.status = None  # None, "completed" or "failed"
         self.response = None
+        self.error = None
+        self._queue_lock = threading.Lock()
 
     def worker(self, message: str, message_files=None, additional_instructions: str = None):
         gen = super().get_completion(message=message,
@@ -22,32 +43,151 @@ class ThreadAsync(Thread):
                 next(gen)
             except StopIteration as e:
                 self.response = f"""{self.recipient_agent.name}'s Response: '{e.value}'"""
-                break
-
-        return
-
-    def get_completion_async(self, message: str, message_files=None, additional_instructions: str = None):
-        if self.pythread and self.pythread.is_alive():
+                return e.value
+
+    def get_completion_async(self, message: str, message_files=None, additional_instructions: str = None,
+                             callback: Callable[[Future], Any] = None):
+        """
+        Queues a message to be processed in the background, and returns a system notification for the caller agent.
+
+        Parameters:
+            message (str): The message to send.
+            message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
+            additional_instructions (str, optional): Additional instructions for the run. Defaults to None.
+            callback (Callable[[Future], Any], optional): Called with the Future of the message when it is processed. The notification then tells the caller that the response will be delivered automatically. Defaults to None.
+        """
+        if self._is_busy_remotely():
             return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
-        elif self.pythread and not self.pythread.is_alive():
-            self.pythread.join()
-            self.pythread = None
-            self.response = None
-
-        run = self.get_last_run()
 
-        if run and run.status in ['queued', 'in_progress', 'requires_action']:
-            return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
+        future, pending = self._enqueue(message, message_files, additional_instructions)
+        if not future:
+            return "System Notification: 'Agent is busy and has too many pending messages, so your message was not received. Please use the 'GetResponse' tool to check for status, and send your message again after the agent has finished its current tasks.'"
 
-        self.pythread = threading.Thread(target=self.worker,
-                                         args=(message, message_files, additional_instructions))
+        if callback:
+            future.add_done_callback(callback)
+            if pending:
+                return f"System Notification: 'Agent is busy, so your message was queued behind {pending} other message(s). The response will be delivered to you automatically as a system notification when it is ready, so you don't need to check the status.'"
+            return "System Notification: 'Task has started. The response will be delivered to you automatically as a system notification when it is ready, so you don't need to check the status. Please notify the user that the task is in progress.'"
 
-        self.pythread.start()
+        if pending:
+            return f"System Notification: 'Agent is busy, so your message was queued behind {pending} other message(s) and will be processed after them. You can check the status later with the 'GetResponse' tool, after you have been instructed to do so. Don't mention the tool itself to the user.'"
 
         return "System Notification: 'Task has started. Please notify the user that they can tell you to check the status later. You can do this with the 'GetResponse' tool, after you have been instructed to do so. Don't mention the tool itself to the user. "
 
+    def submit(self, message: str, message_files=None, additional_instructions: str = None) -> Future:
+        """
+        Queues a message to be processed in the background and returns a Future with the final response of the
+        recipient agent. Raises an exception if the agent is busy and its queue is full.
+        """
+        if self._is_busy_remotely():
+            raise Exception(f"Agent {self.recipient_agent.name} has an active run in thread {self.id}.")
+
+        future, _ = self._enqueue(message, message_files, additional_instructions)
+        if not future:
+            raise Exception(f"Agent {self.recipient_agent.name} is busy and its queue is full.")
+        return future
+
+    def add_notification(self, message: str):
+        """
+        Queues a notification for the recipient agent like a regular message, so an idle agent is woken up to process
+        it. Notifications are never rejected.
+        """
+        self._enqueue(message, force=True)
+
+    def get_response_notification(self, future: Future) -> str:
+        """Returns the system notification that delivers the result of a processed message to the caller agent."""
+        if future.exception():
+            error = self._get_error_message(future.exception())
+            return f"System Notification: '{self.recipient_agent.name} failed to complete your task with error: {error}. You may send another message with the 'SendMessage' tool.'"
+        return f"System Notification: '{self.recipient_agent.name} has completed your task. {self.recipient_agent.name}'s Response: '{future.result()}''"
+
+    def get_queue_size(self) -> int:
+        with self._queue_lock:
+            return len(self.queue)
+
+    def _is_busy_remotely(self) -> bool:
+        with self._queue_lock:
+            if self.processing or self.status:
+                return False
+
+        # runs of this thread can only be active without local state, for example after a restart
+        if not self.id:
+            return False
+        run = self.get_last_run()
+        return bool(run and run.status in ['queued', 'in_progress', 'requires_action'])
+
+    def _enqueue(self, message, message_files=None, additional_instructions=None, force=False):
+        """
+        Adds a message to the queue and starts processing the queue if the thread is idle. Returns the Future of the
+        message, or None if the queue is full, and the number of messages ahead of it.
+        """
+        with self._queue_lock:
+            if not force and self.processing and len(self.queue) >= self.worker_pool.max_queue_size:
+                self.worker_pool.record_rejected()
+                return None, len(self.queue)
+
+            future = Future()
+            self.queue.append((message, message_files, additional_instructions, time.monotonic(), future))
+            self.worker_pool.record_enqueued()
+            pending = len(self.queue) - 1 + int(self.processing)
+            start = not self.processing
+            self.processing = True
+
+        if start:
+            self.worker_pool.submit(self._process_queue)
+
+        return future, pending
+
+    def _process_queue(self):
+        """Processes the queued messages in order, until the queue is empty."""
+        while True:
+            with self._queue_lock:
+                if not self.queue:
+                    self.processing = False
+                    return
+                message, message_files, additional_instructions, enqueued_at, future = self.queue.popleft()
+
+            self.worker_pool.record_started(enqueued_at)
+            try:
+                response = self.worker(message, message_files, additional_instructions)
+            except Exception as e:
+                with self._queue_lock:
+                    self.status = "failed"
+                    self.error = self._get_error_message(e)
+                self.worker_pool.record_finished(failed=True)
+                future.set_exception(e)
+            else:
+                with self._queue_lock:
+                    self.status = "completed"
+                    self.error = None
+                self.worker_pool.record_finished()
+                future.set_result(response)
+
+    @staticmethod
+    def _get_error_message(error: Exception) -> str:
+        return " ".join(str(arg) for arg in error.args) if error.args else repr(error)
+
     def check_status(self, run=None):
+        """
+        Returns the status or the response of the last message. The local state of the thread is used when this
+        process sent the message, otherwise the last run and message are retrieved.
+        """
         if not run:
+            with self._queue_lock:
+                processing, status, response, error = self.processing, self.status, self.response, self.error
+
+            if processing:
+                return "System Notification: 'Task is not completed yet. Please tell the user to wait and try again later.'"
+
+            if status == "completed":
+                return response
+
+            if status == "failed":
+                return f"System Notification: 'Agent run failed with error: {error}. You may send another message with the 'SendMessage' tool.'"
+
+            if not self.id:
+                return "System Notification: 'Agent is ready to receive a message. Please send a message with the 'SendMessage' tool.'"
+
             run = self.get_last_run()
 
         if not run:
@@ -63,17 +203,19 @@ class ThreadAsync(Thread):
         messages = self.client.beta.threads.messages.list(
             thread_id=self.id,
             order="desc",
+            limit=1,
         )
 
         return f"""{self.recipient_agent.name}'s Response: '{messages.data[0].content[0].text.value}'"""
 
     def get_last_run(self):
-        if not self.thread:
+        if not self.id:
             self.init_thread()
 
         runs = self.client.beta.threads.runs.list(
-            thread_id=self.thread.id,
+            thread_id=self.id,
             order="desc",
+            limit=1,
         )
 
         if len(runs.data) == 0:
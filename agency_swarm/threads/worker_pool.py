@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class WorkerPool:
+    """
+    Bounded pool of worker threads that runs the background conversations of ThreadAsync threads.
+
+    An agency in threading async mode shares one pool between all of its threads, so the number of OS threads stays
+    bounded no matter how many conversations fan out at the same time. Messages that arrive while a thread is busy are
+    queued on the thread, up to max_queue_size, and the pool collects the queue depth and wait time metrics.
+    """
+
+    def __init__(self, max_workers: int = 16, max_queue_size: int = 10):
+        """
+        Initializes the WorkerPool.
+
+        Parameters:
+            max_workers (int, optional): The maximum number of worker threads. Defaults to 16.
+            max_queue_size (int, optional): The maximum number of messages waiting on each thread. Defaults to 10.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must not be negative.")
+
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # stats
+        self.active = 0  # workers running a conversation
+        self.queued = 0  # messages waiting in the queues of all threads
+        self.max_queued = 0
+        self.enqueued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def saturated(self) -> bool:
+        """True if all workers are busy, so new work has to wait."""
+        return self.active >= self.max_workers
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="agency-worker")
+            return self._executor.submit(fn, *args, **kwargs)
+
+    def record_enqueued(self):
+        with self._lock:
+            self.enqueued += 1
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record_started(self, enqueued_at: float):
+        wait_time = time.monotonic() - enqueued_at
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def record_finished(self, failed: bool = False):
+        with self._lock:
+            self.active -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def get_stats(self):
+        with self._lock:
+            started = self.completed + self.failed + self.active
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "average_wait_time": self.total_wait_time / started if started else 0.0,
+                "max_wait_time": self.max_wait_time,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=wait)
@@ -1,9 +1,22 @@
+import json
+import threading
 from abc import ABC, abstractmethod
 from typing import Optional, Any, ClassVar
 
 from instructor import OpenAISchema
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
+
+from .ToolCache import ToolCache, MemoryToolCache
+from .ToolOutputPolicy import ToolOutputPolicy
+
+_cache_lock = threading.Lock()
+
+# fields set by the thread before each call, that tools can not declare as arguments
+_RESERVED_FIELDS = ("caller_agent", "shared_state", "event_handler", "cancellation_token", "request_usage")
+# fields that are not arguments of the tool, excluded from the schema and from cache keys
+_HIDDEN_FIELDS = _RESERVED_FIELDS + ("one_call_at_a_time",)
+
 
 class SharedState:
     def __init__(self):
@@ -22,39 +35,85 @@ class SharedState:
 
 class BaseTool(OpenAISchema, ABC):
     shared_state: ClassVar[SharedState] = SharedState()
+    serial_only: ClassVar[bool] = False  # never executed concurrently with other tool calls
+    cache_results: ClassVar[bool] = False  # reuse outputs of previous calls with identical arguments
+    cache_ttl: ClassVar[Optional[float]] = None  # seconds until cached outputs expire, None to never expire
+    cache_max_size: ClassVar[int] = 128  # max entries of the default in-memory cache
+    cache_backend: ClassVar[Optional[ToolCache]] = None  # defaults to an in-memory cache per tool
+    output_policy: ClassVar[Optional[ToolOutputPolicy]] = None  # overrides the agent's tool output policy
     caller_agent: Any = None
     event_handler: Any = None
+    cancellation_token: Any = None
+    request_usage: Any = None
     one_call_at_a_time: bool = False
+    _session: Any = PrivateAttr(default=None)  # set by the thread to the session of the request
+    _caller_thread: Any = PrivateAttr(default=None)  # set by the thread to the thread that calls the tool
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # # Exclude 'run' method from Pydantic model fields
         # self.model_fields.pop("run", None)
 
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        reserved = [name for name in cls.__dict__.get("__annotations__", {}) if name in _RESERVED_FIELDS]
+        if reserved:
+            raise Exception(f"Tool {cls.__name__} can not declare the reserved fields {', '.join(reserved)}.")
+
     @classmethod
     @property
     def openai_schema(cls):
         schema = super(BaseTool, cls).openai_schema
 
         properties = schema.get("parameters", {}).get("properties", {})
-
-        properties.pop("caller_agent", None)
-        properties.pop("shared_state", None)
-        properties.pop("event_handler", None)
-        properties.pop("one_call_at_a_time", None)
-
         required = schema.get("parameters", {}).get("required", [])
-        if "caller_agent" in required:
-            required.remove("caller_agent")
-        if "shared_state" in required:
-            required.remove("shared_state")
-        if "event_handler" in required:
-            required.remove("event_handler")
-        if "one_call_at_a_time" in required:
-            required.remove("one_call_at_a_time")
+        for name in _HIDDEN_FIELDS:
+            properties.pop(name, None)
+            if name in required:
+                required.remove(name)
 
         return schema
 
+    @classmethod
+    def from_arguments(cls, arguments: str):
+        """
+        Initializes the tool from the JSON arguments of a tool call, validating the JSON string directly into the
+        model without parsing it into a dict first.
+        """
+        if not arguments:
+            arguments = "{}"
+
+        if cls.__init__ is not BaseTool.__init__:
+            # respect custom constructors
+            return cls(**json.loads(arguments))
+
+        tool = cls.__new__(cls)
+        cls.__pydantic_validator__.validate_json(arguments, self_instance=tool)
+        return tool
+
+    @classmethod
+    def get_cache(cls) -> ToolCache:
+        """Returns the result cache of the tool, creating the default in-memory cache if no backend is set."""
+        if cls.cache_backend is None:
+            # tools run in parallel threads, so the default cache is created under a lock to create it only once
+            with _cache_lock:
+                if cls.cache_backend is None:
+                    cls.cache_backend = MemoryToolCache(max_size=cls.cache_max_size)
+        return cls.cache_backend
+
+    @classmethod
+    def cache_output(cls, key: str, output: Any):
+        """Stores the output of a call in the cache, unless the output reports an error."""
+        if isinstance(output, str) and output.startswith("Error:"):
+            return
+        cls.get_cache().set(key, output, cls.cache_ttl)
+
+    def get_cache_key(self) -> str:
+        """Returns the cache key for the tool name and the arguments of this call."""
+        args = self.model_dump(exclude=set(_HIDDEN_FIELDS))
+        return ToolCache.make_key(self.__class__.__name__, args)
+
     @abstractmethod
     def run(self, **kwargs):
         pass
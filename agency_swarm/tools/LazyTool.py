@@ -0,0 +1,122 @@
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from typing import ClassVar, Optional, Type
+
+from .BaseTool import BaseTool
+
+
+class LazyTool(BaseTool):
+    """
+    Stands in for a tool of a tools folder, with the name and OpenAI schema of the tool from the tools manifest. The
+    agent replaces it with the real tool, importing its file, the first time the tool is called.
+    """
+    tool_file_path: ClassVar[Optional[str]] = None
+    tool_schema: ClassVar[Optional[dict]] = None
+
+    @classmethod
+    @property
+    def openai_schema(cls):
+        return copy.deepcopy(cls.tool_schema)
+
+    @classmethod
+    def create(cls, name: str, file_path: str, schema: dict) -> Type["LazyTool"]:
+        """Creates a lazy tool with the given name, that loads the tool from file_path."""
+        return type(name, (cls,), {"tool_file_path": file_path, "tool_schema": schema, "__module__": __name__})
+
+    @classmethod
+    def load(cls) -> Type[BaseTool]:
+        """Imports the real tool from its file."""
+        from .ToolFactory import ToolFactory
+        return ToolFactory.from_file(cls.tool_file_path)
+
+    def run(self):
+        raise Exception(f"Tool {self.__class__.__name__} could not be loaded from {self.tool_file_path}.")
+
+
+class ToolManifest:
+    """
+    Caches the names and OpenAI schemas of the tools of a tools folder in a .tools_manifest.json file inside the
+    folder, so that tools can be registered as lazy tools without importing their files.
+
+    An entry is used while the size and modification time of its file are unchanged, or while its content has the
+    same sha256 hash. Otherwise, the file is imported and the entry is replaced.
+    """
+
+    def __init__(self, tools_folder: str):
+        self.path = os.path.join(tools_folder, ".tools_manifest.json")
+        self._entries = self._load()
+        self._seen = set()
+        self._changed = False
+
+    def get_tool(self, f_path: str) -> Type[BaseTool]:
+        """
+        Returns a lazy tool for the file if its entry is up to date, or imports the tool and updates its entry.
+
+        Parameters:
+            f_path (str): The path of the tool file.
+
+        Returns:
+            Type[BaseTool]: The lazy tool, or the imported tool.
+        """
+        file_name = os.path.basename(f_path)
+        self._seen.add(file_name)
+        stat = os.stat(f_path)
+        entry = self._entries.get(file_name)
+
+        if entry and (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+            if entry["sha256"] == self._get_hash(f_path):
+                # touched, but not changed
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self._changed = True
+            else:
+                entry = None
+
+        if entry:
+            return LazyTool.create(entry["name"], f_path, entry["schema"])
+
+        from .ToolFactory import ToolFactory
+        tool = ToolFactory.from_file(f_path)
+        self._entries[file_name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": self._get_hash(f_path),
+            "name": tool.__name__,
+            "schema": tool.openai_schema,
+        }
+        self._changed = True
+        return tool
+
+    def save(self):
+        """Writes the manifest if it changed, without the entries of files that were not requested."""
+        entries = {k: v for k, v in self._entries.items() if k in self._seen}
+        if not self._changed and entries.keys() == self._entries.keys():
+            return
+        self._entries = entries
+        self._changed = False
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # for example on a read-only filesystem, the tools are imported again on the next start
+            warnings.warn(f"Could not save tools manifest '{self.path}': {e}")
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _get_hash(f_path):
+        with open(f_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Tuple
+
+
+class ToolCache(ABC):
+    """
+    Base class for tool result caches. Entries expire after their TTL and the least recently used entries are evicted
+    when the cache is full. All backends are thread safe and keep hit and miss statistics.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError("Cache max_size must be at least 1.")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(tool_name: str, args: dict) -> str:
+        """Creates a cache key from the tool name and its canonicalized arguments."""
+        canonical_args = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{tool_name}:{canonical_args}".encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns a (hit, value) tuple for the given key.
+        """
+        with self._lock:
+            hit, value = self._get(key)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return hit, value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        """
+        Stores a value under the given key. If ttl is provided, the entry expires after ttl seconds.
+        """
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._set(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def get_stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self),
+            }
+
+    @abstractmethod
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, expires_at: float = None):
+        pass
+
+    @abstractmethod
+    def _clear(self):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+
+class MemoryToolCache(ToolCache):
+    """In-memory LRU tool result cache."""
+
+    def __init__(self, max_size: int = 128):
+        super().__init__(max_size)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _set(self, key, value, expires_at=None):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskToolCache(ToolCache):
+    """
+    Local on-disk LRU tool result cache. Each entry is stored as a separate JSON file in the cache folder, and file
+    modification times are used to track recency. Values that are not JSON serializable are stored as strings.
+    """
+
+    def __init__(self, path: str = "./.tool_cache", max_size: int = 1024):
+        super().__init__(max_size)
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def _get_file_path(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def _get(self, key):
+        f_path = self._get_file_path(key)
+        try:
+            with open(f_path, 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False, None
+
+        if entry["expires_at"] is not None and entry["expires_at"] <= time.time():
+            self._remove(f_path)
+            return False, None
+
+        # mark as recently used, the file may have been evicted by another process since it was read
+        self._touch(f_path)
+        return True, entry["value"]
+
+    def _set(self, key, value, expires_at=None):
+        f_path = self._get_file_path(key)
+        tmp_path = f"{f_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"expires_at": expires_at, "value": value}, f, default=str)
+        os.replace(tmp_path, f_path)
+
+        f_paths = self._list_files()
+        if len(f_paths) > self.max_size:
+            f_paths.sort(key=self._get_mtime)
+            for p in f_paths[:len(f_paths) - self.max_size]:
+                self._remove(p)
+                self.evictions += 1
+
+    def _clear(self):
+        for f_path in self._list_files():
+            self._remove(f_path)
+
+    def _list_files(self):
+        return [os.path.join(self.path, f) for f in os.listdir(self.path) if f.endswith(".json")]
+
+    @staticmethod
+    def _get_mtime(f_path):
+        try:
+            return os.path.getmtime(f_path)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _touch(f_path):
+        try:
+            os.utime(f_path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(f_path):
+        try:
+            os.remove(f_path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        return len(self._list_files())
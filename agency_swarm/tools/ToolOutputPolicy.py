@@ -0,0 +1,109 @@
+import threading
+from typing import Callable, Literal
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    Loads the tiktoken encoding on first use. Returns None if tiktoken is not installed or the encoding can not be
+    loaded, for example offline, when it is not cached yet.
+    """
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = None
+            _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens in the text with tiktoken if it is available, otherwise estimates them at 4 bytes per token.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text.encode()) + 3) // 4
+
+
+class ToolOutputPolicy:
+    """
+    Limits the size of tool outputs before they are submitted to the run.
+
+    Outputs larger than max_bytes are handled with one of the following strategies:
+
+    - "truncate": keeps the head and the tail of the output and drops the middle.
+    - "summarize": replaces the output with the result of the summarizer function. If the summary is still too large,
+      it is truncated.
+
+    If the policy fails while a thread applies it, for example because the summarizer raises, the output is truncated.
+    """
+
+    def __init__(self,
+                 max_bytes: int = 20000,
+                 strategy: Literal["truncate", "summarize"] = "truncate",
+                 head_ratio: float = 0.7,
+                 summarizer: Callable[[str], str] = None):
+        """
+        Initializes the ToolOutputPolicy.
+
+        Parameters:
+            max_bytes (int, optional): The maximum size of a tool output in bytes. Defaults to 20000.
+            strategy (str, optional): How to handle larger outputs. One of "truncate" or "summarize". Defaults to "truncate".
+            head_ratio (float, optional): The share of max_bytes kept from the beginning of the output when truncating. The rest is kept from the end. Defaults to 0.7.
+            summarizer (Callable[[str], str], optional): A function that summarizes the output. Required for the "summarize" strategy. Defaults to None.
+        """
+        if strategy not in ["truncate", "summarize"]:
+            raise ValueError(f"Invalid tool output strategy: {strategy}")
+        if strategy == "summarize" and not summarizer:
+            raise ValueError("Summarizer function is required for the 'summarize' strategy.")
+        if max_bytes < 1 or not 0 <= head_ratio <= 1:
+            raise ValueError("max_bytes must be positive and head_ratio must be between 0 and 1.")
+
+        self.max_bytes = max_bytes
+        self.strategy = strategy
+        self.head_ratio = head_ratio
+        self.summarizer = summarizer
+
+    def exceeds(self, output: str) -> bool:
+        return len(output.encode()) > self.max_bytes
+
+    def apply(self, output: str, tool_name: str, tool_call_id: str) -> str:
+        """
+        Returns the output limited according to the policy. The result is never larger than max_bytes.
+        """
+        if not self.exceeds(output):
+            return output
+
+        if self.strategy == "summarize":
+            output = str(self.summarizer(output))
+
+        return self.truncate(output, self.max_bytes)
+
+    def truncate(self, output: str, max_bytes: int) -> str:
+        """
+        Keeps the head and the tail of the output within max_bytes, including a marker for the dropped part.
+        """
+        data = output.encode()
+        if len(data) <= max_bytes:
+            return output
+
+        # reserve room for the marker, its number has at most as many digits as the size of the output
+        marker = "\n\n... [{} bytes truncated] ...\n\n"
+        kept_bytes = max_bytes - len(marker.format(len(data)).encode())
+        if kept_bytes <= 0:
+            return data[:max_bytes].decode(errors="ignore")
+
+        head_bytes = int(kept_bytes * self.head_ratio)
+        tail_bytes = kept_bytes - head_bytes
+        head = data[:head_bytes].decode(errors="ignore")
+        tail = data[len(data) - tail_bytes:].decode(errors="ignore") if tail_bytes else ""
+
+        return head + marker.format(len(data) - head_bytes - tail_bytes) + tail
@@ -2,3 +2,6 @@ from .BaseTool import BaseTool
 from .oai.Retrieval import Retrieval
 from .oai.CodeInterpreter import CodeInterpreter
 from .ToolFactory import ToolFactory
+from .LazyTool import LazyTool, ToolManifest
+from .ToolCache import ToolCache, MemoryToolCache, DiskToolCache
+from .ToolOutputPolicy import ToolOutputPolicy
\ No newline at end of file
@@ -1,3 +1,12 @@
 from .cli.create_agent_template import create_agent_template
 from .cli.import_agent import import_agent
-from .oai import set_openai_key, get_openai_client, set_openai_client
\ No newline at end of file
+from .oai import set_openai_key, get_openai_client, set_openai_client
+from .oai import get_async_openai_client, set_async_openai_client
+from .cancellation import CancellationToken, PartialResult
+from .retry_policy import RetryPolicy
+from .tracing import Tracer, InMemorySpanExporter, JSONLSpanExporter, get_tracer, set_tracer
+from .usage import UsageTracker
+from .settings_store import SettingsStore, InMemorySettingsStore, JsonFileSettingsStore, SQLiteSettingsStore
+from .settings_store import CallbackSettingsStore
+from .assistant_resolver import AssistantResolver, get_assistant_resolver
+from .file_uploader import FileUploader
@@ -0,0 +1,197 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from openai import NotFoundError
+from openai.types.beta import Assistant
+
+from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.tracing import get_tracer
+
+# resolver shared by all agents of the process, see get_assistant_resolver
+_shared_resolver = None
+_shared_resolver_lock = threading.Lock()
+
+
+class AssistantResolver:
+    """
+    Finds the assistants of agents with a single paginated list of all assistants, instead of retrieving the
+    assistants of each agent one by one.
+
+    Listing pages through every assistant of the organization, so it is only used when it saves requests: when at
+    least list_threshold ids are expected to be looked up, see expect_lookups, or to find assistants by name. Fewer
+    ids are retrieved directly, unless the list is already cached.
+
+    The list is cached for ttl seconds, indexed by id and name. Agents that create, update or delete assistants report
+    them to the resolver, so the cache stays up to date within the process. Ids that are not in the list, for example
+    of assistants created by another process after the list was requested, are retrieved one by one.
+    """
+
+    def __init__(self, client=None, ttl: float = 30.0, page_size: int = 100, list_threshold: int = 10):
+        """
+        Initializes the AssistantResolver.
+
+        Parameters:
+            client (OpenAI, optional): The client used to list assistants. Defaults to the global client.
+            ttl (float, optional): The number of seconds the list of assistants is cached. Defaults to 30.0.
+            page_size (int, optional): The number of assistants requested per page. Defaults to 100, the maximum of the API.
+            list_threshold (int, optional): The number of expected lookups from which the assistants are listed instead of retrieved by id. Defaults to 10.
+        """
+        self.client = client if client else get_openai_client()
+        self.ttl = ttl
+        self.page_size = page_size
+        self.list_threshold = list_threshold
+        self.list_count = 0  # number of times the assistants were listed
+        self._assistants = None  # id -> assistant
+        self._ids_by_name = {}
+        self._listed_at = None
+        self._listing = None  # set when the list in progress is done
+        self._changes = {}  # id -> assistant, or None if deleted, reported while the list is in progress
+        self._expected_lookups = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def expect_lookups(self, count: int):
+        """
+        Announces that count ids will be looked up within the block, for example by the agents of an agency that are
+        initialized together. If at least list_threshold lookups are expected, the assistants are listed once.
+        """
+        with self._lock:
+            self._expected_lookups += count
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._expected_lookups -= count
+
+    def get(self, assistant_id: str) -> Optional[Assistant]:
+        """Returns the assistant with the given id, or None if it does not exist."""
+        with self._lock:
+            use_list = self._is_fresh() or self._listing is not None \
+                or self._expected_lookups >= self.list_threshold
+        if use_list:
+            self._refresh()
+            with self._lock:
+                assistant = self._assistants.get(assistant_id) if self._assistants is not None else None
+            if assistant is not None:
+                return assistant
+
+        try:
+            with get_tracer().span("api.assistants.retrieve", "api", {"assistant_id": assistant_id}):
+                assistant = self.client.beta.assistants.retrieve(assistant_id)
+        except NotFoundError:
+            return None
+
+        self.update(assistant)
+        return assistant
+
+    def find_by_name(self, name: str) -> List[Assistant]:
+        """Returns all assistants with the given name, oldest first."""
+        self._refresh()
+        with self._lock:
+            if self._assistants is None:
+                # invalidated since the refresh
+                return []
+            return [self._assistants[assistant_id] for assistant_id in self._ids_by_name.get(name, [])]
+
+    def update(self, assistant: Assistant):
+        """Adds or replaces an assistant that was created or updated in this process."""
+        with self._lock:
+            self._apply(assistant.id, assistant)
+
+    def remove(self, assistant_id: str):
+        """Removes an assistant that was deleted in this process."""
+        with self._lock:
+            self._apply(assistant_id, None)
+
+    def invalidate(self):
+        """Drops the cached list, so the next lookup lists the assistants again."""
+        with self._lock:
+            self._assistants = None
+
+    def _refresh(self):
+        """
+        Lists the assistants if the cached list expired. Only one thread lists them at a time, without holding the
+        lock, while other threads wait for its result.
+        """
+        while True:
+            with self._lock:
+                if self._is_fresh():
+                    return
+                listing = self._listing
+                if listing is None:
+                    self._listing = threading.Event()
+                    self._changes = {}
+                    break
+            # listed by another thread, check its result again
+            listing.wait()
+
+        assistants = None
+        try:
+            assistants = self._list()
+        finally:
+            with self._lock:
+                if assistants is not None:
+                    self._assistants = {}
+                    self._ids_by_name = {}
+                    for assistant in assistants:
+                        self._add(assistant)
+                    # changes reported during the list may be missing from it
+                    for assistant_id, assistant in self._changes.items():
+                        self._remove(assistant_id)
+                        if assistant is not None:
+                            self._add(assistant)
+                    self._listed_at = time.monotonic()
+                    self.list_count += 1
+                self._changes = {}
+                listing, self._listing = self._listing, None
+            listing.set()
+
+    def _is_fresh(self):
+        return self._assistants is not None and time.monotonic() - self._listed_at < self.ttl
+
+    def _list(self):
+        assistants = []
+        with get_tracer().span("api.assistants.list", "api") as span:
+            page = self.client.beta.assistants.list(limit=self.page_size, order="asc")
+            pages = 1
+            assistants.extend(page.data)
+            # the cursor page of the client requests pages until an empty one, so check has_more too
+            while len(page.data) == self.page_size and getattr(page, "has_more", True) and page.has_next_page():
+                page = page.get_next_page()
+                pages += 1
+                assistants.extend(page.data)
+            span.set_attribute("assistants", len(assistants))
+            span.set_attribute("pages", pages)
+        return assistants
+
+    def _apply(self, assistant_id: str, assistant: Optional[Assistant]):
+        if self._listing is not None:
+            self._changes[assistant_id] = assistant
+        if self._assistants is not None:
+            self._remove(assistant_id)
+            if assistant is not None:
+                self._add(assistant)
+
+    def _add(self, assistant: Assistant):
+        self._assistants[assistant.id] = assistant
+        self._ids_by_name.setdefault(assistant.name, []).append(assistant.id)
+
+    def _remove(self, assistant_id: str):
+        assistant = self._assistants.pop(assistant_id, None)
+        if assistant is not None:
+            self._ids_by_name[assistant.name].remove(assistant_id)
+
+
+def get_assistant_resolver() -> AssistantResolver:
+    """
+    Returns the resolver shared by all agents of the process. A new resolver is created when the global OpenAI client
+    changes.
+    """
+    global _shared_resolver
+    client = get_openai_client()
+    with _shared_resolver_lock:
+        if _shared_resolver is None or _shared_resolver.client is not client:
+            _shared_resolver = AssistantResolver(client)
+        return _shared_resolver
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Callable, List
+
+
+class CancellationToken:
+    """
+    Bounds the wall time of a completion and allows cancelling it from another thread.
+
+    The token is passed through all nested threads and tools of a request. When it is cancelled, either explicitly or
+    because its deadline has passed, in-flight runs are cancelled and the completion returns a PartialResult.
+    """
+
+    def __init__(self, timeout: float = None):
+        """
+        Initializes the CancellationToken.
+
+        Parameters:
+            timeout (float, optional): The number of seconds after which the token is cancelled automatically. Defaults to None.
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next_callback_id = 0
+        self._timer = None
+
+        if timeout is not None:
+            self._timer = threading.Timer(max(timeout, 0), self.cancel, kwargs={"reason": "deadline exceeded"})
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        Cancels the token and fires all registered callbacks. Subsequent calls have no effect.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+
+        if self._timer:
+            self._timer.cancel()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancellation callback: {e}")
+
+    def remaining(self):
+        """Returns the number of seconds until the deadline, or None if the token has no deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleeps for up to timeout seconds, waking up early if the token is cancelled. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> int:
+        """
+        Registers a function to be called when the token is cancelled. If the token is already cancelled, the function
+        is called immediately.
+
+        Returns:
+            int: The id of the callback, that can be used to remove it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                callback_id = self._next_callback_id
+                self._next_callback_id += 1
+                self._callbacks[callback_id] = callback
+                return callback_id
+
+        callback()
+        return -1
+
+    def remove_callback(self, callback_id: int):
+        with self._lock:
+            self._callbacks.pop(callback_id, None)
+
+
+class PartialResult:
+    """
+    The result of a completion that was cancelled before it finished.
+    """
+
+    def __init__(self, message: str, reason: str, sender_name: str, recipient_name: str,
+                 tool_outputs: List[dict] = None):
+        """
+        Parameters:
+            message (str): The text received from the recipient agent before the completion was cancelled.
+            reason (str): The reason of the cancellation, for example 'deadline exceeded'.
+            sender_name (str): The name of the agent or user that sent the message.
+            recipient_name (str): The name of the agent that was processing the message.
+            tool_outputs (List[dict], optional): Tool outputs that were computed, but not submitted. Nested results of cancelled SendMessage calls are included as PartialResult objects.
+        """
+        self.message = message
+        self.reason = reason
+        self.sender_name = sender_name
+        self.recipient_name = recipient_name
+        self.tool_outputs = tool_outputs if tool_outputs else []
+
+    def __str__(self):
+        return f"{self.message}\n\n[Response incomplete: {self.reason}]" if self.message \
+            else f"[Response incomplete: {self.reason}]"
+
+    def __repr__(self):
+        return (f"PartialResult(sender={self.sender_name!r}, recipient={self.recipient_name!r}, "
+                f"reason={self.reason!r}, message={self.message!r})")
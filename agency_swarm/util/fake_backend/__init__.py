@@ -0,0 +1,3 @@
+from .backend import FakeBackend, FakeAPIError
+from .behaviors import RunContext, ScriptedBehavior, Reply, CallTools, Fail, echo_behavior
+from .behaviors import reply, call_tool, call_tools, delegate, fail
@@ -0,0 +1,522 @@
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict
+
+import httpx
+import openai
+
+from .behaviors import Behavior, CallTools, Fail, Reply, RunContext, echo_behavior, get_behavior, \
+    normalize_arguments
+
+ACTIVE_RUN_STATUSES = ["queued", "in_progress", "requires_action", "cancelling"]
+
+
+class FakeAPIError(Exception):
+    """An error response of the fake backend."""
+
+    def __init__(self, status_code: int, message: str, error_type: str = "invalid_request_error"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.error_type = error_type
+
+
+class FakeBackend:
+    """
+    In-process stand-in for the OpenAI Assistants API, for offline tests and load tests.
+
+    The backend keeps assistants, threads, messages, runs, run steps and files in memory, and is served to the real
+    OpenAI clients through an httpx transport, so the same code paths are used as with the live API, including
+    streaming. The behavior of each assistant is a function that receives the RunContext and returns the next action:
+    reply, call tools, delegate to another agent or fail.
+
+    Example:
+        backend = FakeBackend(behaviors={"CEO": ScriptedBehavior(delegate("Developer", "Build it"), reply("Done."))})
+        backend.install()
+        agency = Agency([ceo, [ceo, dev]])
+    """
+
+    def __init__(self,
+                 behaviors: Dict[str, Behavior] = None,
+                 default_behavior: Behavior = echo_behavior,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 run_latency: float = 0.0,
+                 failure_rate: float = 0.0,
+                 api_error_rate: float = 0.0,
+                 seed: int = None):
+        """
+        Initializes the FakeBackend.
+
+        Parameters:
+            behaviors (Dict[str, Behavior], optional): Behaviors by assistant name or id. Defaults to None.
+            default_behavior (Behavior, optional): The behavior of assistants without their own behavior. Defaults to echo_behavior.
+            latency (float, optional): The latency of every API request in seconds. Defaults to 0.0.
+            latency_jitter (float, optional): A random latency in seconds, up to this value, added to every request. Defaults to 0.0.
+            run_latency (float, optional): The time in seconds a run stays in progress before each step, simulating the model. Defaults to 0.0.
+            failure_rate (float, optional): The probability of a run step failing with a server error. Defaults to 0.0.
+            api_error_rate (float, optional): The probability of an API request failing with a 500 response. Defaults to 0.0.
+            seed (int, optional): Seed for latency jitter and failure injection. Defaults to None.
+        """
+        self.behaviors = dict(behaviors) if behaviors else {}
+        self.default_behavior = default_behavior
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.run_latency = run_latency
+        self.failure_rate = failure_rate
+        self.api_error_rate = api_error_rate
+
+        self.assistants = {}
+        self.threads = {}
+        self.messages = defaultdict(list)  # thread id -> messages
+        self.runs = defaultdict(dict)  # thread id -> run id -> run
+        self.run_steps = defaultdict(list)  # run id -> steps
+        self.files = {}
+
+        # stats
+        self.request_counts = defaultdict(int)  # "METHOD /path/template" -> count
+        self.injected_api_errors = 0
+        self.injected_run_failures = 0
+
+        self._run_states = {}  # run id -> private state of the run
+        self._last_run_ids = {}  # thread id -> id of the last run
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+    def set_behavior(self, assistant_name: str, behavior: Behavior):
+        self.behaviors[assistant_name] = behavior
+
+    def get_client(self, max_retries: int = 0) -> openai.OpenAI:
+        """Returns an OpenAI client connected to this backend."""
+        from .transport import FakeTransport
+        return openai.OpenAI(api_key="fake-key", base_url="https://fake.openai.local/v1", max_retries=max_retries,
+                             http_client=httpx.Client(transport=FakeTransport(self)))
+
+    def get_async_client(self, max_retries: int = 0) -> openai.AsyncOpenAI:
+        """Returns an AsyncOpenAI client connected to this backend."""
+        from .transport import AsyncFakeTransport
+        return openai.AsyncOpenAI(api_key="fake-key", base_url="https://fake.openai.local/v1",
+                                  max_retries=max_retries,
+                                  http_client=httpx.AsyncClient(transport=AsyncFakeTransport(self)))
+
+    def install(self, max_retries: int = 0):
+        """Sets the clients of this backend as the global clients of agency swarm."""
+        from agency_swarm.util.oai import set_openai_client, set_async_openai_client
+        set_openai_client(self.get_client(max_retries))
+        set_async_openai_client(self.get_async_client(max_retries))
+
+    def get_request_latency(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0
+            return self.latency + jitter
+
+    def should_fail_request(self) -> bool:
+        with self._lock:
+            if self.api_error_rate and self._random.random() < self.api_error_rate:
+                self.injected_api_errors += 1
+                return True
+            return False
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "requests": dict(self.request_counts),
+                "total_requests": sum(self.request_counts.values()),
+                "assistants": len(self.assistants),
+                "threads": len(self.threads),
+                "runs": len(self._run_states),
+                "files": len(self.files),
+                "injected_api_errors": self.injected_api_errors,
+                "injected_run_failures": self.injected_run_failures,
+            }
+
+    # assistants
+
+    def create_assistant(self, body: dict) -> dict:
+        assistant = {
+            "id": self._make_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "instructions": body.get("instructions"),
+            "model": body.get("model", "gpt-4-turbo"),
+            "tools": body.get("tools", []),
+            "file_ids": body.get("file_ids", []),
+            "metadata": body.get("metadata", {}),
+        }
+        with self._lock:
+            self.assistants[assistant["id"]] = assistant
+        return assistant
+
+    def get_assistant(self, assistant_id: str) -> dict:
+        with self._lock:
+            if assistant_id not in self.assistants:
+                raise FakeAPIError(404, f"No assistant found with id '{assistant_id}'.")
+            return self.assistants[assistant_id]
+
+    def update_assistant(self, assistant_id: str, body: dict) -> dict:
+        with self._lock:
+            assistant = self.get_assistant(assistant_id)
+            for key in ["name", "description", "instructions", "model", "tools", "file_ids", "metadata"]:
+                if key in body:
+                    assistant[key] = body[key]
+            return assistant
+
+    def delete_assistant(self, assistant_id: str) -> dict:
+        with self._lock:
+            self.get_assistant(assistant_id)
+            del self.assistants[assistant_id]
+        return {"id": assistant_id, "object": "assistant.deleted", "deleted": True}
+
+    # threads and messages
+
+    def create_thread(self, body: dict) -> dict:
+        thread = {"id": self._make_id("thread"), "object": "thread", "created_at": int(time.time()),
+                  "metadata": body.get("metadata", {})}
+        with self._lock:
+            self.threads[thread["id"]] = thread
+        for message in body.get("messages", []):
+            self.create_message(thread["id"], message)
+        return thread
+
+    def get_thread(self, thread_id: str) -> dict:
+        with self._lock:
+            if thread_id not in self.threads:
+                raise FakeAPIError(404, f"No thread found with id '{thread_id}'.")
+            return self.threads[thread_id]
+
+    def delete_thread(self, thread_id: str) -> dict:
+        with self._lock:
+            self.get_thread(thread_id)
+            del self.threads[thread_id]
+        return {"id": thread_id, "object": "thread.deleted", "deleted": True}
+
+    def create_message(self, thread_id: str, body: dict) -> dict:
+        with self._lock:
+            self.get_thread(thread_id)
+            if self._get_active_run(thread_id):
+                raise FakeAPIError(400, f"Can't add messages to {thread_id} while a run is active.")
+
+            message = self._make_message(thread_id, body.get("role", "user"), body.get("content", ""),
+                                         file_ids=body.get("file_ids", []), metadata=body.get("metadata", {}))
+            self.messages[thread_id].append(message)
+            return message
+
+    def get_message(self, thread_id: str, message_id: str) -> dict:
+        with self._lock:
+            for message in self.messages[thread_id]:
+                if message["id"] == message_id:
+                    return message
+        raise FakeAPIError(404, f"No message found with id '{message_id}'.")
+
+    def list_messages(self, thread_id: str) -> list:
+        with self._lock:
+            self.get_thread(thread_id)
+            return list(self.messages[thread_id])
+
+    # runs
+
+    def create_run(self, thread_id: str, body: dict, events: list = None) -> dict:
+        """
+        Creates a run. The first step of the run is decided right away and applied after run_latency, either when
+        the run is retrieved or by the stream.
+        """
+        with self._lock:
+            self.get_thread(thread_id)
+            assistant = self.get_assistant(body.get("assistant_id"))
+            if self._get_active_run(thread_id):
+                raise FakeAPIError(400, f"Thread {thread_id} already has an active run.")
+
+            now = int(time.time())
+            run = {
+                "id": self._make_id("run"),
+                "object": "thread.run",
+                "created_at": now,
+                "assistant_id": assistant["id"],
+                "thread_id": thread_id,
+                "status": "queued",
+                "started_at": None,
+                "expires_at": now + 600,
+                "cancelled_at": None,
+                "failed_at": None,
+                "completed_at": None,
+                "last_error": None,
+                "model": body.get("model") or assistant["model"],
+                "instructions": body.get("instructions") or assistant["instructions"],
+                "tools": body.get("tools") or assistant["tools"],
+                "file_ids": assistant["file_ids"],
+                "metadata": body.get("metadata", {}),
+                "required_action": None,
+                "usage": None,
+            }
+            self.runs[thread_id][run["id"]] = run
+            self._last_run_ids[thread_id] = run["id"]
+            self._run_states[run["id"]] = {
+                "assistant": assistant,
+                "additional_instructions": body.get("additional_instructions"),
+                "step": 0,
+                "tool_outputs": [],
+                "pending_tool_calls": [],
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+            self._emit(events, "thread.run.created", run)
+            self._emit(events, "thread.run.queued", run)
+            self._start_step(run, events)
+            return run
+
+    def get_run(self, thread_id: str, run_id: str) -> dict:
+        with self._lock:
+            run = self.runs[thread_id].get(run_id)
+            if run is None:
+                raise FakeAPIError(404, f"No run found with id '{run_id}'.")
+            self.advance_run(run)
+            return run
+
+    def list_runs(self, thread_id: str) -> list:
+        with self._lock:
+            self.get_thread(thread_id)
+            runs = list(self.runs[thread_id].values())
+            for run in runs:
+                self.advance_run(run)
+            return runs
+
+    def list_run_steps(self, thread_id: str, run_id: str) -> list:
+        with self._lock:
+            self.get_run(thread_id, run_id)
+            return list(self.run_steps[run_id])
+
+    def submit_tool_outputs(self, thread_id: str, run_id: str, body: dict, events: list = None) -> dict:
+        with self._lock:
+            run = self.get_run(thread_id, run_id)
+            if run["status"] != "requires_action":
+                raise FakeAPIError(400, f'Runs in status "{run["status"]}" do not accept tool outputs.')
+
+            state = self._run_states[run_id]
+            outputs = {tool_output["tool_call_id"]: tool_output.get("output", "")
+                       for tool_output in body.get("tool_outputs", [])}
+            missing = [tool_call["id"] for tool_call in state["pending_tool_calls"] if tool_call["id"] not in outputs]
+            if missing:
+                raise FakeAPIError(400, f"Expected tool outputs for call_ids {missing}.")
+
+            step = self.run_steps[run_id][-1]
+            for tool_call in step["step_details"]["tool_calls"]:
+                tool_call["function"]["output"] = outputs[tool_call["id"]]
+                state["tool_outputs"].append({"name": tool_call["function"]["name"],
+                                              "arguments": tool_call["function"]["arguments"],
+                                              "output": outputs[tool_call["id"]]})
+            self._complete_step(step, run, events)
+
+            state["pending_tool_calls"] = []
+            state["step"] += 1
+            run["required_action"] = None
+            run["status"] = "queued"
+            self._emit(events, "thread.run.queued", run)
+            self._start_step(run, events)
+            return run
+
+    def cancel_run(self, thread_id: str, run_id: str) -> dict:
+        with self._lock:
+            run = self.get_run(thread_id, run_id)
+            if run["status"] not in ACTIVE_RUN_STATUSES:
+                raise FakeAPIError(400, f"Cannot cancel run with status '{run['status']}'.")
+            run["status"] = "cancelled"
+            run["cancelled_at"] = int(time.time())
+            run["required_action"] = None
+            self._set_usage(run)
+            return run
+
+    def get_run_ready_time(self, run: dict) -> float:
+        """Returns the time when the pending step of the run is applied."""
+        state = self._run_states.get(run["id"])
+        return state.get("ready_at", 0) if state else 0
+
+    def advance_run(self, run: dict, events: list = None):
+        """
+        Applies the pending step of the run, if the run has been in progress for run_latency.
+        """
+        with self._lock:
+            state = self._run_states[run["id"]]
+            if run["status"] not in ["queued", "in_progress"] or time.monotonic() < state["ready_at"]:
+                return
+
+            action = state.pop("action")
+            if isinstance(action, Fail):
+                run["status"] = "failed"
+                run["failed_at"] = int(time.time())
+                run["last_error"] = {"code": action.code, "message": action.message}
+                self._set_usage(run)
+                self._emit(events, "thread.run.failed", run)
+            elif isinstance(action, CallTools):
+                self._call_tools(run, action, events)
+            else:
+                self._reply(run, action, events)
+
+    # files
+
+    def create_file(self, filename: str, content: bytes, purpose: str) -> dict:
+        file = {"id": self._make_id("file"), "object": "file", "bytes": len(content),
+                "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed",
+                "status_details": None}
+        with self._lock:
+            self.files[file["id"]] = file
+        return file
+
+    def get_file(self, file_id: str) -> dict:
+        with self._lock:
+            if file_id not in self.files:
+                raise FakeAPIError(404, f"No such File object: {file_id}")
+            return self.files[file_id]
+
+    def delete_file(self, file_id: str) -> dict:
+        with self._lock:
+            self.get_file(file_id)
+            del self.files[file_id]
+        return {"id": file_id, "object": "file", "deleted": True}
+
+    # internals
+
+    def _start_step(self, run, events):
+        state = self._run_states[run["id"]]
+        run["status"] = "in_progress"
+        run["started_at"] = run["started_at"] or int(time.time())
+        self._emit(events, "thread.run.in_progress", run)
+
+        context = RunContext(state["assistant"], run["thread_id"], list(self.messages[run["thread_id"]]),
+                             state["step"], list(state["tool_outputs"]), state["additional_instructions"])
+        action = get_behavior(self.behaviors, state["assistant"], self.default_behavior)(context)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.injected_run_failures += 1
+            action = Fail()
+        if not isinstance(action, (Reply, CallTools, Fail)):
+            action = Reply(str(action))
+
+        state["action"] = action
+        state["ready_at"] = time.monotonic() + self.run_latency
+        state["prompt_tokens"] += self._count_tokens(
+            "".join(content["text"]["value"] for message in context.messages for content in message["content"]),
+            run["instructions"] or "", state["additional_instructions"] or "",
+            "".join(str(tool_output["output"]) for tool_output in context.tool_outputs))
+
+        self.advance_run(run, events)
+
+    def _reply(self, run, action, events):
+        state = self._run_states[run["id"]]
+        message = self._make_message(run["thread_id"], "assistant", "", assistant_id=run["assistant_id"],
+                                     run_id=run["id"], status="in_progress")
+        step = self._make_step(run, "message_creation",
+                               {"type": "message_creation", "message_creation": {"message_id": message["id"]}})
+        self._emit(events, "thread.run.step.created", step)
+        self._emit(events, "thread.run.step.in_progress", step)
+
+        self.messages[run["thread_id"]].append(message)
+        self._emit(events, "thread.message.created", message)
+        self._emit(events, "thread.message.in_progress", message)
+
+        text = {"type": "text", "text": {"value": action.text, "annotations": []}}
+        self._emit(events, "thread.message.delta", {"id": message["id"], "object": "thread.message.delta",
+                                                    "delta": {"content": [dict(text, index=0)]}})
+        message["content"] = [text]
+        message["status"] = "completed"
+        message["completed_at"] = int(time.time())
+        self._emit(events, "thread.message.completed", message)
+
+        self._complete_step(step, run, events)
+        state["completion_tokens"] += self._count_tokens(action.text)
+        run["status"] = "completed"
+        run["completed_at"] = int(time.time())
+        self._set_usage(run)
+        self._emit(events, "thread.run.completed", run)
+
+    def _call_tools(self, run, action, events):
+        state = self._run_states[run["id"]]
+        tool_calls = [{"id": self._make_id("call"), "type": "function",
+                       "function": {"name": call["name"], "arguments": normalize_arguments(call["arguments"]),
+                                    "output": None}}
+                      for call in action.calls]
+
+        step = self._make_step(run, "tool_calls", {"type": "tool_calls", "tool_calls": []})
+        self._emit(events, "thread.run.step.created", step)
+        self._emit(events, "thread.run.step.in_progress", step)
+        self._emit(events, "thread.run.step.delta", {
+            "id": step["id"],
+            "object": "thread.run.step.delta",
+            "delta": {"step_details": {"type": "tool_calls",
+                                       "tool_calls": [dict(tool_call, index=i) for i, tool_call in
+                                                      enumerate(tool_calls)]}},
+        })
+        step["step_details"]["tool_calls"] = tool_calls
+
+        state["pending_tool_calls"] = tool_calls
+        state["completion_tokens"] += self._count_tokens(*[call["function"]["arguments"] for call in tool_calls])
+        run["status"] = "requires_action"
+        run["required_action"] = {
+            "type": "submit_tool_outputs",
+            "submit_tool_outputs": {"tool_calls": [{"id": tool_call["id"], "type": "function",
+                                                    "function": {"name": tool_call["function"]["name"],
+                                                                 "arguments": tool_call["function"]["arguments"]}}
+                                                   for tool_call in tool_calls]},
+        }
+        self._emit(events, "thread.run.requires_action", run)
+
+    def _make_step(self, run, step_type, step_details):
+        step = {"id": self._make_id("step"), "object": "thread.run.step", "created_at": int(time.time()),
+                "assistant_id": run["assistant_id"], "thread_id": run["thread_id"], "run_id": run["id"],
+                "type": step_type, "status": "in_progress", "step_details": step_details, "cancelled_at": None,
+                "completed_at": None, "expired_at": None, "failed_at": None, "last_error": None, "metadata": None,
+                "usage": None}
+        self.run_steps[run["id"]].append(step)
+        return step
+
+    def _complete_step(self, step, run, events):
+        step["status"] = "completed"
+        step["completed_at"] = int(time.time())
+        self._emit(events, "thread.run.step.completed", step)
+
+    def _make_message(self, thread_id, role, content, file_ids=None, metadata=None, assistant_id=None, run_id=None,
+                      status="completed"):
+        if isinstance(content, str):
+            content = [{"type": "text", "text": {"value": content, "annotations": []}}] if content else []
+        return {"id": self._make_id("msg"), "object": "thread.message", "created_at": int(time.time()),
+                "thread_id": thread_id, "role": role, "content": content, "file_ids": file_ids or [],
+                "assistant_id": assistant_id, "run_id": run_id, "metadata": metadata or {}, "status": status,
+                "completed_at": None, "incomplete_at": None, "incomplete_details": None}
+
+    def _set_usage(self, run):
+        state = self._run_states[run["id"]]
+        run["usage"] = {"prompt_tokens": state["prompt_tokens"], "completion_tokens": state["completion_tokens"],
+                        "total_tokens": state["prompt_tokens"] + state["completion_tokens"]}
+
+    def _get_active_run(self, thread_id):
+        # runs of a thread are sequential, so only the last one can be active
+        run = self.runs[thread_id].get(self._last_run_ids.get(thread_id))
+        if run is None:
+            return None
+        self.advance_run(run)
+        return run if run["status"] in ACTIVE_RUN_STATUSES else None
+
+    @staticmethod
+    def _emit(events, event, data):
+        if events is not None:
+            # snapshot the object, since it keeps changing after the event
+            events.append((event, _copy(data)))
+
+    @staticmethod
+    def _count_tokens(*texts) -> int:
+        return sum((len(text.encode()) + 3) // 4 for text in texts)
+
+    @staticmethod
+    def _make_id(prefix):
+        return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _copy(data):
+    if isinstance(data, dict):
+        return {key: _copy(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_copy(value) for value in data]
+    return data
@@ -0,0 +1,127 @@
+import json
+from typing import Callable, Dict, List, Union
+
+
+class Reply:
+    """The assistant replies with a text message and completes the run."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class CallTools:
+    """The assistant calls one or more tools and the run requires action."""
+
+    def __init__(self, calls: List[dict]):
+        """
+        Parameters:
+            calls (List[dict]): Tool calls with 'name' and 'arguments' keys. Arguments can be a dict or a JSON string.
+        """
+        self.calls = calls
+
+
+class Fail:
+    """The run fails with the given error."""
+
+    def __init__(self, code: str = "server_error", message: str = "Sorry, something went wrong."):
+        self.code = code
+        self.message = message
+
+
+def reply(text: str) -> Reply:
+    return Reply(text)
+
+
+def call_tool(name: str, **arguments) -> CallTools:
+    return CallTools([{"name": name, "arguments": arguments}])
+
+
+def call_tools(*calls: CallTools) -> CallTools:
+    """Combines several call_tool actions into a single step with parallel tool calls."""
+    return CallTools([call for action in calls for call in action.calls])
+
+
+def delegate(recipient: str, message: str, **kwargs) -> CallTools:
+    """Calls the SendMessage tool of the agency to send a message to the recipient agent."""
+    arguments = {"my_primary_instructions": "Delegate the task to " + recipient + ".",
+                 "recipient": recipient,
+                 "message": message}
+    arguments.update(kwargs)
+    return CallTools([{"name": "SendMessage", "arguments": arguments}])
+
+
+def fail(code: str = "server_error", message: str = "Sorry, something went wrong.") -> Fail:
+    return Fail(code, message)
+
+
+class RunContext:
+    """
+    What the behavior of an assistant can see when it decides the next step of a run.
+    """
+
+    def __init__(self, assistant: dict, thread_id: str, messages: List[dict], step: int, tool_outputs: List[dict],
+                 additional_instructions: str = None):
+        self.assistant = assistant
+        self.thread_id = thread_id
+        self.messages = messages
+        self.step = step  # number of tool call steps already completed in this run
+        self.tool_outputs = tool_outputs  # outputs submitted in this run, with 'name', 'arguments' and 'output' keys
+        self.additional_instructions = additional_instructions
+
+    @property
+    def assistant_name(self) -> str:
+        return self.assistant.get("name")
+
+    @property
+    def last_user_message(self) -> str:
+        for message in reversed(self.messages):
+            if message["role"] == "user":
+                return "".join(content["text"]["value"] for content in message["content"])
+        return ""
+
+    def has_tool(self, name: str) -> bool:
+        return any(tool.get("type") == "function" and tool["function"]["name"] == name
+                   for tool in self.assistant.get("tools", []))
+
+
+Action = Union[Reply, CallTools, Fail]
+Behavior = Callable[[RunContext], Action]
+
+
+def echo_behavior(context: RunContext) -> Action:
+    """
+    The default behavior. Replies with the outputs of the tools called in this run, or echoes the last user message.
+    """
+    if context.tool_outputs:
+        return Reply("\n".join(str(tool_output["output"]) for tool_output in context.tool_outputs))
+    return Reply("Echo: " + context.last_user_message)
+
+
+class ScriptedBehavior:
+    """
+    Returns the scripted actions of a run in order, one for each step. Each run of the assistant starts from the first
+    action. When the script is exhausted, the final behavior is used, which defaults to echo_behavior.
+
+    Example:
+        ScriptedBehavior(call_tool("GetWeather", city="Paris"), reply("It is sunny."))
+    """
+
+    def __init__(self, *actions: Union[Action, Behavior], final: Behavior = echo_behavior):
+        self.actions = actions
+        self.final = final
+
+    def __call__(self, context: RunContext) -> Action:
+        if context.step >= len(self.actions):
+            return self.final(context)
+
+        action = self.actions[context.step]
+        return action(context) if callable(action) else action
+
+
+def normalize_arguments(arguments: Union[str, dict]) -> str:
+    return arguments if isinstance(arguments, str) else json.dumps(arguments)
+
+
+def get_behavior(behaviors: Dict[str, Behavior], assistant: dict, default: Behavior) -> Behavior:
+    behavior = behaviors.get(assistant.get("name")) or behaviors.get(assistant["id"])
+    return behavior if behavior else default
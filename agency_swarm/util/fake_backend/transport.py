@@ -0,0 +1,243 @@
+import asyncio
+import json
+import re
+import time
+
+import httpx
+
+from .backend import FakeAPIError, FakeBackend
+
+ROUTES = [
+    ("POST", "/assistants", "create_assistant"),
+    ("GET", "/assistants", "list_assistants"),
+    ("GET", "/assistants/{assistant_id}", "get_assistant"),
+    ("POST", "/assistants/{assistant_id}", "update_assistant"),
+    ("DELETE", "/assistants/{assistant_id}", "delete_assistant"),
+    ("POST", "/threads", "create_thread"),
+    ("GET", "/threads/{thread_id}", "get_thread"),
+    ("DELETE", "/threads/{thread_id}", "delete_thread"),
+    ("POST", "/threads/{thread_id}/messages", "create_message"),
+    ("GET", "/threads/{thread_id}/messages", "list_messages"),
+    ("GET", "/threads/{thread_id}/messages/{message_id}", "get_message"),
+    ("POST", "/threads/{thread_id}/runs", "create_run"),
+    ("GET", "/threads/{thread_id}/runs", "list_runs"),
+    ("GET", "/threads/{thread_id}/runs/{run_id}", "get_run"),
+    ("POST", "/threads/{thread_id}/runs/{run_id}/cancel", "cancel_run"),
+    ("POST", "/threads/{thread_id}/runs/{run_id}/submit_tool_outputs", "submit_tool_outputs"),
+    ("GET", "/threads/{thread_id}/runs/{run_id}/steps", "list_run_steps"),
+    ("POST", "/files", "create_file"),
+    ("GET", "/files", "list_files"),
+    ("GET", "/files/{file_id}", "get_file"),
+    ("DELETE", "/files/{file_id}", "delete_file"),
+]
+ROUTES = [(method, re.compile("^/v1" + re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", path) + "$"), path, handler)
+          for method, path, handler in ROUTES]
+
+
+class FakeRequestHandler:
+    """
+    Maps HTTP requests of the OpenAI clients to FakeBackend calls. Requests with 'stream: true' return server-sent
+    events, that are generated while the stream is consumed.
+    """
+
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    def handle(self, request: httpx.Request):
+        """
+        Returns (status_code, body, stream), where stream is a (run, events) tuple for streaming requests, or None.
+        """
+        for method, regex, pattern, handler in ROUTES:
+            match = regex.match(request.url.path)
+            if match and method == request.method:
+                break
+        else:
+            return 404, _error(f"Unknown endpoint {request.method} {request.url.path}"), None
+
+        with self.backend._lock:
+            self.backend.request_counts[f"{method} {pattern}"] += 1
+
+        if self.backend.should_fail_request():
+            return 500, _error("The server had an error while processing your request.", "server_error"), None
+
+        body = {}
+        if request.method == "POST" and request.headers.get("content-type", "").startswith("application/json"):
+            body = json.loads(request.content or b"{}")
+
+        try:
+            return getattr(self, handler)(request, body, **match.groupdict())
+        except FakeAPIError as e:
+            return e.status_code, _error(e.message, e.error_type), None
+
+    def create_assistant(self, request, body):
+        return 200, self.backend.create_assistant(body), None
+
+    def list_assistants(self, request, body):
+        return 200, _page(list(self.backend.assistants.values()), request), None
+
+    def get_assistant(self, request, body, assistant_id):
+        return 200, self.backend.get_assistant(assistant_id), None
+
+    def update_assistant(self, request, body, assistant_id):
+        return 200, self.backend.update_assistant(assistant_id, body), None
+
+    def delete_assistant(self, request, body, assistant_id):
+        return 200, self.backend.delete_assistant(assistant_id), None
+
+    def create_thread(self, request, body):
+        return 200, self.backend.create_thread(body), None
+
+    def get_thread(self, request, body, thread_id):
+        return 200, self.backend.get_thread(thread_id), None
+
+    def delete_thread(self, request, body, thread_id):
+        return 200, self.backend.delete_thread(thread_id), None
+
+    def create_message(self, request, body, thread_id):
+        return 200, self.backend.create_message(thread_id, body), None
+
+    def list_messages(self, request, body, thread_id):
+        return 200, _page(self.backend.list_messages(thread_id), request), None
+
+    def get_message(self, request, body, thread_id, message_id):
+        return 200, self.backend.get_message(thread_id, message_id), None
+
+    def create_run(self, request, body, thread_id):
+        events = [] if body.get("stream") else None
+        run = self.backend.create_run(thread_id, body, events)
+        return 200, run, (run, events) if events is not None else None
+
+    def list_runs(self, request, body, thread_id):
+        return 200, _page(self.backend.list_runs(thread_id), request), None
+
+    def get_run(self, request, body, thread_id, run_id):
+        return 200, self.backend.get_run(thread_id, run_id), None
+
+    def cancel_run(self, request, body, thread_id, run_id):
+        return 200, self.backend.cancel_run(thread_id, run_id), None
+
+    def submit_tool_outputs(self, request, body, thread_id, run_id):
+        events = [] if body.get("stream") else None
+        run = self.backend.submit_tool_outputs(thread_id, run_id, body, events)
+        return 200, run, (run, events) if events is not None else None
+
+    def list_run_steps(self, request, body, thread_id, run_id):
+        return 200, _page(self.backend.list_run_steps(thread_id, run_id), request), None
+
+    def create_file(self, request, body):
+        content = request.read()
+        filename = re.search(rb'filename="([^"]*)"', content)
+        purpose = re.search(rb'name="purpose"\r\n\r\n([^\r]*)', content)
+        file = self.backend.create_file(filename.group(1).decode() if filename else "file",
+                                        content, purpose.group(1).decode() if purpose else "assistants")
+        return 200, file, None
+
+    def list_files(self, request, body):
+        return 200, {"object": "list", "data": list(self.backend.files.values()), "has_more": False}, None
+
+    def get_file(self, request, body, file_id):
+        return 200, self.backend.get_file(file_id), None
+
+    def delete_file(self, request, body, file_id):
+        return 200, self.backend.delete_file(file_id), None
+
+    def iter_stream(self, run, events):
+        """Yields the SSE chunks of a run stream, waiting for the run steps like the live API."""
+        yield from (_sse(event, data) for event, data in events)
+        while True:
+            delay = self.backend.get_run_ready_time(run) - time.monotonic()
+            if delay > 0:
+                yield delay
+            events = []
+            self.backend.advance_run(run, events)
+            yield from (_sse(event, data) for event, data in events)
+            if run["status"] == "cancelled":
+                yield _sse("thread.run.cancelled", run)
+            if run["status"] not in ["queued", "in_progress"]:
+                break
+        yield b"event: done\ndata: [DONE]\n\n"
+
+
+class _SyncStream(httpx.SyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if isinstance(chunk, float):
+                time.sleep(chunk)
+            else:
+                yield chunk
+
+
+class _AsyncStream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            if isinstance(chunk, float):
+                await asyncio.sleep(chunk)
+            else:
+                yield chunk
+
+
+class FakeTransport(httpx.BaseTransport):
+    """httpx transport that serves requests of the sync OpenAI client from a FakeBackend."""
+
+    def __init__(self, backend: FakeBackend):
+        self.handler = FakeRequestHandler(backend)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        latency = self.handler.backend.get_request_latency()
+        if latency:
+            time.sleep(latency)
+
+        status_code, body, stream = self.handler.handle(request)
+        if stream:
+            return httpx.Response(status_code, headers={"content-type": "text/event-stream"},
+                                  stream=_SyncStream(self.handler.iter_stream(*stream)), request=request)
+        return httpx.Response(status_code, json=body, request=request)
+
+
+class AsyncFakeTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves requests of the AsyncOpenAI client from a FakeBackend."""
+
+    def __init__(self, backend: FakeBackend):
+        self.handler = FakeRequestHandler(backend)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        latency = self.handler.backend.get_request_latency()
+        if latency:
+            await asyncio.sleep(latency)
+
+        await request.aread()
+        status_code, body, stream = self.handler.handle(request)
+        if stream:
+            return httpx.Response(status_code, headers={"content-type": "text/event-stream"},
+                                  stream=_AsyncStream(self.handler.iter_stream(*stream)), request=request)
+        return httpx.Response(status_code, json=body, request=request)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def _error(message, error_type="invalid_request_error"):
+    return {"error": {"message": message, "type": error_type, "param": None, "code": None}}
+
+
+def _page(items, request):
+    """Returns a cursor page of the items, with the order, limit and after query parameters of the request."""
+    params = request.url.params
+    if params.get("order", "desc") == "desc":
+        items = items[::-1]
+
+    if params.get("after"):
+        ids = [item["id"] for item in items]
+        items = items[ids.index(params["after"]) + 1:] if params["after"] in ids else []
+
+    limit = int(params.get("limit", 20))
+    page = items[:limit]
+    return {"object": "list", "data": page, "first_id": page[0]["id"] if page else None,
+            "last_id": page[-1]["id"] if page else None, "has_more": len(items) > limit}
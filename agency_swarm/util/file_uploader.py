@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.tracing import get_tracer
+
+
+class FileUploader:
+    """
+    Uploads the files of agents to OpenAI, identifying them by the sha256 hash of their content.
+
+    A json manifest maps the hash of each uploaded file to its file id, so a file is only uploaded again if its content
+    changed. New files are uploaded concurrently, and files requested by several agents at the same time, such as the
+    shared files of an agency, are uploaded once. Local files are never modified.
+    """
+
+    def __init__(self, client=None, manifest_path: Optional[str] = None, max_workers: int = 4):
+        """
+        Initializes the FileUploader.
+
+        Parameters:
+            client (OpenAI, optional): The client used to upload files. Defaults to the global client.
+            manifest_path (str, optional): The json file where the file ids of uploaded files are kept. Agents and agencies keep it next to their settings file. If None, they are only kept in memory. Defaults to None.
+            max_workers (int, optional): The maximum number of files uploaded at the same time. Defaults to 4.
+        """
+        self.client = client if client else get_openai_client()
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        self.upload_count = 0  # number of files uploaded by this uploader
+        self._manifest = self._load_manifest()  # hash -> {"file_id", "name"}
+        self._hashes = {}  # (path, size, mtime) -> hash
+        self._pending: Dict[str, Future] = {}  # hash -> upload in progress
+        self._lock = threading.Lock()
+
+    def upload(self, f_paths: List[str]) -> List[str]:
+        """
+        Uploads the files that were not uploaded before.
+
+        Parameters:
+            f_paths (List[str]): The paths of the files.
+
+        Returns:
+            List[str]: The file ids of the files in order, without duplicates.
+        """
+        hashes = [self.get_hash(f_path) for f_path in f_paths]
+
+        futures = {}
+        new_uploads = []
+        with self._lock:
+            for f_path, file_hash in zip(f_paths, hashes):
+                if file_hash in futures:
+                    continue
+                if file_hash in self._manifest:
+                    future = Future()
+                    future.set_result(self._manifest[file_hash]["file_id"])
+                elif file_hash in self._pending:
+                    future = self._pending[file_hash]
+                else:
+                    future = Future()
+                    self._pending[file_hash] = future
+                    new_uploads.append((f_path, file_hash, future))
+                futures[file_hash] = future
+
+        if new_uploads:
+            max_workers = max(min(self.max_workers, len(new_uploads)), 1)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agency_swarm_upload") as executor:
+                for upload in new_uploads:
+                    executor.submit(self._upload, *upload)
+            self._save_manifest()
+
+        file_ids = []
+        for file_hash in futures:
+            file_id = futures[file_hash].result()
+            if file_id not in file_ids:
+                file_ids.append(file_id)
+        return file_ids
+
+    def forget(self, file_ids: List[str]):
+        """Removes deleted files from the manifest, so that they are uploaded again when needed."""
+        file_ids = set(file_ids)
+        with self._lock:
+            self._manifest = {k: v for k, v in self._manifest.items() if v["file_id"] not in file_ids}
+        self._save_manifest(forgotten=file_ids)
+
+    def get_file_id(self, f_path: str) -> Optional[str]:
+        """Returns the file id of a file whose content was already uploaded, or None."""
+        file_hash = self.get_hash(f_path)
+        with self._lock:
+            entry = self._manifest.get(file_hash)
+        return entry["file_id"] if entry else None
+
+    def get_hash(self, f_path: str) -> str:
+        """Returns the sha256 hash of the content of a file. Hashes are cached until the file is modified."""
+        stat = os.stat(f_path)
+        key = (os.path.abspath(f_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+
+        sha256 = hashlib.sha256()
+        with open(f_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(chunk)
+        file_hash = sha256.hexdigest()
+
+        with self._lock:
+            self._hashes[key] = file_hash
+        return file_hash
+
+    def _upload(self, f_path, file_hash, future):
+        try:
+            with get_tracer().span("api.files.create", "api", {"file": os.path.basename(f_path)}):
+                with open(f_path, 'rb') as f:
+                    file_id = self.client.with_options(timeout=80).files.create(file=f, purpose="assistants").id
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(file_hash, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._manifest[file_hash] = {"file_id": file_id, "name": os.path.basename(f_path)}
+            self._pending.pop(file_hash, None)
+            self.upload_count += 1
+        future.set_result(file_id)
+
+    def _load_manifest(self):
+        if not self.manifest_path or not os.path.isfile(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Could not read files manifest '{self.manifest_path}': {e}")
+            return {}
+
+    def _save_manifest(self, forgotten=()):
+        if not self.manifest_path:
+            return
+        with self._lock:
+            manifest = dict(self._manifest)
+        # keep the entries of other processes sharing the manifest
+        for file_hash, entry in self._load_manifest().items():
+            if entry["file_id"] not in forgotten:
+                manifest.setdefault(file_hash, entry)
+
+        try:
+            folder = os.path.dirname(os.path.abspath(self.manifest_path))
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, indent=4)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            # for example on a read-only filesystem, the file ids are kept in memory
+            warnings.warn(f"Could not save files manifest '{self.manifest_path}': {e}")
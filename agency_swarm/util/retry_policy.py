@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+from collections import deque, defaultdict
+from typing import List
+
+
+class RetryPolicy:
+    """
+    Decides whether and when failed runs are retried.
+
+    Errors are classified into categories, and only the categories in retryable_errors are retried. Delays grow
+    exponentially with each attempt and are randomized with jitter, so that many threads failing at the same time do
+    not retry in lockstep. Only the categories in backoff_errors wait before a retry, others, like expired runs, are
+    retried immediately. An optional retry budget limits the number of retries across all threads that share the
+    policy within a time window, which stops retry storms during outages.
+
+    Error categories:
+
+    - "server_error": the run failed with a server error, like "Sorry, something went wrong".
+    - "rate_limit": the run failed because a rate limit was exceeded.
+    - "expired": the run expired before the tool outputs were submitted. Outputs of tools that were already executed
+      are replayed when the agent repeats the same calls, instead of executing the tools again.
+    - "fatal": any other error. It is never retried.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 5,
+                 initial_delay: float = 1.0,
+                 max_delay: float = 30.0,
+                 backoff_factor: float = 2.0,
+                 jitter: float = 0.5,
+                 retryable_errors: List[str] = None,
+                 backoff_errors: List[str] = None,
+                 retry_budget: int = None,
+                 budget_window: float = 60.0,
+                 continue_message: str = "Continue."):
+        """
+        Initializes the RetryPolicy.
+
+        Parameters:
+            max_attempts (int, optional): The maximum number of retries of a single message. Defaults to 5.
+            initial_delay (float, optional): The delay before the first retry in seconds. Defaults to 1.0.
+            max_delay (float, optional): The maximum delay between retries in seconds. Defaults to 30.0.
+            backoff_factor (float, optional): The factor by which the delay grows after each retry. Defaults to 2.0.
+            jitter (float, optional): The share of the delay that is randomized, between 0 and 1. Defaults to 0.5.
+            retryable_errors (List[str], optional): The error categories that are retried. Defaults to ["server_error", "expired"].
+            backoff_errors (List[str], optional): The error categories that wait with exponential backoff before a retry, other categories are retried immediately. Defaults to ["server_error", "rate_limit"].
+            retry_budget (int, optional): The maximum number of retries within budget_window across all threads using this policy. Defaults to None, no limit.
+            budget_window (float, optional): The length of the retry budget window in seconds. Defaults to 60.0.
+            continue_message (str, optional): The message sent to the agent before retrying a failed run, starting from the second retry. Defaults to "Continue.".
+        """
+        if max_attempts < 0 or initial_delay < 0 or max_delay < initial_delay or backoff_factor < 1:
+            raise ValueError("Invalid retry policy. Attempts and delays must not be negative, max_delay must not be "
+                             "lower than initial_delay and backoff_factor must be at least 1.")
+        if not 0 <= jitter <= 1:
+            raise ValueError("Jitter must be between 0 and 1.")
+
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.retryable_errors = retryable_errors if retryable_errors is not None else ["server_error", "expired"]
+        self.backoff_errors = backoff_errors if backoff_errors is not None else ["server_error", "rate_limit"]
+        self.retry_budget = retry_budget
+        self.budget_window = budget_window
+        self.continue_message = continue_message
+
+        self.errors = defaultdict(int)  # error category -> number of errors
+        self.retries = defaultdict(int)  # error category -> number of retries
+        self.give_ups = 0
+        self.budget_exhausted = 0
+        self.replayed_tool_outputs = 0
+
+        self._retry_times = deque()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(error) -> str:
+        """
+        Returns the category of a run error or an exception.
+        """
+        code = getattr(error, "code", None)
+        message = str(getattr(error, "message", error)).lower()
+
+        if 'status "expired"' in message or code == "expired":
+            return "expired"
+        if code == "rate_limit_exceeded" or "rate limit" in message:
+            return "rate_limit"
+        if code == "server_error" or "something went wrong" in message:
+            return "server_error"
+        return "fatal"
+
+    def should_retry(self, error, attempt: int) -> bool:
+        """
+        Records the error and returns True if it should be retried.
+
+        Parameters:
+            error: The run error or exception.
+            attempt (int): The number of retries already made for the current message.
+        """
+        category = self.classify(error)
+
+        with self._lock:
+            self.errors[category] += 1
+
+            if category not in self.retryable_errors or attempt >= self.max_attempts:
+                self.give_ups += 1
+                return False
+
+            if self.retry_budget is not None:
+                now = time.monotonic()
+                while self._retry_times and self._retry_times[0] <= now - self.budget_window:
+                    self._retry_times.popleft()
+                if len(self._retry_times) >= self.retry_budget:
+                    self.budget_exhausted += 1
+                    self.give_ups += 1
+                    return False
+                self._retry_times.append(now)
+
+            self.retries[category] += 1
+            return True
+
+    def get_delay(self, attempt: int, error=None) -> float:
+        """
+        Returns the delay in seconds before the given retry attempt, starting from 0.
+
+        Parameters:
+            attempt (int): The number of retries already made for the current message.
+            error (optional): The run error or exception. Errors outside of backoff_errors have no delay.
+        """
+        if error is not None and self.classify(error) not in self.backoff_errors:
+            return 0.0
+        delay = min(self.initial_delay * self.backoff_factor ** attempt, self.max_delay)
+        return delay * (1 - self.jitter * random.random())
+
+    def record_replay(self, count: int = 1):
+        with self._lock:
+            self.replayed_tool_outputs += count
+
+    def get_stats(self):
+        """Returns the retry counters."""
+        with self._lock:
+            return {
+                "errors": dict(self.errors),
+                "retries": dict(self.retries),
+                "give_ups": self.give_ups,
+                "budget_exhausted": self.budget_exhausted,
+                "replayed_tool_outputs": self.replayed_tool_outputs,
+            }
@@ -0,0 +1,298 @@
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows, only threads of the same process are serialized
+    fcntl = None
+
+# locks of the settings files by path, shared by all stores of the process
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+
+class SettingsStore(ABC):
+    """
+    Stores the settings of the assistants of an agency, one entry per assistant, as returned by
+    assistant.model_dump(). Entries are looked up by assistant id, and by name when an agent is loaded.
+    """
+
+    @abstractmethod
+    def get(self, assistant_id: str) -> Optional[dict]:
+        """Returns the settings of the assistant with the given id, or None."""
+
+    @abstractmethod
+    def find_by_name(self, name: str) -> List[dict]:
+        """Returns the settings of all assistants with the given name, oldest first."""
+
+    @abstractmethod
+    def get_all(self) -> List[dict]:
+        """Returns the settings of all assistants, in the order they were added."""
+
+    @abstractmethod
+    def save(self, settings: dict):
+        """Adds the settings of an assistant, or replaces them if an entry with the same id exists."""
+
+    @abstractmethod
+    def delete(self, assistant_id: str):
+        """Removes the settings of the assistant with the given id, if any."""
+
+    def flush(self):
+        """Writes pending changes. Stores that write every change right away do nothing."""
+
+
+class InMemorySettingsStore(SettingsStore):
+    """
+    Keeps the settings in memory, indexed by id and name. Nothing is persisted.
+    """
+
+    def __init__(self, settings: List[dict] = None):
+        """
+        Initializes the InMemorySettingsStore.
+
+        Parameters:
+            settings (List[dict], optional): Initial settings, in the format of settings.json. Defaults to None.
+        """
+        self._lock = threading.RLock()
+        self._set_settings(settings if settings else [])
+
+    def get(self, assistant_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._settings.get(assistant_id)
+
+    def find_by_name(self, name: str) -> List[dict]:
+        with self._lock:
+            return [self._settings[assistant_id] for assistant_id in self._ids_by_name.get(name, [])]
+
+    def get_all(self) -> List[dict]:
+        with self._lock:
+            return list(self._settings.values())
+
+    def save(self, settings: dict):
+        with self._lock:
+            self._index(settings)
+
+    def delete(self, assistant_id: str):
+        with self._lock:
+            settings = self._settings.pop(assistant_id, None)
+            if settings is not None:
+                self._ids_by_name[settings.get("name")].remove(assistant_id)
+
+    def _set_settings(self, settings: List[dict]):
+        with self._lock:
+            self._settings = {}  # id -> settings, in insertion order
+            self._ids_by_name = {}
+            for assistant_settings in settings:
+                self._index(assistant_settings)
+
+    def _index(self, settings: dict):
+        previous = self._settings.get(settings["id"])
+        if previous is not None and previous.get("name") != settings.get("name"):
+            self._ids_by_name[previous.get("name")].remove(settings["id"])
+            previous = None
+        self._settings[settings["id"]] = settings
+        if previous is None:
+            self._ids_by_name.setdefault(settings.get("name"), []).append(settings["id"])
+
+
+class JsonFileSettingsStore(InMemorySettingsStore):
+    """
+    Stores the settings in a single JSON file, in the format of settings.json.
+
+    The file is read once and served from memory. Changes are written atomically, by replacing the file with a
+    complete temporary file, while holding a lock on '<path>.lock', so several processes can share the same file.
+    The file is read again before each write and only the changed entries are applied, so concurrent changes of other
+    processes are kept. With a debounce delay, changes made within the delay are written together.
+    """
+
+    def __init__(self, path: str = "./settings.json", debounce: float = 0.0):
+        """
+        Initializes the JsonFileSettingsStore.
+
+        Parameters:
+            path (str, optional): The path of the JSON file. It is created on the first write. Defaults to "./settings.json".
+            debounce (float, optional): The number of seconds to wait for more changes before writing. Pending changes are also written by flush() and when the process exits. Defaults to 0.0.
+        """
+        self.path = path
+        self.debounce = debounce
+        self._pending = {}  # id -> settings, or None if deleted
+        self._timer = None
+        super().__init__(self._read())
+
+    def save(self, settings: dict):
+        with self._lock:
+            super().save(settings)
+            self._schedule_write(settings["id"], settings)
+
+    def delete(self, assistant_id: str):
+        with self._lock:
+            super().delete(assistant_id)
+            self._schedule_write(assistant_id, None)
+
+    def reload(self):
+        """Reads the file again, to see the changes of other processes. Pending changes are written first."""
+        with self._lock:
+            self.flush()
+            self._set_settings(self._read())
+
+    def flush(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+                atexit.unregister(self.flush)
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+            with self._file_lock():
+                settings = {assistant_settings["id"]: assistant_settings for assistant_settings in self._read()}
+                for assistant_id, assistant_settings in pending.items():
+                    if assistant_settings is None:
+                        settings.pop(assistant_id, None)
+                    else:
+                        settings[assistant_id] = assistant_settings
+                self._write(list(settings.values()))
+
+    def _schedule_write(self, assistant_id: str, settings: Optional[dict]):
+        self._pending[assistant_id] = settings
+        if self.debounce <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+            atexit.register(self.flush)
+
+    def _read(self) -> List[dict]:
+        if not os.path.isfile(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            content = f.read()
+        return json.loads(content) if content.strip() else []
+
+    def _write(self, settings: List[dict]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".settings-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(settings, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @contextmanager
+    def _file_lock(self):
+        path = os.path.abspath(self.path)
+        with _file_locks_lock:
+            lock = _file_locks.setdefault(path, threading.Lock())
+
+        with lock:
+            if fcntl is None:
+                yield
+                return
+
+            with open(path + ".lock", 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class SQLiteSettingsStore(SettingsStore):
+    """
+    Stores the settings in a local SQLite database, indexed by assistant id and name. Every change is a single row
+    update, so the cost does not grow with the number of assistants, and the database can be shared by several
+    processes.
+    """
+
+    def __init__(self, path: str = "./settings.db"):
+        """
+        Initializes the SQLiteSettingsStore.
+
+        Parameters:
+            path (str, optional): The path of the database file. It is created if it does not exist. Defaults to "./settings.db".
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS assistants "
+                                     "(id TEXT PRIMARY KEY, name TEXT, settings TEXT NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS assistants_name ON assistants (name)")
+
+    def get(self, assistant_id: str) -> Optional[dict]:
+        rows = self._query("SELECT settings FROM assistants WHERE id = ?", (assistant_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def find_by_name(self, name: str) -> List[dict]:
+        rows = self._query("SELECT settings FROM assistants WHERE name = ? ORDER BY rowid", (name,))
+        return [json.loads(row[0]) for row in rows]
+
+    def get_all(self) -> List[dict]:
+        rows = self._query("SELECT settings FROM assistants ORDER BY rowid")
+        return [json.loads(row[0]) for row in rows]
+
+    def save(self, settings: dict):
+        self._query("INSERT INTO assistants (id, name, settings) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET name = excluded.name, settings = excluded.settings",
+                    (settings["id"], settings.get("name"), json.dumps(settings)))
+
+    def delete(self, assistant_id: str):
+        self._query("DELETE FROM assistants WHERE id = ?", (assistant_id,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _query(self, sql: str, parameters: tuple = ()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+
+class CallbackSettingsStore(InMemorySettingsStore):
+    """
+    Adapts the settings callbacks of an agency to a settings store. The settings are loaded once with the load
+    callback, and all changes are passed to the save callback together, when the store is flushed.
+    """
+
+    def __init__(self, callbacks: Dict[str, Callable]):
+        """
+        Initializes the CallbackSettingsStore.
+
+        Parameters:
+            callbacks (SettingsCallbacks): A dictionary with the "load" and "save" functions of the settings.
+        """
+        self.callbacks = callbacks
+        self._dirty = False
+        super().__init__(callbacks["load"]())
+
+    def save(self, settings: dict):
+        with self._lock:
+            super().save(settings)
+            self._dirty = True
+
+    def delete(self, assistant_id: str):
+        with self._lock:
+            super().delete(assistant_id)
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self.callbacks["save"](self.get_all())
+            self._dirty = False
@@ -1,6 +1,6 @@
 from abc import ABC
 
-from openai.lib.streaming import AssistantEventHandler
+from openai.lib.streaming import AssistantEventHandler, AsyncAssistantEventHandler
 
 
 class AgencyEventHandler(AssistantEventHandler, ABC):
@@ -12,3 +12,14 @@ class AgencyEventHandler(AssistantEventHandler, ABC):
         """Fires when streams for all agents have ended, as there can be multiple if you're agents are communicating
         with each other or using tools."""
         pass
+
+
+class AsyncAgencyEventHandler(AsyncAssistantEventHandler, ABC):
+    agent_name = None
+    recipient_agent_name = None
+
+    @classmethod
+    async def on_all_streams_end(cls):
+        """Fires when streams for all agents have ended, as there can be multiple if you're agents are communicating
+        with each other or using tools."""
+        pass
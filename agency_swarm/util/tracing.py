@@ -0,0 +1,236 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import List
+
+_current_span = contextvars.ContextVar("agency_swarm_current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation, like an agency request, a thread run, an API call or a tool execution. Spans started while
+    another span is active become its children and share its trace id.
+    """
+
+    def __init__(self, tracer, name: str, kind: str = "internal", attributes: dict = None, parent=None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes if attributes else {}
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.status = "ok"
+        self.error = None
+        self.start_time = time.time()
+        self.end_time = None
+        self.duration = None
+
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_status(self, status: str, error: str = None):
+        self.status = status
+        if error is not None:
+            self.error = error
+
+    def end(self):
+        """Ends the span and exports it. Subsequent calls have no effect."""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        self.end_time = self.start_time + self.duration
+        self.tracer._export(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def __repr__(self):
+        return f"Span(name={self.name!r}, status={self.status!r}, duration={self.duration!r})"
+
+
+class _NoopSpan(Span):
+    """Span returned when tracing is disabled. It records nothing."""
+
+    def __init__(self):
+        pass
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_status(self, status, error=None):
+        pass
+
+    def end(self):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(ABC):
+    """Receives finished spans."""
+
+    @abstractmethod
+    def export(self, span: Span):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Collects finished spans in memory, for tests and interactive inspection."""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def get_spans(self, name: str = None) -> List[Span]:
+        with self._lock:
+            return [span for span in self.spans if name is None or span.name == name]
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JSONLSpanExporter(SpanExporter):
+    """Appends finished spans to a local file, one JSON object per line."""
+
+    def __init__(self, path: str = "./traces.jsonl"):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """
+    Creates spans and passes finished spans to the exporters. Tracing is disabled while there are no exporters, in
+    which case spans are not recorded at all.
+    """
+
+    def __init__(self, exporters: List[SpanExporter] = None):
+        self.exporters = list(exporters) if exporters else []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: SpanExporter):
+        self.exporters.append(exporter)
+
+    def start_span(self, name: str, kind: str = "internal", attributes: dict = None, parent: Span = None) -> Span:
+        """
+        Starts a span without activating it. The parent defaults to the active span.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        if parent is None:
+            parent = get_current_span()
+        return Span(self, name, kind, attributes, parent if parent is not _NOOP_SPAN else None)
+
+    @contextmanager
+    def use_span(self, span: Span, end_on_exit: bool = True):
+        """
+        Activates the span, so that spans started inside become its children. Exceptions mark the span as failed.
+        """
+        if span is _NOOP_SPAN:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.set_status("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # the span was exited from another context, for example by a generator closed elsewhere
+                _current_span.set(None)
+            if end_on_exit:
+                span.end()
+
+    def span(self, name: str, kind: str = "internal", attributes: dict = None):
+        """Starts and activates a span, that ends when the block exits."""
+        return self.use_span(self.start_span(name, kind, attributes))
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def _export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"Error exporting span {span.name}: {e}")
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """
+    Sets the global tracer used by agencies, threads and tools.
+
+    Example:
+        set_tracer(Tracer([JSONLSpanExporter("./traces.jsonl")]))
+    """
+    global _tracer
+    _tracer = tracer if tracer else Tracer()
+
+
+def get_current_span() -> Span:
+    """Returns the active span, or a span that records nothing if there is none."""
+    span = _current_span.get()
+    return span if span is not None else _NOOP_SPAN
@@ -0,0 +1,132 @@
+import threading
+from typing import Dict, Tuple
+
+from agency_swarm.util.cancellation import CancellationToken
+
+# USD per 1K prompt and completion tokens
+DEFAULT_PRICING = {
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-1106-preview": (0.01, 0.03),
+    "gpt-4-0125-preview": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-3.5-turbo-0125": (0.0005, 0.0015),
+    "gpt-3.5-turbo-1106": (0.001, 0.002),
+}
+
+
+class TokenUsage:
+    """Token counts of one or more runs."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.runs = 0
+        self.cost = 0.0
+        self.unpriced_runs = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, total_tokens: int, cost: float = None):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.total_tokens += total_tokens
+        self.runs += 1
+        if cost is None:
+            self.unpriced_runs += 1
+        else:
+            self.cost += cost
+
+    def to_dict(self):
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "runs": self.runs,
+            "cost": round(self.cost, 6),
+            "unpriced_runs": self.unpriced_runs,
+        }
+
+
+class UsageTracker:
+    """
+    Aggregates the token usage of runs by agent, by thread (sender and recipient pair) and by model.
+
+    Agencies keep one tracker for their whole lifetime and create a new one for every get_completion call. If the
+    request tracker has a token budget, its cancellation token is cancelled as soon as the budget is exceeded, which
+    cancels the active runs and stops further delegation to other agents.
+    """
+
+    def __init__(self, token_budget: int = None, cancellation_token: CancellationToken = None,
+                 pricing: Dict[str, Tuple[float, float]] = None):
+        """
+        Initializes the UsageTracker.
+
+        Parameters:
+            token_budget (int, optional): The maximum number of total tokens. Defaults to None, no limit.
+            cancellation_token (CancellationToken, optional): Token cancelled when the budget is exceeded. Defaults to None.
+            pricing (Dict[str, Tuple[float, float]], optional): Prices in USD per 1K prompt and completion tokens by model. Defaults to DEFAULT_PRICING.
+        """
+        self.token_budget = token_budget
+        self.cancellation_token = cancellation_token
+        self.pricing = pricing if pricing is not None else DEFAULT_PRICING
+
+        self.total = TokenUsage()
+        self.agents = {}  # agent name -> TokenUsage
+        self.threads = {}  # "sender -> recipient" -> TokenUsage
+        self.models = {}  # model -> TokenUsage
+
+        self._lock = threading.Lock()
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.token_budget is not None and self.total.total_tokens > self.token_budget
+
+    def get_cost(self, model: str, prompt_tokens: int, completion_tokens: int):
+        """Returns the cost in USD, or None if the model has no price."""
+        prices = self.pricing.get(model)
+        if prices is None:
+            return None
+        return prompt_tokens / 1000 * prices[0] + completion_tokens / 1000 * prices[1]
+
+    def record(self, sender_name: str, recipient_name: str, model: str, usage):
+        """
+        Records the usage of a finished run.
+
+        Parameters:
+            sender_name (str): The name of the agent or user that sent the message.
+            recipient_name (str): The name of the agent that processed the run.
+            model (str): The model of the run.
+            usage: The usage object of the run, with prompt_tokens, completion_tokens and total_tokens.
+        """
+        if usage is None:
+            return
+
+        counts = (usage.prompt_tokens, usage.completion_tokens, usage.total_tokens,
+                  self.get_cost(model, usage.prompt_tokens, usage.completion_tokens))
+
+        with self._lock:
+            self.total.add(*counts)
+            for key, usages in ((recipient_name, self.agents),
+                                (f"{sender_name} -> {recipient_name}", self.threads),
+                                (model, self.models)):
+                if key not in usages:
+                    usages[key] = TokenUsage()
+                usages[key].add(*counts)
+            budget_exceeded = self.budget_exceeded
+
+        if budget_exceeded and self.cancellation_token:
+            self.cancellation_token.cancel(reason="token budget exceeded")
+
+    def get_report(self):
+        """Returns the usage as a dictionary."""
+        with self._lock:
+            return {
+                "total": self.total.to_dict(),
+                "agents": {name: usage.to_dict() for name, usage in self.agents.items()},
+                "threads": {name: usage.to_dict() for name, usage in self.threads.items()},
+                "models": {name: usage.to_dict() for name, usage in self.models.items()},
+                "token_budget": self.token_budget,
+                "budget_exceeded": self.budget_exceeded,
+            }
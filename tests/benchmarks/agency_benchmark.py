@@ -0,0 +1,380 @@
+"""
+End-to-end throughput and latency benchmark of Agency, served by the in-process FakeBackend, so no API calls are made
+and the results only depend on the framework. Agencies of different shapes are built for every concurrent user before
+the timed phase, then all users send their requests at the same time.
+
+Scenarios:
+    fanout_2, fanout_10, fanout_50  CEO delegating each request to one of 2, 10 or 50 agents
+    chain_5, chain_10               delegation chain of 5 or 10 agents, each delegating to the next one
+    tools_10                        CEO delegating to a worker that calls 10 tools, twice
+
+For every scenario and number of users, the results include requests per second, p50/p95/p99 latency, the framework
+overhead per hop (request latency minus the simulated API and model time, divided by the number of runs), the peak
+number of threads, and the peak memory of the process with its growth since the agencies were built. With zero
+simulated latency (the default), the time spent in the fake backend itself is included in the overhead. With
+--sessions, all users share one agency with a session per user, instead of an agency per user.
+
+Usage:
+    python tests/benchmarks/agency_benchmark.py --users 1 10 50 100 500 --output results.json
+    python tests/benchmarks/agency_benchmark.py --scenarios fanout_10 chain_5 --mode asyncio --latency 0.05
+    python tests/benchmarks/agency_benchmark.py --sessions --users 500
+    python tests/benchmarks/agency_benchmark.py --output new.json --baseline old.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from pydantic import Field
+
+from agency_swarm import Agency, AsyncAgency, Agent, BaseTool
+from agency_swarm.util.fake_backend import FakeBackend, ScriptedBehavior, call_tool, call_tools, delegate, reply
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_USERS = [1, 10, 50, 100, 500]
+DEFAULT_SCENARIOS = ["fanout_2", "fanout_10", "fanout_50", "chain_5", "chain_10", "tools_10"]
+
+# metrics compared against the baseline, and whether higher values are better
+REGRESSION_METRICS = {
+    "rps": True,
+    "p95_ms": False,
+    "overhead_per_hop_ms": False,
+}
+
+
+def create_tools(n):
+    tools = []
+    for i in range(n):
+        def run(self):
+            return f"{self.query}: {sum(range(1000))}"
+
+        tools.append(type(f"Tool{i}", (BaseTool,), {
+            "__doc__": f"Benchmark tool number {i}.",
+            "__annotations__": {"query": str},
+            "query": Field(..., description="Search query."),
+            "run": run,
+        }))
+    return tools
+
+
+def fanout_behavior(n):
+    """The CEO delegates 'Task k' to agent k % n and replies with its response."""
+    def behavior(context):
+        if context.step == 0:
+            task = int(context.last_user_message.split()[-1])
+            return delegate(f"Agent{task % n}", "Handle " + context.last_user_message)
+        return reply("Done: " + context.tool_outputs[0]["output"])
+    return behavior
+
+
+def fanout_scenario(n):
+    def build():
+        ceo = Agent(name="CEO", description="Delegates tasks.")
+        agents = [Agent(name=f"Agent{i}", description=f"Agent number {i}.") for i in range(n)]
+        return [ceo] + [[ceo, agent] for agent in agents]
+    return build, {"CEO": fanout_behavior(n)}
+
+
+def chain_scenario(depth):
+    def build():
+        agents = [Agent(name=f"Agent{i}", description=f"Agent number {i}.") for i in range(depth)]
+        return [agents[0]] + [[agents[i], agents[i + 1]] for i in range(depth - 1)]
+    behaviors = {f"Agent{i}": ScriptedBehavior(delegate(f"Agent{i + 1}", "Continue the task."))
+                 for i in range(depth - 1)}
+    return build, behaviors
+
+
+def tools_scenario(n):
+    tools = create_tools(n)
+
+    def build():
+        ceo = Agent(name="CEO", description="Delegates tasks.")
+        worker = Agent(name="Worker", description="Uses tools.", tools=tools)
+        return [ceo, [ceo, worker]]
+    calls = call_tools(*[call_tool(f"Tool{i}", query="benchmark") for i in range(n)])
+    return build, {"CEO": ScriptedBehavior(delegate("Worker", "Use your tools.")),
+                   "Worker": ScriptedBehavior(calls, calls)}
+
+
+def get_scenario(name):
+    kind, size = name.rsplit("_", 1)
+    scenarios = {"fanout": fanout_scenario, "chain": chain_scenario, "tools": tools_scenario}
+    if kind not in scenarios:
+        raise ValueError(f"Unknown scenario {name}. Available scenarios: {', '.join(DEFAULT_SCENARIOS)}")
+    return scenarios[kind](int(size))
+
+
+def get_rss():
+    """Returns the resident memory of the process in bytes, or None if it is not available."""
+    if psutil:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ResourceMonitor:
+    """Samples the number of threads and the resident memory of the process in the background."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        # the monitor thread itself is not counted
+        self.peak_threads = max(self.peak_threads, threading.active_count() - int(self._thread.is_alive()))
+        rss = get_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = (len(values) - 1) * p / 100
+    lower = int(index)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def run_sync_users(conversations, requests_per_user):
+    latencies = []
+    errors = []
+    barrier = threading.Barrier(len(conversations))
+
+    def user(index, agency):
+        barrier.wait()
+        for i in range(requests_per_user):
+            start = time.perf_counter()
+            try:
+                agency.get_completion(f"Task {index * requests_per_user + i}", yield_messages=False)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(repr(e))
+
+    threads = [threading.Thread(target=user, args=(index, agency)) for index, agency in enumerate(conversations)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def run_async_users(conversations, requests_per_user):
+    latencies = []
+    errors = []
+
+    async def user(index, agency):
+        for i in range(requests_per_user):
+            start = time.perf_counter()
+            try:
+                await agency.get_completion(f"Task {index * requests_per_user + i}")
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(repr(e))
+
+    async def main():
+        await asyncio.gather(*[user(index, agency) for index, agency in enumerate(conversations)])
+
+    asyncio.run(main())
+    return latencies, errors
+
+
+def run_level(scenario, users, requests_per_user=5, mode="sync", latency=0.0, run_latency=0.0, sessions=False):
+    """
+    Runs one scenario with the given number of concurrent users and returns the results as a dictionary.
+
+    Parameters:
+        scenario (str): The name of the scenario, e.g. 'fanout_10'.
+        users (int): The number of concurrent users, each with its own agency.
+        requests_per_user (int, optional): The number of requests each user sends, one after another. Defaults to 5.
+        mode (str, optional): 'sync' runs every user in its own thread with Agency, 'asyncio' runs all users in one event loop with AsyncAgency. Defaults to 'sync'.
+        latency (float, optional): The simulated latency of every API request in seconds. Defaults to 0.0.
+        run_latency (float, optional): The simulated model time of every run step in seconds. Defaults to 0.0.
+        sessions (bool, optional): Serve all users from one agency with a session per user. Defaults to False.
+    """
+    build, behaviors = get_scenario(scenario)
+    backend = FakeBackend(behaviors=behaviors, latency=latency, run_latency=run_latency)
+    backend.install()
+    agency_class = AsyncAgency if mode == "asyncio" else Agency
+
+    with tempfile.TemporaryDirectory() as temp_dir, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        settings_path = os.path.join(temp_dir, "settings.json")
+        initial_rss = get_rss()
+        if sessions:
+            agency = agency_class(build(), settings_path=settings_path)
+            conversations = [agency.create_session() for _ in range(users)]
+        else:
+            conversations = [agency_class(build(), settings_path=settings_path) for _ in range(users)]
+
+        stats_before = backend.get_stats()
+        steps_before = sum(len(steps) for steps in backend.run_steps.values())
+
+        with ResourceMonitor() as monitor:
+            start = time.perf_counter()
+            if mode == "asyncio":
+                latencies, errors = run_async_users(conversations, requests_per_user)
+            else:
+                latencies, errors = run_sync_users(conversations, requests_per_user)
+            duration = time.perf_counter() - start
+
+    stats = backend.get_stats()
+    completed = len(latencies)
+    api_requests = (stats["total_requests"] - stats_before["total_requests"]) / max(completed, 1)
+    runs = (stats["runs"] - stats_before["runs"]) / max(completed, 1)
+    steps = (sum(len(steps) for steps in backend.run_steps.values()) - steps_before) / max(completed, 1)
+    simulated_time = api_requests * latency + steps * run_latency
+    mean_latency = sum(latencies) / completed if completed else None
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "sessions": sessions,
+        "users": users,
+        "requests": completed,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "duration_s": round(duration, 3),
+        "rps": round(completed / duration, 3) if duration else None,
+        "mean_ms": ms(mean_latency),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(max(latencies) if latencies else None),
+        "runs_per_request": round(runs, 3),
+        "api_requests_per_request": round(api_requests, 3),
+        "overhead_per_hop_ms": ms((mean_latency - simulated_time) / runs) if completed and runs else None,
+        "peak_threads": monitor.peak_threads,
+        "peak_rss_mb": round(monitor.peak_rss / 2 ** 20, 1) if monitor.peak_rss else None,
+        # includes the agencies or sessions of all users, built before the timed phase
+        "memory_growth_mb": round((monitor.peak_rss - initial_rss) / 2 ** 20, 1) if monitor.peak_rss else None,
+    }
+
+
+def compare_results(results, baseline, threshold=0.2):
+    """
+    Compares results with a baseline of a previous version and returns the regressions, that are changes of the
+    REGRESSION_METRICS for the worse by more than the threshold, as a list of dictionaries.
+    """
+    def get_key(result):
+        return result["scenario"], result["mode"], result.get("sessions", False), result["users"]
+
+    baseline_results = {get_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        previous = baseline_results.get(get_key(result))
+        if not previous:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append({"scenario": result["scenario"], "mode": result["mode"], "users": result["users"],
+                                    "metric": metric, "baseline": old, "value": new, "change": round(change, 3)})
+    return regressions
+
+
+def get_version():
+    try:
+        from importlib.metadata import version
+        return version("agency-swarm")
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end Agency benchmark on the in-process fake backend.")
+    parser.add_argument("--scenarios", nargs="+", default=DEFAULT_SCENARIOS)
+    parser.add_argument("--users", nargs="+", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per user.")
+    parser.add_argument("--mode", choices=["sync", "asyncio"], default="sync")
+    parser.add_argument("--sessions", action="store_true", help="Use one agency with a session per user.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency of API requests in seconds.")
+    parser.add_argument("--run-latency", type=float, default=0.0, help="Simulated model time per run step in seconds.")
+    parser.add_argument("--output", default="agency_benchmark_results.json")
+    parser.add_argument("--baseline", help="Results of a previous version to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative change before a regression.")
+    args = parser.parse_args()
+
+    # SendMessage tools of every agency warn about the schema of their recipient field
+    warnings.filterwarnings("ignore", message="Default value .* is not JSON serializable")
+
+    results = {
+        "version": get_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {"requests_per_user": args.requests, "mode": args.mode, "sessions": args.sessions,
+                   "latency": args.latency, "run_latency": args.run_latency},
+        "results": [],
+    }
+
+    print(f"{'scenario':>10} {'users':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'hop ms':>8} {'threads':>8} {'rss MB':>8} {'errors':>7}")
+    for scenario in args.scenarios:
+        for users in args.users:
+            result = run_level(scenario, users, args.requests, args.mode, args.latency, args.run_latency,
+                               args.sessions)
+            results["results"].append(result)
+            print(f"{scenario:>10} {users:>6} {result['rps'] or 0:>9.1f} {result['p50_ms'] or 0:>9.1f} "
+                  f"{result['p95_ms'] or 0:>9.1f} {result['p99_ms'] or 0:>9.1f} "
+                  f"{result['overhead_per_hop_ms'] or 0:>8.2f} {result['peak_threads']:>8} "
+                  f"{result['peak_rss_mb'] or 0:>8.1f} {result['errors']:>7}", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} ({regression['mode']}, {regression['users']} users): "
+                  f"{regression['metric']} {regression['baseline']} -> {regression['value']} "
+                  f"({regression['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Microbenchmark of the per-call tool dispatch overhead in Thread.execute_tool, for agents with 10, 100 and 1000
+registered tools. Compares the previous linear lookup with json.loads and kwargs construction against the indexed
+lookup with direct JSON validation. No API calls are made.
+
+Usage:
+    python tests/benchmarks/tool_dispatch_benchmark.py
+"""
+import json
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from pydantic import Field
+
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.user import User
+
+NUMBER = 2000
+
+
+def create_tools(n):
+    tools = []
+    for i in range(n):
+        def run(self):
+            return self.query
+
+        tools.append(type(f"Tool{i}", (BaseTool,), {
+            "__doc__": f"Benchmark tool number {i}.",
+            "__annotations__": {"query": str, "limit": int},
+            "query": Field(..., description="Search query."),
+            "limit": Field(10, description="Max results."),
+            "run": run,
+        }))
+    return tools
+
+
+def legacy_execute_tool(agent, tool_call):
+    funcs = [tool for tool in agent.tools if issubclass(tool, BaseTool)]
+    func = next((func for func in funcs if func.__name__ == tool_call.function.name), None)
+    args = tool_call.function.arguments
+    args = json.loads(args) if args else {}
+    func = func(**args)
+    func.caller_agent = agent
+    return func.run()
+
+
+def main():
+    set_openai_key("benchmark")
+
+    print(f"{'tools':>6} {'legacy (us/call)':>18} {'indexed (us/call)':>18} {'speedup':>8}")
+    for n in [10, 100, 1000]:
+        agent = Agent(name="BenchmarkAgent", tools=create_tools(n))
+        thread = Thread(User(), agent)
+        # call the last registered tool, the worst case for a linear scan
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(
+            name=f"Tool{n - 1}", arguments='{"query": "benchmark", "limit": 5}'))
+
+        legacy = timeit.timeit(lambda: legacy_execute_tool(agent, tool_call), number=NUMBER) / NUMBER * 1e6
+        indexed = timeit.timeit(lambda: thread.execute_tool(tool_call, agent), number=NUMBER) / NUMBER * 1e6
+
+        print(f"{n:>6} {legacy:>18.2f} {indexed:>18.2f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
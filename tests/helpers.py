@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, Agent, set_openai_key
+from agency_swarm.util.fake_backend import FakeBackend
+
+
+class FakeBackendTestCase(unittest.TestCase):
+    """
+    Base class of tests that run agencies on a FakeBackend. Each test gets a new backend, installed as the global
+    OpenAI client, and a settings_path in a temporary directory.
+    """
+
+    def setUp(self):
+        self.backend = self.make_backend()
+        self.backend.install()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings_path = os.path.join(self.temp_dir.name, "settings.json")
+
+    def tearDown(self):
+        set_openai_key("test")
+        self.temp_dir.cleanup()
+
+    def make_backend(self):
+        """Returns the backend of the test. Override to set behaviors or latency."""
+        return FakeBackend()
+
+    def make_agency(self, agents=None, agency_class=Agency, **kwargs):
+        """
+        Returns an agency with the settings_path of the test, in which the first agent can send messages to the others.
+
+        Parameters:
+            agents (list, optional): The agents of the agency. Defaults to a CEO and a Dev agent.
+            agency_class (type, optional): Agency or one of its subclasses. Defaults to Agency.
+            **kwargs: Additional parameters of the agency.
+        """
+        if agents is None:
+            agents = [Agent(name="CEO", description="Manages the agency."),
+                      Agent(name="Dev", description="Develops.")]
+        return agency_class([agents[0]] + [[agents[0], agent] for agent in agents[1:]],
+                            settings_path=self.settings_path, **kwargs)
+
+    def count_requests(self, key):
+        """Returns the number of requests to the backend with the given key, like "POST /files"."""
+        return self.backend.get_stats()["requests"].get(key, 0)
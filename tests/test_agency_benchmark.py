@@ -0,0 +1,40 @@
+import sys
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import set_openai_key
+from tests.benchmarks.agency_benchmark import compare_results, percentile, run_level
+
+
+class AgencyBenchmarkTest(unittest.TestCase):
+    def tearDown(self):
+        set_openai_key("test")
+
+    def test_run_level(self):
+        result = run_level("fanout_2", users=2, requests_per_user=2)
+
+        self.assertEqual(result["requests"], 4)
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(result["runs_per_request"], 2)
+        self.assertGreater(result["rps"], 0)
+        self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+        self.assertGreaterEqual(result["peak_threads"], 2)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2.5)
+        self.assertEqual(percentile([1, 2, 3], 100), 3)
+
+    def test_compare_results(self):
+        baseline = {"results": [{"scenario": "chain_5", "mode": "sync", "users": 10,
+                                 "rps": 100, "p95_ms": 50, "overhead_per_hop_ms": 2}]}
+        results = {"results": [{"scenario": "chain_5", "mode": "sync", "users": 10,
+                                "rps": 70, "p95_ms": 55, "overhead_per_hop_ms": 1}]}
+
+        regressions = compare_results(results, baseline, threshold=0.2)
+
+        self.assertEqual([regression["metric"] for regression in regressions], ["rps"])
+        self.assertEqual(regressions[0]["change"], -0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
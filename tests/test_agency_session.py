@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import AsyncAgency
+from agency_swarm.util import get_openai_client
+from agency_swarm.util.fake_backend import FakeBackend, delegate, reply
+from tests.helpers import FakeBackendTestCase
+
+
+def ceo_behavior(context):
+    """Delegates the last user message to Dev, and replies with the number of user messages in the thread."""
+    if context.step == 0:
+        return delegate("Dev", context.last_user_message)
+    user_messages = [message for message in context.messages if message["role"] == "user"]
+    return reply(f"{context.last_user_message} ({len(user_messages)} messages)")
+
+
+class AgencySessionTest(FakeBackendTestCase):
+    def make_backend(self):
+        return FakeBackend(behaviors={"CEO": ceo_behavior})
+
+    def test_sessions_are_isolated(self):
+        agency = self.make_agency()
+        requests = self.backend.get_stats()["total_requests"]
+
+        sessions = [agency.create_session() for _ in range(2)]
+        self.assertEqual(self.backend.get_stats()["total_requests"], requests)
+
+        responses = [session.get_completion(f"Hi {i}", yield_messages=False) for i, session in enumerate(sessions)]
+
+        self.assertEqual(responses, ["Hi 0 (1 messages)", "Hi 1 (1 messages)"])
+        thread_ids = [session.get_thread_ids() for session in sessions]
+        self.assertNotEqual(thread_ids[0]["main_thread"], thread_ids[1]["main_thread"])
+        self.assertNotEqual(thread_ids[0]["CEO"]["Dev"], thread_ids[1]["CEO"]["Dev"])
+        # the threads of the agency itself are not used
+        self.assertIsNone(agency.agents_and_threads["CEO"]["Dev"].id)
+
+        dev_messages = get_openai_client().beta.threads.messages.list(thread_id=thread_ids[1]["CEO"]["Dev"])
+        self.assertEqual(dev_messages.data[-1].content[0].text.value, "Hi 1")
+
+    def test_concurrent_sessions(self):
+        agency = self.make_agency()
+        responses = {}
+
+        def user(i):
+            responses[i] = agency.create_session().get_completion(f"Hi {i}", yield_messages=False)
+
+        threads = [threading.Thread(target=user, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(responses, {i: f"Hi {i} (1 messages)" for i in range(20)})
+        self.assertEqual(self.backend.get_stats()["threads"], 40)
+
+    def test_resume_session(self):
+        agency = self.make_agency()
+        session = agency.create_session()
+        session.get_completion("Hi", yield_messages=False)
+
+        resumed = agency.create_session(session.get_thread_ids())
+        response = resumed.get_completion("Again", yield_messages=False)
+
+        self.assertEqual(response, "Again (2 messages)")
+        self.assertEqual(resumed.get_thread_ids(), session.get_thread_ids())
+
+    def test_invalid_pair(self):
+        session = self.make_agency().create_session()
+
+        with self.assertRaises(Exception):
+            session.get_thread("Dev", "CEO")
+
+    def test_async_session(self):
+        agency = self.make_agency(agency_class=AsyncAgency)
+
+        async def main():
+            sessions = [agency.create_session() for _ in range(3)]
+            return await asyncio.gather(*[session.get_completion(f"Hi {i}") for i, session in enumerate(sessions)])
+
+        self.assertEqual(asyncio.run(main()), [f"Hi {i} (1 messages)" for i in range(3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
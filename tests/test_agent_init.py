@@ -0,0 +1,70 @@
+import json
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, Agent
+from agency_swarm.util.fake_backend import FakeBackend
+from tests.helpers import FakeBackendTestCase
+
+
+class BarrierAgency(Agency):
+    """Fails unless all agents are initialized at the same time."""
+    barrier = None
+
+    def _init_agent(self, agent):
+        self.barrier.wait()
+        return super()._init_agent(agent)
+
+
+class AgentInitTest(FakeBackendTestCase):
+    def make_backend(self):
+        return FakeBackend(latency=0.01)
+
+    def make_agents(self, count=5):
+        return [Agent(name=f"Agent{i}", description=f"Agent number {i}.") for i in range(count)]
+
+    def test_agents_are_initialized_concurrently(self):
+        BarrierAgency.barrier = threading.Barrier(5, timeout=5)
+        agency = self.make_agency(self.make_agents(), BarrierAgency)
+
+        with open(self.settings_path) as f:
+            settings = json.load(f)
+        self.assertEqual(sorted(assistant["name"] for assistant in settings), [f"Agent{i}" for i in range(5)])
+        self.assertEqual(sorted(assistant["id"] for assistant in settings), sorted(agent.id for agent in agency.agents))
+
+        report = agency.get_startup_report()
+        self.assertEqual(report["max_workers"], 5)
+        self.assertEqual(set(report["agents"]), {f"Agent{i}" for i in range(5)})
+        times = list(report["agents"].values())
+        self.assertEqual(times, sorted(times, reverse=True))
+
+    def test_load_and_update_concurrently(self):
+        agency = self.make_agency(self.make_agents())
+        ids = {agent.name: agent.id for agent in agency.agents}
+
+        agents = self.make_agents()
+        agents[1].description = "Updated."
+        agency = self.make_agency(agents, init_max_workers=3)
+
+        self.assertEqual({agent.name: agent.id for agent in agency.agents}, ids)
+        self.assertEqual(self.backend.get_stats()["assistants"], 5)
+        # Agent0 is updated too, since its SendMessage tool lists the descriptions of the recipients
+        self.assertEqual(self.backend.get_stats()["requests"]["POST /assistants/{assistant_id}"], 2)
+        with open(self.settings_path) as f:
+            settings = {assistant["name"]: assistant for assistant in json.load(f)}
+        self.assertEqual(len(settings), 5)
+        self.assertEqual(settings["Agent1"]["description"], "Updated.")
+
+    def test_settings_callbacks(self):
+        saved = []
+        self.make_agency(self.make_agents(),
+                         settings_callbacks={"load": lambda: [], "save": saved.append})
+
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(len(saved[0]), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
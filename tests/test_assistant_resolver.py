@@ -0,0 +1,96 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent
+from agency_swarm.util import AssistantResolver, get_assistant_resolver, get_openai_client
+from tests.helpers import FakeBackendTestCase
+
+
+class AssistantResolverTest(FakeBackendTestCase):
+    def make_agency(self, instructions="Work.", **kwargs):
+        return super().make_agency([Agent(name=name, instructions=instructions) for name in ["CEO", "Dev", "QA"]],
+                                   **kwargs)
+
+    def test_assistants_are_listed_once(self):
+        ids = [agent.id for agent in self.make_agency().agents]
+        lists = self.count_requests("GET /assistants")
+
+        resolver = AssistantResolver(page_size=2, list_threshold=3)
+        agency = self.make_agency(instructions="Work harder.", assistant_resolver=resolver)
+
+        self.assertEqual([agent.id for agent in agency.agents], ids)
+        self.assertEqual(resolver.list_count, 1)
+        # 3 assistants in pages of 2
+        self.assertEqual(self.count_requests("GET /assistants") - lists, 2)
+        self.assertEqual(self.count_requests("GET /assistants/{assistant_id}"), 0)
+        self.assertEqual(self.backend.get_stats()["assistants"], 3)
+
+    def test_few_assistants_are_retrieved(self):
+        ids = [agent.id for agent in self.make_agency().agents]
+        lists = self.count_requests("GET /assistants")
+
+        resolver = AssistantResolver(list_threshold=4)
+        agency = self.make_agency(instructions="Work harder.", assistant_resolver=resolver)
+
+        self.assertEqual([agent.id for agent in agency.agents], ids)
+        self.assertEqual(resolver.list_count, 0)
+        self.assertEqual(self.count_requests("GET /assistants"), lists)
+        self.assertEqual(self.count_requests("GET /assistants/{assistant_id}"), 3)
+
+    def test_shared_resolver_is_kept_up_to_date(self):
+        ids = [agent.id for agent in self.make_agency().agents]
+        get_assistant_resolver().list_threshold = 3
+
+        self.make_agency(instructions="Work harder.")
+        agency = self.make_agency(instructions="Work even harder.")
+
+        # the second agency listed the assistants, and the third one used the cached list
+        self.assertEqual([agent.id for agent in agency.agents], ids)
+        self.assertEqual(get_assistant_resolver().list_count, 1)
+        self.assertEqual(self.count_requests("GET /assistants"), 1)
+        self.assertEqual(self.count_requests("GET /assistants/{assistant_id}"), 0)
+        # updates are applied to the cached list
+        self.assertEqual(get_assistant_resolver().get(ids[0]).instructions, "Work even harder.")
+
+    def test_deleted_assistant_is_recreated(self):
+        ids = [agent.id for agent in self.make_agency().agents]
+        get_openai_client().beta.assistants.delete(ids[1])
+
+        agency = self.make_agency(instructions="Work harder.", assistant_resolver=AssistantResolver(list_threshold=3))
+
+        self.assertEqual(agency.agents[0].id, ids[0])
+        self.assertNotIn(agency.agents[1].id, ids)
+        # the missing id is retrieved once, in case the list is out of date
+        self.assertEqual(self.count_requests("GET /assistants/{assistant_id}"), 1)
+        self.assertEqual(self.backend.get_stats()["assistants"], 3)
+
+    def test_assistants_missing_from_the_list_are_retrieved(self):
+        resolver = AssistantResolver(list_threshold=3)
+        self.assertEqual(resolver.find_by_name("CEO"), [])
+        self.assertIsNone(resolver.get("asst_missing"))
+
+        # created by another process after the list was cached
+        ids = [agent.id for agent in self.make_agency(assistant_resolver=AssistantResolver()).agents]
+        agency = self.make_agency(instructions="Work harder.", assistant_resolver=resolver)
+
+        self.assertEqual([agent.id for agent in agency.agents], ids)
+        self.assertEqual(resolver.list_count, 1)
+        self.assertEqual(self.backend.get_stats()["assistants"], 3)
+
+    def test_concurrent_lookups_list_once(self):
+        self.make_agency()
+        resolver = AssistantResolver()
+        self.backend.latency = 0.05
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(resolver.find_by_name, ["CEO", "Dev", "QA", "CEO"]))
+
+        self.assertEqual([len(assistants) for assistants in results], [1, 1, 1, 1])
+        self.assertEqual(resolver.list_count, 1)
+        self.assertEqual(self.count_requests("GET /assistants"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent
+from agency_swarm.agents.agent import FINGERPRINT_METADATA_KEY
+from agency_swarm.util import get_openai_client
+from tests.helpers import FakeBackendTestCase
+
+
+class AssistantSyncTest(FakeBackendTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # record the parameters of assistant updates
+        self.updates = []
+        update_assistant = self.backend.update_assistant
+
+        def record_update(assistant_id, body):
+            self.updates.append(body)
+            return update_assistant(assistant_id, body)
+
+        self.backend.update_assistant = record_update
+
+    def make_agency(self, dev_instructions="Write code.", **kwargs):
+        ceo = Agent(name="CEO", instructions="Manage.", metadata={"team": "core"})
+        dev = Agent(name="Dev", instructions=dev_instructions)
+        return super().make_agency([ceo, dev], **kwargs)
+
+    def test_warm_start_makes_no_api_calls(self):
+        agency = self.make_agency()
+        self.assertFalse(any(agent.warm_start for agent in agency.agents))
+        ids = [agent.id for agent in agency.agents]
+        requests = self.backend.get_stats()["total_requests"]
+
+        agency = self.make_agency()
+
+        self.assertEqual(self.backend.get_stats()["total_requests"], requests)
+        self.assertTrue(all(agent.warm_start for agent in agency.agents))
+        self.assertEqual([agent.id for agent in agency.agents], ids)
+        self.assertEqual(agency.get_startup_report()["warm_starts"], 2)
+        self.assertEqual(agency.agents[0].assistant.metadata["team"], "core")
+
+    def test_only_changed_fields_are_updated(self):
+        self.make_agency()
+
+        agency = self.make_agency(dev_instructions="Write tests.")
+
+        self.assertEqual([agent.warm_start for agent in agency.agents], [True, False])
+        self.assertEqual(len(self.updates), 1)
+        self.assertEqual(set(self.updates[0]), {"instructions", "metadata"})
+        self.assertEqual(self.updates[0]["metadata"][FINGERPRINT_METADATA_KEY], agency.agents[1].get_fingerprint())
+
+        # the new fingerprint is saved
+        agency = self.make_agency(dev_instructions="Write tests.")
+        self.assertTrue(all(agent.warm_start for agent in agency.agents))
+
+    def test_fingerprint(self):
+        agent = Agent(name="Dev", instructions="Write code.", metadata={"a": "1", "b": "2"})
+        same = Agent(name="Dev", instructions="Write code.", metadata={"b": "2", "a": "1"})
+        other = Agent(name="Dev", instructions="Write tests.", metadata={"a": "1", "b": "2"})
+
+        self.assertEqual(agent.get_fingerprint(), same.get_fingerprint())
+        self.assertNotEqual(agent.get_fingerprint(), other.get_fingerprint())
+
+    def test_verify_assistants(self):
+        agency = self.make_agency()
+        ceo_id, dev_id = [agent.id for agent in agency.agents]
+        client = get_openai_client()
+        client.beta.assistants.update(ceo_id, instructions="Changed in the dashboard.")
+        client.beta.assistants.delete(dev_id)
+
+        agency = self.make_agency(verify_assistants=True)
+        agency.verification_thread.join(5)
+
+        self.assertEqual(agency.get_startup_report()["verification"], {"CEO": "updated", "Dev": "recreated"})
+        self.assertEqual(client.beta.assistants.retrieve(ceo_id).instructions, agency.agents[0].instructions)
+        self.assertNotEqual(agency.agents[1].id, dev_id)
+
+        # the recreated assistant replaced the deleted one in the settings
+        agency = self.make_agency(verify_assistants=True)
+        agency.verification_thread.join(5)
+        self.assertEqual(agency.get_startup_report()["verification"], {"CEO": "ok", "Dev": "ok"})
+        self.assertEqual(self.backend.get_stats()["assistants"], 2)
+
+    def test_load_from_id(self):
+        agency = self.make_agency()
+        ceo_id = agency.agents[0].id
+
+        agent = Agent(id=ceo_id).init_oai()
+
+        self.assertEqual(agent.metadata, {"team": "core"})
+        # the agent has no tools, so only the fingerprint is updated
+        self.assertEqual(len(self.updates), 1)
+        self.assertEqual(self.updates[0], {"metadata": {"team": "core",
+                                                        FINGERPRINT_METADATA_KEY: agent.get_fingerprint()}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import AsyncThread
+from agency_swarm.user import User
+
+
+class AsyncTool(BaseTool):
+    """Waits asynchronously and returns the value."""
+    value: str
+
+    async def run(self):
+        await asyncio.sleep(0.2)
+        return "async " + self.value
+
+
+class SyncTool(BaseTool):
+    """Blocks for a short time and returns the value."""
+    value: str
+
+    def run(self):
+        time.sleep(0.2)
+        return "sync " + self.value
+
+
+def make_tool_call(i, name, arguments):
+    return SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class AsyncThreadTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        set_openai_key("test")
+        self.agent = Agent(name="TestAgent", tools=[AsyncTool, SyncTool])
+        self.thread = AsyncThread(User(), self.agent, parallel_tool_calls=True)
+
+    async def test_execute_async_and_sync_tools(self):
+        tool_calls = [make_tool_call(0, "AsyncTool", '{"value": "a"}'),
+                      make_tool_call(1, "SyncTool", '{"value": "b"}'),
+                      make_tool_call(2, "AsyncTool", '{"value": "c"}')]
+
+        start = time.perf_counter()
+        outputs = await self.thread._execute_tools(tool_calls, self.agent, None)
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(outputs, ["async a", "sync b", "async c"])
+
+    async def test_unknown_tool(self):
+        output = await self.thread.execute_tool(make_tool_call(0, "Missing", "{}"), self.agent)
+        self.assertTrue(output.startswith("Error: Function Missing not found"))
+
+    async def test_async_tool_in_sync_thread(self):
+        from agency_swarm.threads import Thread
+        thread = Thread(User(), self.agent)
+        output = await asyncio.get_running_loop().run_in_executor(
+            None, thread.execute_tool, make_tool_call(0, "AsyncTool", '{"value": "a"}'), self.agent)
+        self.assertEqual(output, "async a")
+
+
+if __name__ == '__main__':
+    unittest.main()
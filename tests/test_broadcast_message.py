@@ -0,0 +1,126 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, AsyncAgency, Agent
+from agency_swarm.tools import BaseTool
+from agency_swarm.util.fake_backend import FakeBackend, ScriptedBehavior, call_tool, echo_behavior
+from tests.helpers import FakeBackendTestCase
+
+barrier = threading.Barrier(2, timeout=5)
+
+
+class MeetAtBarrier(BaseTool):
+    """Waits until the other recipient calls this tool too."""
+
+    def run(self):
+        barrier.wait()
+        return "met"
+
+
+class WaitForCancellation(BaseTool):
+    """Works until the request is cancelled."""
+
+    def run(self):
+        self.cancellation_token.wait(5)
+        return "stopped"
+
+
+def broadcast(recipients, message="Review the release"):
+    return ScriptedBehavior(call_tool("BroadcastMessage", my_primary_instructions="Review the release.",
+                                      recipients=recipients, message=message))
+
+
+class BroadcastMessageTest(FakeBackendTestCase):
+    def setUp(self):
+        super().setUp()
+        barrier.reset()
+
+    def make_backend(self):
+        return FakeBackend(behaviors={"CEO": broadcast(["Dev", "QA"])})
+
+    def make_agency(self, agency_class=Agency, dev_tools=None, qa_tools=None, **kwargs):
+        ceo = Agent(name="CEO", description="Manages the agency.")
+        dev = Agent(name="Dev", description="Develops.", tools=dev_tools)
+        qa = Agent(name="QA", description="Tests.", tools=qa_tools)
+        return super().make_agency([ceo, dev, qa], agency_class, broadcast_tool=True, **kwargs)
+
+    def test_broadcast(self):
+        agency = self.make_agency()
+
+        response = agency.get_completion("Hi", yield_messages=False)
+
+        self.assertEqual(json.loads(response), {
+            "Dev": {"status": "completed", "response": "Echo: Review the release"},
+            "QA": {"status": "completed", "response": "Echo: Review the release"},
+        })
+        self.assertEqual(self.backend.get_stats()["runs"], 3)
+
+    def test_recipients_work_in_parallel(self):
+        agency = self.make_agency(dev_tools=[MeetAtBarrier], qa_tools=[MeetAtBarrier])
+        self.backend.set_behavior("Dev", ScriptedBehavior(call_tool("MeetAtBarrier")))
+        self.backend.set_behavior("QA", ScriptedBehavior(call_tool("MeetAtBarrier")))
+
+        response = json.loads(agency.get_completion("Hi", yield_messages=False))
+
+        self.assertEqual(response["Dev"], {"status": "completed", "response": "met"})
+        self.assertEqual(response["QA"], {"status": "completed", "response": "met"})
+
+    def test_timeout(self):
+        agency = self.make_agency(qa_tools=[WaitForCancellation], broadcast_timeout=0.2)
+        self.backend.set_behavior("QA", ScriptedBehavior(call_tool("WaitForCancellation")))
+
+        start = time.monotonic()
+        response = json.loads(agency.get_completion("Hi", yield_messages=False))
+
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(response["Dev"], {"status": "completed", "response": "Echo: Review the release"})
+        self.assertEqual(response["QA"]["status"], "timeout")
+
+        # the thread of the recipient that timed out can be used again
+        self.backend.set_behavior("QA", echo_behavior)
+        response = json.loads(agency.get_completion("Again", yield_messages=False))
+        self.assertEqual(response["QA"], {"status": "completed", "response": "Echo: Review the release"})
+
+    def test_only_agents_with_several_recipients(self):
+        ceo = Agent(name="CEO")
+        dev = Agent(name="Dev")
+        qa = Agent(name="QA")
+        Agency([ceo, [ceo, dev], [dev, qa]], settings_path=self.settings_path, broadcast_tool=True)
+
+        self.assertEqual([tool.__name__ for tool in ceo.tools], ["SendMessage"])
+
+        with self.assertRaises(Exception):
+            Agency([ceo, [ceo, dev]], settings_path=self.settings_path, broadcast_tool=True,
+                   async_mode="threading")
+
+    def test_async_agency(self):
+        agency = self.make_agency(AsyncAgency)
+
+        response = asyncio.run(agency.get_completion("Hi"))
+
+        self.assertEqual(json.loads(response), {
+            "Dev": {"status": "completed", "response": "Echo: Review the release"},
+            "QA": {"status": "completed", "response": "Echo: Review the release"},
+        })
+
+
+    def test_async_timeout(self):
+        agency = self.make_agency(AsyncAgency, qa_tools=[WaitForCancellation], broadcast_timeout=0.2)
+        self.backend.set_behavior("QA", ScriptedBehavior(call_tool("WaitForCancellation")))
+
+        start = time.monotonic()
+        response = json.loads(asyncio.run(agency.get_completion("Hi")))
+
+        # the tool of the recipient is stopped by the token of the recipient, not only its run
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(response["Dev"], {"status": "completed", "response": "Echo: Review the release"})
+        self.assertEqual(response["QA"]["status"], "timeout")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, set_openai_key
+from agency_swarm.threads import AsyncThread, Thread
+from agency_swarm.threads.run_waiter import AsyncRunWaiter, RunWaiter
+from agency_swarm.user import User
+from agency_swarm.util import CancellationToken, PartialResult
+
+
+class FakeRuns:
+    """Runs that stay in progress until they are cancelled."""
+
+    def __init__(self):
+        self.status = "in_progress"
+        self.cancel_calls = 0
+
+    def create(self, thread_id, **kwargs):
+        return SimpleNamespace(id="run_1", status="queued")
+
+    def retrieve(self, thread_id, run_id):
+        return SimpleNamespace(id=run_id, status=self.status)
+
+    def cancel(self, thread_id, run_id):
+        self.cancel_calls += 1
+        self.status = "cancelled"
+        return SimpleNamespace(id=run_id, status="cancelling")
+
+
+class AsyncFakeRuns(FakeRuns):
+    async def create(self, thread_id, **kwargs):
+        return FakeRuns.create(self, thread_id, **kwargs)
+
+    async def retrieve(self, thread_id, run_id):
+        return FakeRuns.retrieve(self, thread_id, run_id)
+
+    async def cancel(self, thread_id, run_id):
+        return FakeRuns.cancel(self, thread_id, run_id)
+
+
+def make_client(runs):
+    messages = SimpleNamespace(create=lambda **kwargs: None)
+    return SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs, messages=messages)))
+
+
+def make_async_client(runs):
+    async def create(**kwargs):
+        return None
+
+    messages = SimpleNamespace(create=create)
+    return SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs, messages=messages)))
+
+
+def make_agent():
+    agent = Agent(name="TestAgent")
+    agent.id = "asst_1"
+    agent.assistant = SimpleNamespace(id="asst_1")
+    return agent
+
+
+class CancellationTokenTest(unittest.TestCase):
+    def test_deadline(self):
+        token = CancellationToken(timeout=0.01)
+        self.assertTrue(token.wait(1))
+        self.assertEqual(token.reason, "deadline exceeded")
+        self.assertEqual(token.remaining(), 0)
+
+    def test_callbacks(self):
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append("first"))
+        removed = token.add_callback(lambda: calls.append("removed"))
+        token.remove_callback(removed)
+
+        token.cancel("stopped")
+        token.cancel("again")
+        token.add_callback(lambda: calls.append("late"))
+
+        self.assertEqual(calls, ["first", "late"])
+        self.assertEqual(token.reason, "stopped")
+        self.assertIsNone(token.remaining())
+
+
+class RunCancellationTest(unittest.TestCase):
+    def test_wait_cancels_run(self):
+        runs = FakeRuns()
+        waiter = RunWaiter(use_streaming=False, initial_interval=0.001, max_interval=0.005)
+        token = CancellationToken(timeout=0.05)
+
+        start = time.perf_counter()
+        run = waiter.create_run(make_client(runs), "thread_1", cancellation_token=token, assistant_id="asst_1")
+
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(run.status, "cancelled")
+        self.assertEqual(runs.cancel_calls, 1)
+
+    def test_thread_returns_partial_result(self):
+        set_openai_key("test")
+        agent = Agent(name="TestAgent")
+        agent.id = "asst_1"
+        agent.assistant = SimpleNamespace(id="asst_1")
+
+        runs = FakeRuns()
+        thread = Thread(User(), agent, run_waiter=RunWaiter(use_streaming=False, initial_interval=0.001))
+        thread.client = make_client(runs)
+        thread.thread = SimpleNamespace(id="thread_1")
+
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        gen = thread.get_completion("Hi", yield_messages=False, cancellation_token=token)
+        try:
+            while True:
+                next(gen)
+        except StopIteration as e:
+            result = e.value
+
+        self.assertIsInstance(result, PartialResult)
+        self.assertEqual(result.reason, "cancelled")
+        self.assertEqual(result.recipient_name, "TestAgent")
+        self.assertEqual(runs.cancel_calls, 1)
+
+
+class AsyncRunCancellationTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        set_openai_key("test")
+
+    async def test_wait_cancels_run(self):
+        runs = AsyncFakeRuns()
+        waiter = AsyncRunWaiter(use_streaming=False, initial_interval=0.001, max_interval=0.005)
+        # cancelled from another thread, like the deadline timer of a token
+        token = CancellationToken(timeout=0.05)
+
+        start = time.perf_counter()
+        run = await waiter.create_run(make_async_client(runs), "thread_1", cancellation_token=token,
+                                      assistant_id="asst_1")
+
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(run.status, "cancelled")
+        self.assertEqual(runs.cancel_calls, 1)
+
+    async def test_thread_returns_partial_result(self):
+        runs = AsyncFakeRuns()
+        thread = AsyncThread(User(), make_agent(), run_waiter=AsyncRunWaiter(use_streaming=False, initial_interval=0.1))
+        thread.client = make_async_client(runs)
+        thread.thread = SimpleNamespace(id="thread_1")
+
+        token = CancellationToken()
+        asyncio.get_running_loop().call_later(0.05, token.cancel)
+        result = await thread.get_completion("Hi", cancellation_token=token)
+
+        self.assertIsInstance(result, PartialResult)
+        self.assertEqual(result.reason, "cancelled")
+        self.assertEqual(result.recipient_name, "TestAgent")
+        self.assertEqual(runs.cancel_calls, 1)
+
+    async def test_cancelled_token_skips_request(self):
+        runs = AsyncFakeRuns()
+        thread = AsyncThread(User(), make_agent())
+        thread.client = make_async_client(runs)
+        token = CancellationToken()
+        token.cancel("stopped")
+
+        result = await thread.get_completion("Hi", cancellation_token=token)
+
+        self.assertEqual(result.reason, "stopped")
+        self.assertIsNone(thread.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, AsyncAgency, Agent, BaseTool
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.util import PartialResult, RetryPolicy, get_openai_client
+from agency_swarm.util.fake_backend import FakeBackend, ScriptedBehavior, call_tool, delegate, fail, reply
+from tests.helpers import FakeBackendTestCase
+
+
+class AddNumbers(BaseTool):
+    """Adds two numbers."""
+    a: int
+    b: int
+
+    def run(self):
+        return str(self.a + self.b)
+
+
+class FakeBackendTest(FakeBackendTestCase):
+    def make_backend(self):
+        return FakeBackend(behaviors={
+            "CEO": ScriptedBehavior(delegate("Dev", "Add 1 and 2."), reply("The result is 3.")),
+            "Dev": ScriptedBehavior(call_tool("AddNumbers", a=1, b=2)),
+        })
+
+    def make_agency(self, agency_class=Agency, **kwargs):
+        threads = {}
+        ceo = Agent(name="CEO", description="Manages the agency.")
+        dev = Agent(name="Dev", description="Does the math.", tools=[AddNumbers])
+        return super().make_agency([ceo, dev], agency_class,
+                                   threads_callbacks={"load": lambda: threads, "save": threads.update}, **kwargs)
+
+    def test_agency_delegation_streaming(self):
+        agency = self.make_agency()
+
+        response = agency.get_completion("What is 1 + 2?", yield_messages=False)
+
+        self.assertEqual(response, "The result is 3.")
+        stats = self.backend.get_stats()
+        self.assertEqual(stats["assistants"], 2)
+        self.assertEqual(stats["runs"], 2)
+        self.assertEqual(stats["requests"]["POST /threads/{thread_id}/runs/{run_id}/submit_tool_outputs"], 2)
+
+        dev_thread = agency.agents_and_threads["CEO"]["Dev"]
+        messages = get_openai_client().beta.threads.messages.list(thread_id=dev_thread.id, order="asc")
+        self.assertEqual([message.content[0].text.value for message in messages], ["Add 1 and 2.", "3"])
+
+    def test_polling(self):
+        agency = self.make_agency()
+        agency.main_thread.run_waiter = RunWaiter(use_streaming=False)
+
+        response = agency.get_completion("What is 1 + 2?", yield_messages=False)
+
+        self.assertEqual(response, "The result is 3.")
+        self.assertEqual(agency.main_thread.run_waiter.get_stats()["stream_count"], 0)
+
+    def test_async_agency(self):
+        agency = self.make_agency(AsyncAgency)
+
+        response = asyncio.run(agency.get_completion("What is 1 + 2?"))
+
+        self.assertEqual(response, "The result is 3.")
+
+    def test_async_agency_usage(self):
+        agency = self.make_agency(AsyncAgency)
+
+        asyncio.run(agency.get_completion("What is 1 + 2?"))
+
+        report = agency.get_usage_report()
+        self.assertEqual(report["total"]["runs"], 2)
+        self.assertGreater(report["threads"]["CEO -> Dev"]["total_tokens"], 0)
+
+    def test_async_agency_token_budget(self):
+        agency = self.make_agency(AsyncAgency)
+
+        result = asyncio.run(agency.get_completion("What is 1 + 2?", token_budget=1))
+
+        # the budget is exceeded by the run of Dev, so the CEO run is cancelled before it replies
+        self.assertIsInstance(result, PartialResult)
+        self.assertEqual(result.reason, "token budget exceeded")
+        self.assertTrue(agency.get_usage_report()["last_request"]["budget_exceeded"])
+        self.assertEqual(self.backend.get_stats()["runs"], 2)
+
+    def test_usage(self):
+        agency = self.make_agency()
+
+        agency.get_completion("What is 1 + 2?", yield_messages=False)
+
+        report = agency.get_usage_report()
+        self.assertEqual(report["total"]["runs"], 2)
+        self.assertGreater(report["threads"]["CEO -> Dev"]["total_tokens"], 0)
+
+    def test_failed_runs_are_retried(self):
+        self.backend.behaviors["CEO"] = ScriptedBehavior(fail())
+        retry_policy = RetryPolicy(max_attempts=3, initial_delay=0, max_delay=0, jitter=0)
+        agency = self.make_agency(retry_policy=retry_policy)
+
+        with self.assertRaises(Exception):
+            agency.get_completion("Hi", yield_messages=False)
+        self.assertEqual(agency.retry_policy.get_stats()["give_ups"], 1)
+        self.assertEqual(self.backend.get_stats()["runs"], 4)
+
+    def test_injected_api_errors(self):
+        backend = FakeBackend(api_error_rate=0.5, seed=1)
+        backend.install(max_retries=10)
+        agency = self.make_agency()
+
+        response = agency.get_completion("Hello", yield_messages=False)
+
+        self.assertEqual(response, "Echo: Hello")
+        self.assertGreater(backend.get_stats()["injected_api_errors"], 0)
+
+    def test_pagination(self):
+        client = get_openai_client()
+        thread = client.beta.threads.create()
+        for i in range(25):
+            client.beta.threads.messages.create(thread_id=thread.id, role="user", content=str(i))
+
+        first_page = client.beta.threads.messages.list(thread_id=thread.id, order="asc", limit=10)
+        self.assertEqual(len(first_page.data), 10)
+        self.assertTrue(first_page.has_more)
+
+        messages = list(client.beta.threads.messages.list(thread_id=thread.id, order="asc", limit=10))
+        self.assertEqual([message.content[0].text.value for message in messages], [str(i) for i in range(25)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent
+from agency_swarm.tools import Retrieval
+from agency_swarm.util import FileUploader
+from tests.helpers import FakeBackendTestCase
+
+
+class FileUploaderTest(FakeBackendTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.temp_dir.name, "files_manifest.json")
+        self.files_folder = self.make_folder("files", {"a.txt": "first", "b.txt": "second"})
+        self.shared_folder = self.make_folder("shared", {"shared.txt": "shared"})
+
+    def make_folder(self, name, files):
+        folder = os.path.join(self.temp_dir.name, name)
+        os.makedirs(folder, exist_ok=True)
+        for file_name, content in files.items():
+            with open(os.path.join(folder, file_name), "w") as f:
+                f.write(content)
+        return folder
+
+    def count_uploads(self):
+        return self.count_requests("POST /files")
+
+    def make_agency(self):
+        return super().make_agency([Agent(name="CEO", files_folder=self.files_folder), Agent(name="Dev"),
+                                    Agent(name="QA")], shared_files=self.shared_folder)
+
+    def test_files_are_uploaded_on_init(self):
+        agent = Agent(name="CEO", files_folder=self.files_folder)
+        self.assertEqual(self.count_uploads(), 0)
+
+        agency = self.make_agency()
+
+        # the shared file is uploaded once for all agents
+        self.assertEqual(self.count_uploads(), 3)
+        ceo, dev, qa = agency.agents
+        self.assertEqual(len(ceo.file_ids), 3)
+        self.assertEqual(dev.file_ids, qa.file_ids)
+        self.assertIn(dev.file_ids[0], ceo.file_ids)
+        self.assertIn(Retrieval, dev.tools)
+        # local files are not renamed
+        self.assertEqual(sorted(os.listdir(self.files_folder)), ["a.txt", "b.txt"])
+        self.assertTrue(os.path.isfile(self.manifest_path))
+
+        # the manifest is used by the next start
+        agency = self.make_agency()
+        self.assertEqual(self.count_uploads(), 3)
+        self.assertEqual(agency.agents[0].file_ids, ceo.file_ids)
+        self.assertEqual(agent.file_ids, [])
+
+    def test_only_new_content_is_uploaded(self):
+        uploader = FileUploader(manifest_path=self.manifest_path)
+        first_ids = uploader.upload([os.path.join(self.files_folder, "a.txt"),
+                                     os.path.join(self.files_folder, "b.txt")])
+
+        self.make_folder("files", {"a_copy.txt": "first", "b.txt": "changed"})
+        file_ids = FileUploader(manifest_path=self.manifest_path).upload(
+            [os.path.join(self.files_folder, name) for name in ["a.txt", "a_copy.txt", "b.txt"]])
+
+        self.assertEqual(self.count_uploads(), 3)
+        self.assertEqual(len(file_ids), 2)
+        self.assertEqual(file_ids[0], first_ids[0])
+        self.assertNotEqual(file_ids[1], first_ids[1])
+
+    def test_manifest_can_not_be_written(self):
+        uploader = FileUploader(manifest_path=os.path.join(self.temp_dir.name, "missing", "files_manifest.json"))
+        f_path = os.path.join(self.files_folder, "a.txt")
+
+        with self.assertWarns(UserWarning):
+            file_ids = uploader.upload([f_path])
+
+        self.assertEqual(uploader.upload([f_path]), file_ids)
+        self.assertEqual(self.count_uploads(), 1)
+
+    def test_failed_upload_is_retried(self):
+        agent = Agent(name="CEO", files_folder=self.files_folder)
+        agent.file_uploader = FileUploader(manifest_path=self.manifest_path)
+        upload = agent.file_uploader.upload
+
+        def fail(f_paths):
+            agent.file_uploader.upload = upload
+            raise Exception("Connection error.")
+
+        agent.file_uploader.upload = fail
+        with self.assertRaises(Exception):
+            agent._upload_files()
+        self.assertEqual(agent.file_ids, [])
+
+        agent._upload_files()
+        self.assertEqual(len(agent.file_ids), 2)
+        self.assertEqual(self.count_uploads(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, set_openai_key
+from agency_swarm.tools import LazyTool
+from agency_swarm.tools.LazyTool import ToolManifest
+
+TOOL_TEMPLATE = '''from pydantic import Field
+
+from agency_swarm.tools import BaseTool
+
+
+class GreetTool(BaseTool):
+    """{description}"""
+    name: str = Field(..., description="The name to greet.")
+
+    def run(self):
+        return "Hello, " + self.name
+'''
+
+
+class LazyToolsTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+        # the folder must be importable from the working directory
+        self.temp_dir = tempfile.TemporaryDirectory(dir=os.path.relpath(os.path.dirname(__file__)))
+        self.tools_folder = self.temp_dir.name
+        self.module = os.path.relpath(os.path.join(self.tools_folder, "GreetTool")).replace(os.sep, ".")
+        self.write_tool("Greets someone.")
+
+    def tearDown(self):
+        self.unload()
+        self.temp_dir.cleanup()
+
+    def write_tool(self, description):
+        with open(os.path.join(self.tools_folder, "GreetTool.py"), "w") as f:
+            f.write(TOOL_TEMPLATE.format(description=description))
+
+    def unload(self):
+        sys.modules.pop(self.module, None)
+
+    def test_tools_are_imported_on_first_call(self):
+        schema = Agent(name="Greeter", tools_folder=self.tools_folder, lazy_tools=True).get_oai_tools()
+        self.assertTrue(os.path.isfile(os.path.join(self.tools_folder, ".tools_manifest.json")))
+        self.unload()
+
+        agent = Agent(name="Greeter", tools_folder=self.tools_folder, lazy_tools=True)
+
+        self.assertNotIn(self.module, sys.modules)
+        self.assertTrue(issubclass(agent.tools[0], LazyTool))
+        self.assertEqual(agent.get_oai_tools(), schema)
+
+        tool = agent.get_function("GreetTool")
+        self.assertIn(self.module, sys.modules)
+        self.assertFalse(issubclass(tool, LazyTool))
+        self.assertIs(agent.tools[0], tool)
+        self.assertEqual(tool.from_arguments('{"name": "Ada"}').run(), "Hello, Ada")
+
+    def test_changed_tools_are_imported(self):
+        Agent(name="Greeter", tools_folder=self.tools_folder, lazy_tools=True)
+        self.unload()
+
+        # touched without changes
+        f_path = os.path.join(self.tools_folder, "GreetTool.py")
+        os.utime(f_path, ns=(0, 0))
+        agent = Agent(name="Greeter", tools_folder=self.tools_folder, lazy_tools=True)
+        self.assertTrue(issubclass(agent.tools[0], LazyTool))
+
+        self.write_tool("Greets someone politely.")
+        agent = Agent(name="Greeter", tools_folder=self.tools_folder, lazy_tools=True)
+
+        self.assertFalse(issubclass(agent.tools[0], LazyTool))
+        self.assertEqual(agent.get_oai_tools()[0]["function"]["description"], "Greets someone politely.")
+        with open(os.path.join(self.tools_folder, ".tools_manifest.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["GreetTool.py"]["schema"]["description"], "Greets someone politely.")
+
+    def test_lazy_tools_disabled_by_default(self):
+        agent = Agent(name="Greeter", tools_folder=self.tools_folder)
+
+        self.assertFalse(issubclass(agent.tools[0], LazyTool))
+        self.assertFalse(os.path.exists(os.path.join(self.tools_folder, ".tools_manifest.json")))
+
+    def test_manifest_can_not_be_written(self):
+        manifest = ToolManifest(os.path.join(self.tools_folder, "missing"))
+        manifest.get_tool(os.path.join(self.tools_folder, "GreetTool.py"))
+
+        with self.assertWarns(UserWarning):
+            manifest.save()
+
+
+if __name__ == '__main__':
+    unittest.main()
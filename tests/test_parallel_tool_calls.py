@@ -0,0 +1,166 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from typing import ClassVar
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, AsyncAgency, BaseTool, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.user import User
+from agency_swarm.util.fake_backend import FakeBackend, ScriptedBehavior, call_tool, call_tools
+from tests.helpers import FakeBackendTestCase
+
+
+class SlowTool(BaseTool):
+    """Sleeps for a short time and returns the calling thread name."""
+    value: str
+
+    def run(self):
+        time.sleep(0.2)
+        return self.value + ":" + threading.current_thread().name
+
+
+class SerialTool(SlowTool):
+    """Sleeps for a short time and must not run concurrently."""
+    serial_only = True
+
+
+class GeneratorTool(BaseTool):
+    """Yields intermediate messages before returning."""
+    value: str
+
+    def run(self):
+        time.sleep(0.2)
+        yield "intermediate"
+        return self.value
+
+
+def make_tool_call(i, name, arguments):
+    return SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class ParallelToolCallsTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+        self.agent = Agent(name="TestAgent", tools=[SlowTool, SerialTool, GeneratorTool])
+        self.thread = Thread(User(), self.agent, parallel_tool_calls=True, max_tool_workers=4)
+
+    def test_independent_calls_run_concurrently(self):
+        tool_calls = [make_tool_call(i, "SlowTool", f'{{"value": "{i}"}}') for i in range(3)]
+
+        start = time.perf_counter()
+        futures = self.thread._execute_tools_parallel(tool_calls, self.agent, None)
+        outputs = [futures[tool_call.id].result() for tool_call in tool_calls]
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual([output.split(":")[0] for output in outputs], ["0", "1", "2"])
+
+    def test_serial_and_generator_tools(self):
+        tool_calls = [make_tool_call(0, "SerialTool", '{"value": "a"}'),
+                      make_tool_call(1, "GeneratorTool", '{"value": "b"}'),
+                      make_tool_call(2, "GeneratorTool", '{"value": "c"}')]
+
+        futures = self.thread._execute_tools_parallel(tool_calls, self.agent, None)
+        self.assertNotIn("call_0", futures)
+
+        gen = futures["call_2"].result()
+        self.assertEqual(next(gen), "intermediate")
+        with self.assertRaises(StopIteration) as e:
+            next(gen)
+        self.assertEqual(e.exception.value, "c")
+
+    def test_disabled(self):
+        self.thread.parallel_tool_calls = False
+        tool_calls = [make_tool_call(i, "SlowTool", '{"value": "a"}') for i in range(2)]
+        self.assertEqual(self.thread._execute_tools_parallel(tool_calls, self.agent, None), {})
+
+
+class RecordingTool(BaseTool):
+    """Sleeps for a short time and records when it ran."""
+    value: str
+    intervals: ClassVar[list] = []
+
+    def run(self):
+        start = time.perf_counter()
+        time.sleep(0.1)
+        RecordingTool.intervals.append((self.__class__.__name__, start, time.perf_counter()))
+        return self.value
+
+
+class SerialRecordingTool(RecordingTool):
+    """Records when it ran and must not run concurrently."""
+    serial_only = True
+
+
+class OneCallRecordingTool(RecordingTool):
+    """Records when it ran and can only be called once at a time."""
+    one_call_at_a_time: bool = True
+
+
+class RecordingBackend(FakeBackend):
+    """Records the ids of the tool calls of each run step and of the submitted tool outputs, in order."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tool_call_ids = []
+        self.submitted_ids = []
+
+    def submit_tool_outputs(self, thread_id, run_id, body, events=None):
+        step = self.run_steps[run_id][-1]
+        self.tool_call_ids.append([tool_call["id"] for tool_call in step["step_details"]["tool_calls"]])
+        self.submitted_ids.append([tool_output["tool_call_id"] for tool_output in body["tool_outputs"]])
+        return super().submit_tool_outputs(thread_id, run_id, body, events)
+
+
+class ParallelToolCallsBackendTest(FakeBackendTestCase):
+    values = ["a", "b", "c", "d", "e"]
+
+    def setUp(self):
+        super().setUp()
+        RecordingTool.intervals = []
+
+    def make_backend(self):
+        return RecordingBackend(behaviors={"CEO": ScriptedBehavior(call_tools(
+            call_tool("RecordingTool", value="a"),
+            call_tool("SerialRecordingTool", value="b"),
+            call_tool("RecordingTool", value="c"),
+            call_tool("OneCallRecordingTool", value="d"),
+            call_tool("RecordingTool", value="e"),
+        ))})
+
+    def make_agent(self):
+        return Agent(name="CEO", tools=[RecordingTool, SerialRecordingTool, OneCallRecordingTool])
+
+    def assert_tool_calls(self, response):
+        # the default behavior replies with the outputs of the calls in the order of the run step
+        self.assertEqual(response, "\n".join(self.values))
+        self.assertEqual(len(self.backend.submitted_ids), 1)
+        self.assertEqual(self.backend.submitted_ids, self.backend.tool_call_ids)
+
+        serial = [interval for interval in RecordingTool.intervals if interval[0] != "RecordingTool"]
+        self.assertEqual(len(serial), 2)
+        for name, start, end in serial:
+            for other in RecordingTool.intervals:
+                if other[0] != name:
+                    self.assertTrue(other[2] <= start or other[1] >= end, (name, other[0]))
+
+        # the three independent calls run concurrently
+        parallel = [interval for interval in RecordingTool.intervals if interval[0] == "RecordingTool"]
+        self.assertLess(max(end for _, _, end in parallel) - min(start for _, start, _ in parallel), 0.2)
+
+    def test_sync_agency(self):
+        agency = self.make_agency([self.make_agent()], parallel_tool_calls=True)
+
+        self.assert_tool_calls(agency.get_completion("Hi", yield_messages=False))
+
+    def test_async_agency(self):
+        agency = self.make_agency([self.make_agent()], AsyncAgency, parallel_tool_calls=True)
+
+        self.assert_tool_calls(asyncio.run(agency.get_completion("Hi")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import sys
+import unittest
+from types import SimpleNamespace
+from typing import ClassVar
+
+import httpx
+from openai import BadRequestError
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.user import User
+from agency_swarm.util import RetryPolicy
+
+
+class ExpensiveTool(BaseTool):
+    """Counts its executions."""
+    value: str
+    calls: ClassVar[int] = 0
+
+    def run(self):
+        ExpensiveTool.calls += 1
+        return "result " + self.value
+
+
+def make_error(code, message):
+    return SimpleNamespace(code=code, message=message)
+
+
+def make_expired_error():
+    response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/runs"))
+    return BadRequestError('Runs in status "expired" do not accept tool outputs.', response=response, body=None)
+
+
+class FakeRuns:
+    """Runs that call ExpensiveTool, with the first tool output submission failing on an expired run."""
+
+    def __init__(self, failed_runs=0):
+        self.created = 0
+        self.submitted = []
+        self.failed_runs = failed_runs
+
+    def create(self, thread_id, **kwargs):
+        self.created += 1
+        if self.created <= self.failed_runs:
+            return SimpleNamespace(id=f"run_{self.created}", status="failed",
+                                   last_error=make_error("server_error", "Sorry, something went wrong."))
+
+        tool_call = SimpleNamespace(id=f"call_{self.created}",
+                                    function=SimpleNamespace(name="ExpensiveTool", arguments='{"value": "a"}'))
+        required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[tool_call]))
+        return SimpleNamespace(id=f"run_{self.created}", status="requires_action", required_action=required_action)
+
+    def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+        if not self.submitted:
+            self.submitted.append(None)
+            raise make_expired_error()
+        self.submitted.append(tool_outputs)
+        return SimpleNamespace(id=run_id, status="completed")
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(RetryPolicy.classify(make_error("server_error", "Sorry, something went wrong.")),
+                         "server_error")
+        self.assertEqual(RetryPolicy.classify(make_error("rate_limit_exceeded", "Rate limit reached.")), "rate_limit")
+        self.assertEqual(RetryPolicy.classify(make_expired_error()), "expired")
+        self.assertEqual(RetryPolicy.classify(make_error("invalid_prompt", "Invalid prompt.")), "fatal")
+
+    def test_attempts_and_counters(self):
+        policy = RetryPolicy(max_attempts=2)
+        error = make_error("server_error", "Sorry, something went wrong.")
+
+        self.assertTrue(policy.should_retry(error, 0))
+        self.assertTrue(policy.should_retry(error, 1))
+        self.assertFalse(policy.should_retry(error, 2))
+        self.assertFalse(policy.should_retry(make_error("rate_limit_exceeded", ""), 0))
+
+        stats = policy.get_stats()
+        self.assertEqual(stats["errors"], {"server_error": 3, "rate_limit": 1})
+        self.assertEqual(stats["retries"], {"server_error": 2})
+        self.assertEqual(stats["give_ups"], 2)
+
+    def test_retry_budget(self):
+        policy = RetryPolicy(retry_budget=2, budget_window=60)
+        error = make_error("server_error", "Sorry, something went wrong.")
+
+        self.assertEqual([policy.should_retry(error, 0) for _ in range(3)], [True, True, False])
+        self.assertEqual(policy.budget_exhausted, 1)
+
+    def test_backoff_with_jitter(self):
+        policy = RetryPolicy(initial_delay=1, max_delay=5, backoff_factor=2, jitter=0.5)
+
+        for attempt, base in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+            delay = policy.get_delay(attempt)
+            self.assertTrue(base / 2 <= delay <= base, (attempt, delay))
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(jitter=2)
+
+    def test_expired_runs_are_retried_immediately(self):
+        policy = RetryPolicy(initial_delay=1, jitter=0)
+
+        self.assertEqual(policy.get_delay(0, make_error("expired", "Runs in status \"expired\"")), 0)
+        self.assertEqual(policy.get_delay(0, make_error("rate_limit_exceeded", "Rate limit reached.")), 1)
+        self.assertEqual(policy.get_delay(1, make_error("server_error", "Sorry, something went wrong.")), 2)
+        self.assertEqual(RetryPolicy(backoff_errors=["expired"], jitter=0).get_delay(0, make_error("expired", "")), 1)
+
+
+class ThreadRetryTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+        ExpensiveTool.calls = 0
+
+        self.agent = Agent(name="TestAgent", tools=[ExpensiveTool])
+        self.agent.id = "asst_1"
+        self.agent.assistant = SimpleNamespace(id="asst_1")
+        self.messages = []
+
+    def make_thread(self, runs, retry_policy=None):
+        thread = Thread(User(), self.agent, run_waiter=RunWaiter(use_streaming=False), retry_policy=retry_policy)
+        thread.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+            runs=runs, messages=SimpleNamespace(create=lambda **kwargs: self.messages.append(kwargs["content"]),
+                                                list=lambda **kwargs: iter([])))))
+        thread.thread = SimpleNamespace(id="thread_1")
+        thread.id = "thread_1"
+        return thread
+
+    def get_result(self, thread):
+        gen = thread.get_completion("Hi", yield_messages=False)
+        try:
+            while True:
+                next(gen)
+        except StopIteration as e:
+            return e.value
+
+    def test_replays_outputs_after_expired_run(self):
+        runs = FakeRuns()
+        policy = RetryPolicy()
+        thread = self.make_thread(runs, policy)
+
+        self.get_result(thread)
+
+        self.assertEqual(ExpensiveTool.calls, 1)
+        self.assertEqual(runs.created, 2)
+        self.assertEqual(runs.submitted[-1], [{"tool_call_id": "call_2", "output": "result a"}])
+        self.assertEqual(policy.get_stats()["replayed_tool_outputs"], 1)
+        self.assertEqual(policy.get_stats()["retries"], {"expired": 1})
+
+    def test_failed_runs_use_agent_policy(self):
+        runs = FakeRuns(failed_runs=2)
+        self.agent.retry_policy = RetryPolicy(initial_delay=0, max_delay=0, continue_message="Go on.")
+        thread = self.make_thread(runs)
+
+        self.get_result(thread)
+
+        self.assertEqual(runs.created, 4)
+        self.assertEqual(self.messages, ["Hi", "Go on.", "Please repeat the exact same function calls again in the same order."])
+        self.assertEqual(self.agent.retry_policy.get_stats()["retries"], {"server_error": 2, "expired": 1})
+        self.assertEqual(thread.retry_policy.get_stats()["retries"], {})
+
+    def test_gives_up_on_fatal_errors(self):
+        runs = FakeRuns(failed_runs=1)
+        thread = self.make_thread(runs, RetryPolicy(retryable_errors=[]))
+
+        with self.assertRaises(Exception):
+            self.get_result(thread)
+        self.assertEqual(runs.created, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import sys
+import unittest
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.util.fake_backend import FakeBackend
+from agency_swarm.user import User
+
+
+class FakeRuns:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.retrieve_calls = 0
+
+    def create(self, thread_id, **kwargs):
+        return SimpleNamespace(id="run_1", status="queued")
+
+    def retrieve(self, thread_id, run_id):
+        self.retrieve_calls += 1
+        return SimpleNamespace(id=run_id, status=self.statuses.pop(0))
+
+
+class RunWaiterTest(unittest.TestCase):
+    def make_client(self, statuses):
+        runs = FakeRuns(statuses)
+        return SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs))), runs
+
+    def test_polls_until_done(self):
+        client, runs = self.make_client(["in_progress", "in_progress", "completed"])
+        waiter = RunWaiter(use_streaming=False, initial_interval=0.001, max_interval=0.002)
+
+        run = waiter.create_run(client, "thread_1", assistant_id="asst_1")
+
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(runs.retrieve_calls, 3)
+        self.assertEqual(waiter.poll_count, 3)
+        self.assertEqual(waiter.run_wait_times[-1][0], "run_1")
+        self.assertGreater(waiter.get_stats()["total_wait_time"], 0)
+
+    def test_does_not_poll_finished_run(self):
+        client, runs = self.make_client([])
+        waiter = RunWaiter(use_streaming=False)
+
+        run = waiter.wait(client, "thread_1", SimpleNamespace(id="run_1", status="requires_action"))
+
+        self.assertEqual(run.status, "requires_action")
+        self.assertEqual(runs.retrieve_calls, 0)
+
+    def test_invalid_intervals(self):
+        with self.assertRaises(ValueError):
+            RunWaiter(initial_interval=1, max_interval=0.5)
+
+    def make_stream_client(self, error_message):
+        """Returns a FakeBackend client whose first streamed run fails with a 400 error, and a thread."""
+        client = FakeBackend().get_client()
+        assistant = client.beta.assistants.create(model="gpt-4-turbo", name="Assistant")
+        thread = client.beta.threads.create()
+        client.beta.threads.messages.create(thread.id, role="user", content="Hi")
+
+        runs = client.beta.threads.runs
+        create_and_stream = runs.create_and_stream
+        calls = []
+
+        def fail_once(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/runs"))
+                raise BadRequestError(error_message, response=response, body=None)
+            return create_and_stream(**kwargs)
+
+        runs.create_and_stream = fail_once
+        return client, assistant.id, thread.id
+
+    def test_transient_error_keeps_streaming(self):
+        client, assistant_id, thread_id = self.make_stream_client("Thread already has an active run.")
+        waiter = RunWaiter(initial_interval=0.001)
+
+        # the failed request is polled
+        run = waiter.create_run(client, thread_id, assistant_id=assistant_id)
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(waiter.stream_count, 0)
+        self.assertTrue(waiter.use_streaming)
+
+        run = waiter.create_run(client, thread_id, assistant_id=assistant_id)
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(waiter.stream_count, 1)
+
+    def test_unsupported_streaming_is_disabled(self):
+        client, assistant_id, thread_id = self.make_stream_client("Unrecognized request argument supplied: stream")
+        waiter = RunWaiter(initial_interval=0.001)
+
+        waiter.create_run(client, thread_id, assistant_id=assistant_id)
+        waiter.create_run(client, thread_id, assistant_id=assistant_id)
+
+        self.assertFalse(waiter.use_streaming)
+        self.assertEqual(waiter.stream_count, 0)
+
+
+
+def make_message(run_id, text):
+    content = SimpleNamespace(type="text", text=SimpleNamespace(value=text))
+    return SimpleNamespace(run_id=run_id, content=[content])
+
+
+class ThreadRunMessagesTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+        self.thread = Thread(User(), Agent(name="TestAgent"))
+        self.thread.id = "thread_1"
+        self.thread.run = SimpleNamespace(id="run_2", status="completed")
+        self.list_calls = 0
+
+        def list_messages(thread_id, order, limit):
+            self.list_calls += 1
+            return iter([make_message("run_2", "second"), make_message("run_2", "first"),
+                         make_message(None, "user message"), make_message("run_1", "previous run")])
+
+        self.thread.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+            messages=SimpleNamespace(list=list_messages))))
+
+    def test_uses_streamed_messages(self):
+        self.thread.run_messages = [make_message("run_2", "streamed")]
+
+        self.assertEqual(self.thread._get_last_message_text(), "streamed")
+        self.assertEqual(self.list_calls, 0)
+
+    def test_fetches_only_run_messages(self):
+        self.assertEqual(self.thread._get_last_message_text(), "second")
+        self.assertEqual([m.content[0].text.value for m in self.thread._get_run_messages()], ["first", "second"])
+        self.assertEqual(self.list_calls, 1)
+
+    def test_run_without_messages(self):
+        self.thread.run = SimpleNamespace(id="run_3", status="failed")
+
+        self.assertEqual(self.thread._get_last_message_text(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
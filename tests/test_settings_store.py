@@ -0,0 +1,177 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, Agent, set_openai_key
+from agency_swarm.util import InMemorySettingsStore, JsonFileSettingsStore, SQLiteSettingsStore
+from agency_swarm.util.fake_backend import FakeBackend
+
+
+def make_settings(assistant_id, name, **kwargs):
+    return {"id": assistant_id, "name": name, **kwargs}
+
+
+class SettingsStoreTestMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def test_save_and_lookup(self):
+        store = self.make_store()
+        store.save(make_settings("asst_1", "CEO"))
+        store.save(make_settings("asst_2", "Dev"))
+        store.save(make_settings("asst_3", "CEO"))
+
+        self.assertEqual(store.get("asst_2"), make_settings("asst_2", "Dev"))
+        self.assertIsNone(store.get("asst_4"))
+        self.assertEqual([settings["id"] for settings in store.find_by_name("CEO")], ["asst_1", "asst_3"])
+        self.assertEqual([settings["id"] for settings in store.get_all()], ["asst_1", "asst_2", "asst_3"])
+
+    def test_update_and_delete(self):
+        store = self.make_store()
+        store.save(make_settings("asst_1", "CEO"))
+        store.save(make_settings("asst_2", "Dev"))
+
+        store.save(make_settings("asst_1", "Manager", model="gpt-4"))
+        store.delete("asst_2")
+        store.delete("asst_3")
+
+        self.assertEqual(store.get_all(), [make_settings("asst_1", "Manager", model="gpt-4")])
+        self.assertEqual(store.find_by_name("CEO"), [])
+        self.assertEqual(store.find_by_name("Dev"), [])
+
+
+class InMemorySettingsStoreTest(SettingsStoreTestMixin, unittest.TestCase):
+    def make_store(self):
+        return InMemorySettingsStore()
+
+
+class JsonFileSettingsStoreTest(SettingsStoreTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "settings.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_store(self, **kwargs):
+        return JsonFileSettingsStore(self.path, **kwargs)
+
+    def read_file(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_writes_are_persisted(self):
+        self.make_store().save(make_settings("asst_1", "CEO"))
+
+        self.assertEqual(self.read_file(), [make_settings("asst_1", "CEO")])
+        self.assertEqual(self.make_store().find_by_name("CEO"), [make_settings("asst_1", "CEO")])
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")], [])
+
+    def test_debounced_writes(self):
+        store = self.make_store(debounce=60)
+        store.save(make_settings("asst_1", "CEO"))
+        store.save(make_settings("asst_2", "Dev"))
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(store.get_all()), 2)
+
+        store.flush()
+        self.assertEqual(self.read_file(), [make_settings("asst_1", "CEO"), make_settings("asst_2", "Dev")])
+
+    def test_changes_of_other_stores_are_kept(self):
+        first = self.make_store()
+        second = self.make_store()
+
+        first.save(make_settings("asst_1", "CEO"))
+        second.save(make_settings("asst_2", "Dev"))
+        second.delete("asst_1")  # not known to the second store, but deleted from the file
+        first.save(make_settings("asst_3", "QA"))
+
+        self.assertEqual([settings["id"] for settings in self.read_file()], ["asst_2", "asst_3"])
+        second.reload()
+        self.assertEqual([settings["id"] for settings in second.get_all()], ["asst_2", "asst_3"])
+
+
+class SQLiteSettingsStoreTest(SettingsStoreTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "settings.db")
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.temp_dir.cleanup()
+
+    def make_store(self):
+        store = SQLiteSettingsStore(self.path)
+        self.stores.append(store)
+        return store
+
+    def test_persisted(self):
+        self.make_store().save(make_settings("asst_1", "CEO"))
+
+        self.assertEqual(self.make_store().find_by_name("CEO"), [make_settings("asst_1", "CEO")])
+
+
+class AgencySettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeBackend()
+        self.backend.install()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings_path = os.path.join(self.temp_dir.name, "settings.json")
+
+    def tearDown(self):
+        set_openai_key("test")
+        self.temp_dir.cleanup()
+
+    def make_chart(self):
+        ceo = Agent(name="CEO")
+        dev = Agent(name="Dev")
+        return [ceo, [ceo, dev]]
+
+    def test_default_store_is_reused(self):
+        agent = Agent(name="CEO")
+        agent.settings_path = self.settings_path
+
+        store = agent.get_settings_store()
+
+        self.assertIs(agent.get_settings_store(), store)
+        agent.settings_path = os.path.join(self.temp_dir.name, "other_settings.json")
+        self.assertEqual(agent.get_settings_store().path, agent.settings_path)
+
+    def test_sqlite_store(self):
+        store = SQLiteSettingsStore(os.path.join(self.temp_dir.name, "settings.db"))
+        self.addCleanup(store.close)
+
+        agency = Agency(self.make_chart(), settings_store=store)
+        ids = sorted(agent.id for agent in agency.agents)
+        agency = Agency(self.make_chart(), settings_store=store)
+
+        self.assertEqual(sorted(agent.id for agent in agency.agents), ids)
+        self.assertEqual(self.backend.get_stats()["assistants"], 2)
+        self.assertEqual(sorted(settings["id"] for settings in store.get_all()), ids)
+        self.assertFalse(os.path.exists(self.settings_path))
+
+    def test_settings_callbacks(self):
+        saved = []
+        callbacks = {"load": lambda: saved[-1] if saved else [], "save": saved.append}
+
+        Agency(self.make_chart(), settings_callbacks=callbacks, settings_path=self.settings_path)
+        Agency(self.make_chart(), settings_callbacks=callbacks, settings_path=self.settings_path)
+
+        self.assertEqual(self.backend.get_stats()["assistants"], 2)
+        # nothing changed on the second start, so there is nothing to save
+        self.assertEqual([len(settings) for settings in saved], [2])
+        # the settings file is not used with callbacks
+        self.assertFalse(os.path.exists(self.settings_path))
+
+        with self.assertRaises(Exception):
+            Agency(self.make_chart(), settings_callbacks=callbacks, settings_store=InMemorySettingsStore())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, Agent, BaseTool, set_openai_key
+from agency_swarm.threads import WorkerPool
+from agency_swarm.util import RetryPolicy, get_openai_client
+from agency_swarm.util.fake_backend import FakeBackend, call_tool, delegate, reply
+
+
+def wait_until_idle(threads, timeout=10):
+    deadline = time.monotonic() + timeout
+    while any(thread.processing for thread in threads):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Threads are still processing.")
+        time.sleep(0.01)
+
+
+class ThreadAsyncTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeBackend(run_latency=0.05)
+        self.backend.install()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings_path = os.path.join(self.temp_dir.name, "settings.json")
+
+    def tearDown(self):
+        set_openai_key("test")
+        self.temp_dir.cleanup()
+
+    def make_agency(self, n_agents=1, **kwargs):
+        ceo = Agent(name="CEO", description="Manages the agency.")
+        agents = [Agent(name=f"Dev{i}", description="Develops.") for i in range(n_agents)]
+        return Agency([ceo] + [[ceo, agent] for agent in agents], async_mode="threading",
+                      settings_path=self.settings_path, **kwargs)
+
+    def test_messages_are_queued_in_order(self):
+        agency = self.make_agency(async_max_queue_size=1)
+        thread = agency.agents_and_threads["CEO"]["Dev0"]
+
+        self.assertIn("Task has started", thread.get_completion_async("first"))
+        self.assertIn("queued behind 1", thread.get_completion_async("second"))
+        self.assertIn("too many pending messages", thread.get_completion_async("third"))
+        self.assertIn("not completed yet", thread.check_status())
+
+        wait_until_idle([thread])
+
+        messages = get_openai_client().beta.threads.messages.list(thread_id=thread.id, order="asc")
+        self.assertEqual([message.content[0].text.value for message in messages],
+                         ["first", "Echo: first", "second", "Echo: second"])
+        self.assertEqual(thread.check_status(), "Dev0's Response: 'Echo: second'")
+
+        stats = agency.worker_pool.get_stats()
+        self.assertEqual((stats["enqueued"], stats["rejected"], stats["completed"]), (2, 1, 2))
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreater(stats["max_wait_time"], 0)
+
+    def test_workers_are_bounded(self):
+        agency = self.make_agency(n_agents=6, async_max_workers=2)
+        threads = [agency.agents_and_threads["CEO"][f"Dev{i}"] for i in range(6)]
+
+        for thread in threads:
+            thread.get_completion_async("task")
+        max_active = 0
+        while any(thread.processing for thread in threads):
+            max_active = max(max_active, agency.worker_pool.active)
+            time.sleep(0.005)
+
+        self.assertLessEqual(max_active, 2)
+        self.assertEqual(agency.worker_pool.get_stats()["completed"], 6)
+        # only two messages can be taken from the queues at a time
+        self.assertGreaterEqual(agency.worker_pool.get_stats()["max_queued"], 4)
+
+    def test_status_checks_use_local_state(self):
+        agency = self.make_agency()
+        thread = agency.agents_and_threads["CEO"]["Dev0"]
+        thread.get_completion_async("first")
+        wait_until_idle([thread])
+        requests = self.backend.get_stats()["total_requests"]
+
+        for _ in range(5):
+            self.assertEqual(thread.check_status(), "Dev0's Response: 'Echo: first'")
+        self.assertEqual(self.backend.get_stats()["total_requests"], requests)
+
+        thread.get_completion_async("second")
+        wait_until_idle([thread])
+        self.assertEqual(thread.check_status(), "Dev0's Response: 'Echo: second'")
+        self.assertNotIn("GET /threads/{thread_id}/runs", self.backend.get_stats()["requests"])
+
+    def test_status_after_restart(self):
+        agency = self.make_agency()
+        thread = agency.agents_and_threads["CEO"]["Dev0"]
+        thread.get_completion_async("first")
+        wait_until_idle([thread])
+
+        restarted = self.make_agency().agents_and_threads["CEO"]["Dev0"]
+        restarted.id = thread.id
+
+        self.assertEqual(restarted.check_status(), "Dev0's Response: 'Echo: first'")
+        self.assertEqual(self.backend.get_stats()["requests"]["GET /threads/{thread_id}/runs"], 1)
+
+    def test_failed_status(self):
+        self.backend.failure_rate = 1.0
+        agency = self.make_agency(retry_policy=RetryPolicy(max_attempts=0))
+        thread = agency.agents_and_threads["CEO"]["Dev0"]
+
+        thread.get_completion_async("first")
+        wait_until_idle([thread])
+
+        self.assertIn("Agent run failed with error: OpenAI Run Failed.", thread.check_status())
+        self.assertEqual(agency.worker_pool.get_stats()["failed"], 1)
+
+    def test_submit_returns_future(self):
+        agency = self.make_agency()
+        thread = agency.agents_and_threads["CEO"]["Dev0"]
+
+        futures = [thread.submit(f"task {i}") for i in range(3)]
+
+        self.assertEqual([future.result(timeout=10) for future in futures],
+                         ["Echo: task 0", "Echo: task 1", "Echo: task 2"])
+
+    def test_invalid_pool(self):
+        with self.assertRaises(ValueError):
+            WorkerPool(max_workers=0)
+
+
+dev_started = threading.Event()
+dev_release = threading.Event()
+
+
+class WaitForDev(BaseTool):
+    """Waits until Dev has finished its task."""
+
+    def run(self):
+        dev_release.set()
+        time.sleep(0.2)
+        return "Waited."
+
+
+class WaitForTest(BaseTool):
+    """Waits until the test releases the task."""
+
+    def run(self):
+        dev_started.set()
+        dev_release.wait(10)
+        return "Done."
+
+
+def ceo_behavior(context):
+    message = context.last_user_message
+    if message.startswith("System Notification"):
+        return reply("Forwarding: " + message)
+    if context.step == 0:
+        return delegate("Dev0", message)
+    if context.step == 1 and message == "wait":
+        return call_tool("WaitForDev")
+    return reply("Started.")
+
+
+def dev_behavior(context):
+    if context.step == 0:
+        return call_tool("WaitForTest")
+    return reply("Built it.")
+
+
+class PushResponsesTest(unittest.TestCase):
+    def setUp(self):
+        dev_started.clear()
+        dev_release.clear()
+        self.backend = FakeBackend(behaviors={"CEO": ceo_behavior, "Dev0": dev_behavior})
+        self.backend.install()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        ceo = Agent(name="CEO", description="Manages the agency.", tools=[WaitForDev])
+        dev = Agent(name="Dev0", description="Develops.", tools=[WaitForTest])
+        self.agency = Agency([ceo, [ceo, dev]], async_mode="threading", async_push_responses=True,
+                             settings_path=os.path.join(self.temp_dir.name, "settings.json"))
+
+    def tearDown(self):
+        dev_release.set()
+        set_openai_key("test")
+        self.temp_dir.cleanup()
+
+    def test_response_wakes_caller_run(self):
+        response = self.agency.get_completion("wait", yield_messages=False)
+
+        self.assertEqual(response, "Started.\nForwarding: System Notification: 'Dev0 has completed your task. "
+                                   "Dev0's Response: 'Built it.''")
+
+    def test_response_is_delivered_with_next_message(self):
+        self.assertEqual(self.agency.get_completion("build", yield_messages=False), "Started.")
+        self.assertTrue(dev_started.wait(5))
+        dev_release.set()
+        wait_until_idle([self.agency.agents_and_threads["CEO"]["Dev0"]])
+
+        self.agency.get_completion("thanks", yield_messages=False)
+
+        messages = get_openai_client().beta.threads.messages.list(thread_id=self.agency.main_thread.id, order="asc")
+        user_messages = [message.content[0].text.value for message in messages if message.role == "user"]
+        self.assertEqual(user_messages[1:], ["System Notification: 'Dev0 has completed your task. "
+                                             "Dev0's Response: 'Built it.''", "thanks"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agency, AsyncAgency, Agent
+from agency_swarm.util.fake_backend import FakeBackend, ScriptedBehavior, delegate, fail, reply
+from tests.helpers import FakeBackendTestCase
+
+
+class BarrierAgency(Agency):
+    """Fails unless all threads are created at the same time."""
+    barrier = None
+
+    def _create_remote_thread(self, thread):
+        self.barrier.wait()
+        super()._create_remote_thread(thread)
+
+
+class ThreadInitTest(FakeBackendTestCase):
+    def setUp(self):
+        super().setUp()
+        self.saved = []
+
+    def make_backend(self):
+        return FakeBackend(behaviors={
+            "CEO": ScriptedBehavior(delegate("Dev", "Hi Dev"), reply("Done.")),
+        })
+
+    def make_agency(self, agency_class=Agency, thread_ids=None, **kwargs):
+        callbacks = {"load": lambda: thread_ids or {}, "save": self.saved.append}
+        return super().make_agency([Agent(name="CEO"), Agent(name="Dev"), Agent(name="QA")], agency_class,
+                                   threads_callbacks=callbacks, **kwargs)
+
+    def test_threads_created_on_first_use(self):
+        agency = self.make_agency()
+
+        self.assertEqual(self.backend.get_stats()["threads"], 0)
+        self.assertEqual(self.saved, [])
+
+        agency.get_completion("Hi", yield_messages=False)
+
+        # the thread between CEO and QA is never used
+        self.assertEqual(self.backend.get_stats()["threads"], 2)
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(set(self.saved[0]), {"main_thread", "CEO"})
+        self.assertEqual(self.saved[0]["CEO"], {"Dev": agency.agents_and_threads["CEO"]["Dev"].id})
+
+        # nothing new to save
+        agency.get_completion("Hi again", yield_messages=False)
+        self.assertEqual(len(self.saved), 1)
+
+    def test_loaded_threads_are_not_retrieved(self):
+        self.make_agency().get_completion("Hi", yield_messages=False)
+        thread_ids = self.saved[0]
+
+        agency = self.make_agency(thread_ids=thread_ids)
+        agency.get_completion("Hi again", yield_messages=False)
+
+        self.assertEqual(agency.main_thread.id, thread_ids["main_thread"])
+        self.assertEqual(self.backend.get_stats()["threads"], 2)
+        self.assertNotIn("GET /threads/{thread_id}", self.backend.get_stats()["requests"])
+        self.assertEqual(len(self.saved), 1)
+
+    def test_eager_threads(self):
+        BarrierAgency.barrier = threading.Barrier(3, timeout=5)
+        agency = self.make_agency(BarrierAgency, eager_threads=True)
+
+        self.assertEqual(self.backend.get_stats()["threads"], 3)
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(self.saved[0]["CEO"]["QA"], agency.agents_and_threads["CEO"]["QA"].id)
+
+        agency.get_completion("Hi", yield_messages=False)
+        self.assertEqual(self.backend.get_stats()["threads"], 3)
+        self.assertEqual(len(self.saved), 1)
+
+    def test_async_agency_eager_threads(self):
+        agency = self.make_agency(AsyncAgency, eager_threads=True)
+
+        self.assertEqual(self.backend.get_stats()["threads"], 3)
+
+        response = asyncio.run(agency.get_completion("Hi"))
+
+        self.assertEqual(response, "Done.")
+        self.assertEqual(self.backend.get_stats()["threads"], 3)
+        self.assertEqual(len(self.saved), 1)
+
+
+    def test_async_agency_saves_threads_on_failure(self):
+        self.backend.set_behavior("CEO", ScriptedBehavior(delegate("Dev", "Hi Dev"), fail("invalid_request", "Bad.")))
+        agency = self.make_agency(AsyncAgency)
+
+        with self.assertRaises(Exception):
+            asyncio.run(agency.get_completion("Hi"))
+
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(self.saved[0]["CEO"], {"Dev": agency.agents_and_threads["CEO"]["Dev"].id})
+
+
+if __name__ == '__main__':
+    unittest.main()
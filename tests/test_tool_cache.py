@@ -0,0 +1,147 @@
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import ClassVar
+from unittest import mock
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.tools import MemoryToolCache, DiskToolCache
+from agency_swarm.user import User
+
+
+class CountingTool(BaseTool):
+    """Counts how many times it was executed."""
+    query: str
+    page: int = 1
+    cache_results = True
+    calls: ClassVar[int] = 0
+
+    def run(self):
+        CountingTool.calls += 1
+        return f"{self.query}:{self.page}"
+
+
+class FailingTool(BaseTool):
+    """Fails on the first calls."""
+    query: str
+    cache_results = True
+    calls: ClassVar[int] = 0
+
+    def run(self):
+        FailingTool.calls += 1
+        if FailingTool.calls == 1:
+            return "Error: the service is not available."
+        if FailingTool.calls == 2:
+            raise ValueError("the service is not available")
+        return self.query
+
+
+class ToolCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_memory_lru_eviction(self):
+        cache = MemoryToolCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertEqual(cache.get_stats()["hits"], 2)
+
+    def test_ttl(self):
+        for cache in [MemoryToolCache(), DiskToolCache(self.tmp_dir)]:
+            cache.set("a", "value", ttl=0.05)
+            self.assertEqual(cache.get("a"), (True, "value"))
+            time.sleep(0.06)
+            self.assertEqual(cache.get("a"), (False, None))
+
+    def test_disk_entry_evicted_while_read(self):
+        cache = DiskToolCache(self.tmp_dir)
+        cache.set("a", 1)
+
+        # another process removes the file after it was read
+        with mock.patch("os.utime", side_effect=FileNotFoundError):
+            self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_disk_lru_eviction(self):
+        cache = DiskToolCache(self.tmp_dir, max_size=2)
+        cache.set("a", {"x": 1})
+        time.sleep(0.01)
+        cache.set("b", 2)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), (True, {"x": 1}))
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(len(cache), 2)
+
+    def test_canonical_keys(self):
+        self.assertEqual(MemoryToolCache.make_key("Tool", {"a": 1, "b": 2}),
+                         MemoryToolCache.make_key("Tool", {"b": 2, "a": 1}))
+        self.assertNotEqual(MemoryToolCache.make_key("Tool", {"a": 1}),
+                            MemoryToolCache.make_key("OtherTool", {"a": 1}))
+
+    def test_thread_uses_cache(self):
+        set_openai_key("test")
+        agent = Agent(name="TestAgent", tools=[CountingTool])
+        thread = Thread(User(), agent)
+
+        def call(arguments):
+            tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="CountingTool",
+                                                                            arguments=arguments))
+            return thread.execute_tool(tool_call, agent)
+
+        self.assertEqual(call('{"query": "a"}'), "a:1")
+        self.assertEqual(call('{"page": 1, "query": "a"}'), "a:1")
+        self.assertEqual(call('{"query": "b"}'), "b:1")
+
+        self.assertEqual(CountingTool.calls, 2)
+        self.assertEqual(CountingTool.get_cache().get_stats()["hits"], 1)
+
+
+    def test_errors_are_not_cached(self):
+        set_openai_key("test")
+        agent = Agent(name="TestAgent", tools=[FailingTool])
+        thread = Thread(User(), agent)
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="FailingTool",
+                                                                        arguments='{"query": "a"}'))
+
+        self.assertEqual(thread.execute_tool(tool_call, agent), "Error: the service is not available.")
+        self.assertEqual(thread.execute_tool(tool_call, agent), "Error: the service is not available")
+        self.assertEqual(thread.execute_tool(tool_call, agent), "a")
+        self.assertEqual(thread.execute_tool(tool_call, agent), "a")
+
+        self.assertEqual(FailingTool.calls, 3)
+
+    def test_default_cache_is_created_once(self):
+        class ConcurrentTool(BaseTool):
+            """Is called from several threads."""
+            cache_results = True
+
+            def run(self):
+                return ""
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            caches = list(executor.map(lambda _: ConcurrentTool.get_cache(), range(32)))
+
+        self.assertTrue(all(cache is caches[0] for cache in caches))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import unittest
+
+from pydantic import model_validator
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+
+
+class FirstTool(BaseTool):
+    """First test tool."""
+    value: int = 0
+
+    @model_validator(mode='after')
+    def validate_value(self):
+        if self.value < 0:
+            raise ValueError("Value must be positive.")
+
+    def run(self):
+        return self.value
+
+
+class SecondTool(BaseTool):
+    """Second test tool."""
+
+    def run(self):
+        return "second"
+
+
+class ToolDispatchTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+
+    def test_index_is_invalidated(self):
+        agent = Agent(name="TestAgent", tools=[FirstTool])
+        self.assertIs(agent.get_function("FirstTool"), FirstTool)
+        self.assertIsNone(agent.get_function("SecondTool"))
+
+        agent.add_tool(SecondTool)
+        self.assertIs(agent.get_function("SecondTool"), SecondTool)
+
+        agent.tools.append(type("ThirdTool", (SecondTool,), {"__doc__": "Third test tool."}))
+        self.assertEqual([f.__name__ for f in agent.functions], ["FirstTool", "SecondTool", "ThirdTool"])
+
+    def test_from_arguments(self):
+        tool = FirstTool.from_arguments('{"value": 3}')
+        self.assertIsInstance(tool, FirstTool)
+        self.assertEqual(tool.run(), 3)
+        self.assertEqual(FirstTool.from_arguments("").value, 0)
+
+        with self.assertRaises(ValueError):
+            FirstTool.from_arguments('{"value": -1}')
+
+
+    def test_reserved_fields(self):
+        class SessionTool(BaseTool):
+            """Uses an argument with the name of an internal attribute."""
+            session: str
+
+            def run(self):
+                return self.session
+
+        self.assertEqual(SessionTool.openai_schema["parameters"]["required"], ["session"])
+        self.assertEqual(SessionTool.from_arguments('{"session": "a"}').run(), "a")
+
+        with self.assertRaises(Exception):
+            class TokenTool(BaseTool):
+                """Declares a field that is set by the thread."""
+                cancellation_token: str
+
+                def run(self):
+                    return ""
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.tools import ToolOutputPolicy
+from agency_swarm.user import User
+
+
+class LargeOutputTool(BaseTool):
+    """Returns a large output."""
+    output_policy = ToolOutputPolicy(max_bytes=100, strategy="summarize", summarizer=lambda output: "summary")
+
+    def run(self):
+        return "x" * 1000
+
+
+class ToolOutputPolicyTest(unittest.TestCase):
+    def test_truncate_keeps_head_and_tail(self):
+        policy = ToolOutputPolicy(max_bytes=100, head_ratio=0.5)
+        output = policy.apply("a" * 500 + "b" * 500, "Tool", "call_1")
+
+        # the marker is within the limit
+        self.assertLessEqual(len(output.encode()), 100)
+        self.assertTrue(output.startswith("a" * 33))
+        self.assertTrue(output.endswith("b" * 33))
+        self.assertIn("[934 bytes truncated]", output)
+
+    def test_small_output_unchanged(self):
+        policy = ToolOutputPolicy(max_bytes=100)
+        self.assertEqual(policy.apply("small", "Tool", "call_1"), "small")
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            ToolOutputPolicy(strategy="summarize")
+        with self.assertRaises(ValueError):
+            ToolOutputPolicy(strategy="file")
+
+    def test_failed_summarizer_is_truncated(self):
+        set_openai_key("test")
+
+        def fail(output):
+            raise Exception("Summarizer is down.")
+
+        agent = Agent(name="TestAgent", tool_output_policy=ToolOutputPolicy(max_bytes=100, strategy="summarize",
+                                                                            summarizer=fail))
+        thread = Thread(User(), agent)
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="Tool", arguments="{}"))
+
+        with self.assertWarns(UserWarning):
+            output = thread._limit_tool_output(tool_call, "x" * 1000, agent)
+
+        self.assertLessEqual(len(output.encode()), 100)
+        self.assertIn("bytes truncated", output)
+
+    def test_thread_applies_tool_policy_over_agent_policy(self):
+        set_openai_key("test")
+        agent = Agent(name="TestAgent", tools=[LargeOutputTool],
+                      tool_output_policy=ToolOutputPolicy(max_bytes=10))
+        thread = Thread(User(), agent)
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="LargeOutputTool", arguments="{}"))
+
+        output = thread._limit_tool_output(tool_call, thread.execute_tool(tool_call, agent), agent)
+
+        self.assertEqual(output, "summary")
+        self.assertEqual(thread.tool_output_stats[-1]["original_bytes"], 1000)
+        self.assertEqual(thread.tool_output_stats[-1]["bytes"], 7)
+        self.assertGreater(thread.tool_output_stats[-1]["tokens"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
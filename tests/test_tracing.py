@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, BaseTool, set_openai_key
+from agency_swarm.threads import AsyncThread, Thread
+from agency_swarm.threads.run_waiter import AsyncRunWaiter, RunWaiter
+from agency_swarm.user import User
+from agency_swarm.util import Tracer, InMemorySpanExporter, JSONLSpanExporter, set_tracer, get_tracer
+
+
+class EchoTool(BaseTool):
+    """Returns the value."""
+    value: str
+
+    def run(self):
+        with get_tracer().span("echo"):
+            return self.value
+
+
+class FakeRuns:
+    def __init__(self):
+        self.created = 0
+
+    def create(self, thread_id, **kwargs):
+        self.created += 1
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="EchoTool", arguments='{"value": "abc"}'))
+        required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[tool_call]))
+        return SimpleNamespace(id="run_1", status="requires_action", required_action=required_action)
+
+    def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+        return SimpleNamespace(id=run_id, status="in_progress")
+
+    def retrieve(self, thread_id, run_id):
+        return SimpleNamespace(id=run_id, status="completed")
+
+
+class AsyncFakeRuns(FakeRuns):
+    async def create(self, thread_id, **kwargs):
+        return FakeRuns.create(self, thread_id, **kwargs)
+
+    async def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+        return FakeRuns.submit_tool_outputs(self, thread_id, run_id, tool_outputs)
+
+    async def retrieve(self, thread_id, run_id):
+        return FakeRuns.retrieve(self, thread_id, run_id)
+
+
+class AsyncFakeMessages:
+    async def create(self, **kwargs):
+        return None
+
+    async def list(self, **kwargs):
+        for message in []:
+            yield message
+
+
+def make_agent():
+    agent = Agent(name="TestAgent", tools=[EchoTool])
+    agent.id = "asst_1"
+    agent.assistant = SimpleNamespace(id="asst_1")
+    return agent
+
+
+class TracerTest(unittest.TestCase):
+    def test_nested_spans(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer([exporter])
+
+        with tracer.span("parent", attributes={"a": 1}) as parent:
+            with tracer.span("child") as child:
+                pass
+            with self.assertRaises(ValueError):
+                with tracer.span("failed"):
+                    raise ValueError("boom")
+
+        self.assertEqual([span.name for span in exporter.spans], ["child", "failed", "parent"])
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(exporter.get_spans("failed")[0].status, "error")
+        self.assertGreaterEqual(parent.duration, child.duration)
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+        with tracer.span("noop") as span:
+            span.set_attribute("a", 1)
+        self.assertFalse(tracer.enabled)
+
+    def test_jsonl_exporter(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "traces.jsonl")
+            tracer = Tracer([JSONLSpanExporter(path)])
+            with tracer.span("first", attributes={"payload_bytes": 10}):
+                pass
+            with tracer.span("second"):
+                pass
+            tracer.shutdown()
+
+            with open(path) as f:
+                spans = [json.loads(line) for line in f]
+
+        self.assertEqual([span["name"] for span in spans], ["first", "second"])
+        self.assertEqual(spans[0]["attributes"], {"payload_bytes": 10})
+
+
+class ThreadTracingTest(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.previous_tracer = get_tracer()
+        set_tracer(Tracer([self.exporter]))
+
+    def tearDown(self):
+        set_tracer(self.previous_tracer)
+
+    def test_thread_spans(self):
+        set_openai_key("test")
+        thread = Thread(User(), make_agent(), run_waiter=RunWaiter(use_streaming=False, initial_interval=0.001))
+        thread.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+            runs=FakeRuns(), messages=SimpleNamespace(create=lambda **kwargs: None, list=lambda **kwargs: iter([])))))
+        thread.thread = SimpleNamespace(id="thread_1")
+        thread.id = "thread_1"
+
+        gen = thread.get_completion("Hello", yield_messages=False)
+        try:
+            while True:
+                next(gen)
+        except StopIteration:
+            pass
+
+        root = self.exporter.get_spans("thread.get_completion")[0]
+        children = [span.name for span in self.exporter.spans if span.parent_id == root.span_id]
+        self.assertEqual(children, ["api.messages.create", "api.runs.create", "tool.execute",
+                                    "api.runs.submit_tool_outputs", "api.runs.retrieve", "api.messages.list"])
+
+        tool_span = self.exporter.get_spans("tool.execute")[0]
+        self.assertEqual(tool_span.attributes["tool_name"], "EchoTool")
+        self.assertEqual(tool_span.attributes["output_bytes"], 3)
+        self.assertEqual(self.exporter.get_spans("api.runs.submit_tool_outputs")[0].attributes["payload_bytes"], 3)
+        self.assertEqual(root.attributes["retries"], 0)
+        self.assertEqual(root.attributes["message_bytes"], 5)
+
+    def test_async_thread_spans(self):
+        set_openai_key("test")
+        thread = AsyncThread(User(), make_agent(), run_waiter=AsyncRunWaiter(use_streaming=False,
+                                                                             initial_interval=0.001))
+        thread.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+            runs=AsyncFakeRuns(), messages=AsyncFakeMessages())))
+        thread.thread = SimpleNamespace(id="thread_1")
+        thread.id = "thread_1"
+
+        asyncio.run(thread.get_completion("Hello"))
+
+        root = self.exporter.get_spans("thread.get_completion")[0]
+        children = [span.name for span in self.exporter.spans if span.parent_id == root.span_id]
+        self.assertEqual(children, ["api.messages.create", "api.runs.create", "tool.execute",
+                                    "api.runs.submit_tool_outputs", "api.runs.retrieve", "api.messages.list"])
+        self.assertEqual(self.exporter.get_spans("tool.execute")[0].attributes["output_bytes"], 3)
+        self.assertEqual(root.attributes["message_bytes"], 5)
+
+        # sync tools run in an executor with the context of the run
+        tool_span = self.exporter.get_spans("tool.execute")[0]
+        self.assertEqual(self.exporter.get_spans("echo")[0].parent_id, tool_span.span_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
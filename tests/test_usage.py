@@ -0,0 +1,98 @@
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, '../agency-swarm')
+from agency_swarm import Agent, set_openai_key
+from agency_swarm.threads import Thread
+from agency_swarm.threads.run_waiter import RunWaiter
+from agency_swarm.user import User
+from agency_swarm.util import CancellationToken, PartialResult, UsageTracker
+
+
+def make_usage(prompt_tokens, completion_tokens):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+class FakeRuns:
+    def __init__(self):
+        self.created = 0
+
+    def create(self, thread_id, **kwargs):
+        self.created += 1
+        return SimpleNamespace(id=f"run_{self.created}", status="completed", model="gpt-4-turbo",
+                               usage=make_usage(1000, 500))
+
+
+class UsageTrackerTest(unittest.TestCase):
+    def test_aggregates_usage(self):
+        tracker = UsageTracker()
+        tracker.record("User", "CEO", "gpt-4-turbo", make_usage(1000, 1000))
+        tracker.record("CEO", "Dev", "gpt-4-turbo", make_usage(100, 50))
+        tracker.record("CEO", "Dev", "custom-model", make_usage(10, 5))
+
+        report = tracker.get_report()
+        self.assertEqual(report["total"]["total_tokens"], 2165)
+        self.assertEqual(report["total"]["runs"], 3)
+        self.assertEqual(report["total"]["unpriced_runs"], 1)
+        self.assertEqual(report["agents"]["Dev"]["total_tokens"], 165)
+        self.assertEqual(report["threads"]["User -> CEO"]["cost"], 0.04)
+        self.assertEqual(report["models"]["custom-model"]["cost"], 0)
+        self.assertFalse(report["budget_exceeded"])
+
+    def test_budget_cancels_token(self):
+        token = CancellationToken()
+        tracker = UsageTracker(token_budget=100, cancellation_token=token)
+
+        tracker.record("User", "CEO", "gpt-4-turbo", make_usage(50, 50))
+        self.assertFalse(token.cancelled)
+
+        tracker.record("User", "CEO", "gpt-4-turbo", make_usage(1, 0))
+        self.assertTrue(tracker.budget_exceeded)
+        self.assertEqual(token.reason, "token budget exceeded")
+
+
+class ThreadUsageTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_key("test")
+        agent = Agent(name="TestAgent")
+        agent.id = "asst_1"
+        agent.assistant = SimpleNamespace(id="asst_1")
+
+        self.thread = Thread(User(), agent, run_waiter=RunWaiter(use_streaming=False))
+        self.thread.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+            runs=FakeRuns(), messages=SimpleNamespace(create=lambda **kwargs: None, list=lambda **kwargs: iter([])))))
+        self.thread.thread = SimpleNamespace(id="thread_1")
+        self.thread.id = "thread_1"
+
+    def get_result(self, **kwargs):
+        gen = self.thread.get_completion("Hi", yield_messages=False, **kwargs)
+        try:
+            while True:
+                next(gen)
+        except StopIteration as e:
+            return e.value
+
+    def test_records_run_usage(self):
+        request_usage = UsageTracker()
+        self.get_result(request_usage=request_usage)
+        self.get_result()
+
+        self.assertEqual(request_usage.get_report()["threads"]["User -> TestAgent"]["total_tokens"], 1500)
+        self.assertEqual(self.thread.usage_tracker.get_report()["agents"]["TestAgent"]["runs"], 2)
+
+    def test_budget_stops_further_requests(self):
+        token = CancellationToken()
+        request_usage = UsageTracker(token_budget=1000, cancellation_token=token)
+
+        self.assertIsInstance(self.get_result(cancellation_token=token, request_usage=request_usage), PartialResult)
+        result = self.get_result(cancellation_token=token, request_usage=request_usage)
+
+        self.assertIsInstance(result, PartialResult)
+        self.assertEqual(result.reason, "token budget exceeded")
+        self.assertEqual(self.thread.client.beta.threads.runs.created, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()